@@ -1,14 +1,11 @@
 import streamlit as st
-from dotenv import load_dotenv
+from config.env import load_env
 from src.i18n import i18n, t
-from pathlib import Path
+from src.services.asset_service import get_variants, picture_html, pick_variant
+from config.settings import LANDING_IMAGE
 
-# Cargar variables de entorno
-load_dotenv()
-
-# Obtener ruta absoluta de la imagen
-CURRENT_DIR = Path(__file__).parent
-IMAGE_PATH = CURRENT_DIR / "imagen_1.png"
+# Cargar variables de entorno (una sola vez por proceso)
+load_env()
 
 # Configurar página
 st.set_page_config(
@@ -49,7 +46,13 @@ col1, col2 = st.columns(2)
 
 with col1:
     try:
-        st.image(str(IMAGE_PATH), use_column_width=True)
+        # Variantes redimensionadas generadas una vez por proceso; con archivos
+        # estáticos, el navegador elige la anchura según el viewport
+        variants = get_variants(LANDING_IMAGE)
+        if st.get_option("server.enableStaticServing"):
+            st.markdown(picture_html(variants, alt="ThinkInk"), unsafe_allow_html=True)
+        else:
+            st.image(pick_variant(variants, 640, "webp").data, use_column_width=True)
     except FileNotFoundError:
         st.warning("⚠️ Imagen no encontrada. Verifica que imagen_1.png esté en la raíz del proyecto.")
     st.markdown("")  # Espaciador
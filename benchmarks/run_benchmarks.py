@@ -0,0 +1,419 @@
+"""
+Suite de benchmarks de ThinkInk: catálogo, i18n, GeminiService y API HTTP
+
+Uso:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 1000000 --lookups 50
+    python -m benchmarks.run_benchmarks --compare old.json new.json
+
+Los resultados se escriben en JSON para comparar regresiones entre commits.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import synthetic_book_dicts, write_catalog
+
+DEFAULT_SIZES = [1000, 100000]
+STARTUP_MODULES = [
+    "config.settings",
+    "src.i18n",
+    "src.services.book_service",
+    "src.services.gemini_service",
+    "src.ui.gemini_page",
+    "src.services.api_server",
+]
+
+
+def _latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Resume una lista de latencias (segundos) en microsegundos"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "count": len(ordered),
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": statistics.median(ordered) * 1e6,
+        "p95_us": p95 * 1e6,
+        "max_us": ordered[-1] * 1e6,
+    }
+
+
+def _time_each(fn: Callable, args: List) -> List[float]:
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_catalog(size: int, lookups: int, adds: int, workdir: Path) -> Dict:
+    """Carga, búsquedas, guardado e inserción sobre un catálogo sintético"""
+    from src.models.book import Book
+    from src.services.book_service import BookService
+
+    path = write_catalog(workdir / f"catalog_{size}.json", size)
+    rng = random.Random(size)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    service = BookService(books_file=path)
+    load_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ids = [rng.randint(1, size) for _ in range(lookups)]
+    titles = [f"libro sintético {i}" for i in ids]
+    genres = [rng.choice(["Distopía", "Romance", "Ensayo"]) for _ in range(max(lookups // 10, 1))]
+
+    start = time.perf_counter()
+    service.save_books()
+    save_seconds = time.perf_counter() - start
+
+    new_books = [Book.from_dict(d) for d in synthetic_book_dicts(adds, seed=1, start_id=size + 1)]
+    start = time.perf_counter()
+    for book in new_books:
+        service.add_book(book)
+    add_seconds = time.perf_counter() - start
+
+    # Inserciones en memoria con los índices derivados ya construidos: cada
+    # consulta posterior usa los órdenes y facetas mantenidos por los eventos
+    service.query_books(sort_by="title")
+    service.query_books(sort_by="year", facets={"genre": "distopía"})
+    service.get_books_by_author("Autor 1")
+    more_books = [Book.from_dict(d) for d in synthetic_book_dicts(adds, seed=2, start_id=size + adds + 1)]
+    start = time.perf_counter()
+    for book in more_books:
+        service.add_books([book], save=False)
+        service.query_books(sort_by="title", limit=10)
+    indexed_add_seconds = time.perf_counter() - start
+
+    return {
+        "size": size,
+        "load_seconds": load_seconds,
+        "load_peak_mb": peak / 1e6,
+        "get_book_by_id": _latency_stats(_time_each(service.get_book_by_id, ids)),
+        "get_book_by_title": _latency_stats(_time_each(service.get_book_by_title, titles)),
+        "get_books_by_genre": _latency_stats(_time_each(service.get_books_by_genre, genres)),
+        "save_books_seconds": save_seconds,
+        "save_books_per_second": size / save_seconds if save_seconds else None,
+        "add_book_count": adds,
+        "add_book_per_second": adds / add_seconds if add_seconds else None,
+        "indexed_add_query_per_second": adds / indexed_add_seconds if indexed_add_seconds else None,
+    }
+
+
+def bench_i18n(calls: int) -> Dict:
+    """Rendimiento de t() y memoria del servicio de traducciones"""
+    tracemalloc.start()
+    from src.i18n.i18n_service import I18nService, t
+
+    I18nService().translations
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    from src.i18n.i18n_service import i18n
+
+    keys = list(i18n.translate_dict("es").keys())
+    langs = ["es", "en"]
+    start = time.perf_counter()
+    for i in range(calls):
+        t(keys[i % len(keys)], langs[i & 1])
+    seconds = time.perf_counter() - start
+    return {"calls": calls, "calls_per_second": calls / seconds, "service_peak_mb": peak / 1e6}
+
+
+def bench_gemini(requests: int, concurrency: int, latency: float) -> Dict:
+    """Rendimiento de GeminiService frente a un modelo simulado"""
+    from src.models.book import Book
+    from src.services.gemini_service import GeminiService
+    from src.services.model_backends import FakeBackend
+
+    service = GeminiService(backend=FakeBackend(latency=latency, seed=0))
+    books = [Book.from_dict(d) for d in synthetic_book_dicts(50)]
+
+    def call(i: int) -> float:
+        start = time.perf_counter()
+        service.get_book_summary(books[i % len(books)], "es" if i % 2 else "en")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, range(requests)))
+    seconds = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "model_latency_seconds": latency,
+        "requests_per_second": requests / seconds,
+        "latency": _latency_stats(samples),
+    }
+
+
+def bench_prompt_budget(requests: int, context_scale: int, token_latency: float) -> Dict:
+    """
+    Tokens de prompt y latencia con y sin presupuesto de tokens
+
+    Usa libros con contexto largo (descripción y biografía repetidas
+    `context_scale` veces) y un modelo simulado cuya latencia crece con el
+    tamaño del prompt, como el tiempo hasta el primer token de un modelo real.
+    """
+    from src.models.book import Book
+    from src.services.gemini_service import GeminiService
+    from src.services.model_backends import FakeBackend
+    from src.services.prompt_budget import estimate_tokens
+
+    books = []
+    for data in synthetic_book_dicts(50):
+        data["description"] *= context_scale
+        data["author_bio"] = (data["author_bio"] + " ") * context_scale
+        books.append(Book.from_dict(data))
+
+    results = {"requests": requests, "context_scale": context_scale, "token_latency_seconds": token_latency}
+    for label, enabled in (("unbudgeted", False), ("budgeted", True)):
+        tokens: List[int] = []
+
+        def responder(prompt: str) -> str:
+            tokens.append(estimate_tokens(prompt))
+            return "ok"
+
+        backend = FakeBackend(responder=responder, prompt_token_latency=token_latency)
+        service = GeminiService(backend=backend, prompt_budget=enabled)
+        service.cache = None  # Cada petición llega al modelo
+        samples = []
+        for i in range(requests):
+            book, other = books[i % len(books)], books[(i + 1) % len(books)]
+            start = time.perf_counter()
+            if i % 2:
+                service.compare_books(book, other)
+            else:
+                service.get_book_summary(book)
+            samples.append(time.perf_counter() - start)
+        results[label] = {
+            "mean_prompt_tokens": statistics.fmean(tokens),
+            "max_prompt_tokens": max(tokens),
+            "latency": _latency_stats(samples),
+        }
+    results["token_reduction_pct"] = (
+        1 - results["budgeted"]["mean_prompt_tokens"] / results["unbudgeted"]["mean_prompt_tokens"]
+    ) * 100
+    return results
+
+
+def _import_time_us(module: str) -> Dict[str, Optional[float]]:
+    """
+    Tiempo de importación de un módulo en un intérprete nuevo (python -X importtime)
+
+    `import_us` es None si la salida no incluye el módulo.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent.parent,
+    )
+    wall = time.perf_counter() - start
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    return {"import_us": cumulative, "process_seconds": wall}
+
+
+def bench_api(size: int, requests: int, clients: int, workdir: Path) -> Dict:
+    """
+    Peticiones por segundo de la API HTTP con conexiones persistentes
+
+    Los clientes corren en hilos del mismo proceso (compiten por el GIL con
+    el servidor), así que las cifras son una cota inferior.
+    """
+    import asyncio
+    import http.client
+    import threading
+
+    from src.services.api_server import ApiApp, ApiServer
+    from src.services.book_service import BookService
+
+    service = BookService(books_file=write_catalog(workdir / f"api_{size}.json", size))
+    app = ApiApp(book_service_factory=lambda lang: service, langs=("es",))
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(ApiServer(app, "127.0.0.1", 0).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    rng = random.Random(size)
+    targets = [f"/books?offset={rng.randrange(0, size, 50)}&limit=50&sort_by=title" for _ in range(20)]
+    targets += [f"/books/{rng.randint(1, size)}" for _ in range(20)]
+
+    def client(count: int, conditional: bool) -> int:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port)
+        etags: Dict[str, str] = {}
+        for i in range(count):
+            target = targets[i % len(targets)]
+            headers = {"Accept-Encoding": "gzip"}
+            if conditional and target in etags:
+                headers["If-None-Match"] = etags[target]
+            connection.request("GET", target, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            etags[target] = response.getheader("ETag")
+        connection.close()
+        return count
+
+    def measure(conditional: bool) -> float:
+        per_client = max(requests // clients, 1)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            total = sum(pool.map(lambda _: client(per_client, conditional), range(clients)))
+        return total / (time.perf_counter() - start)
+
+    try:
+        results = {
+            "size": size,
+            "clients": clients,
+            "requests_per_second": measure(conditional=False),
+            "conditional_requests_per_second": measure(conditional=True),
+        }
+        results["server"] = {k: v for k, v in app.metrics.to_dict().items()
+                             if k in ("requests", "not_modified", "response_cache_hits", "gzipped", "latency_p50")}
+        return results
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def bench_startup(modules: List[str], runs: int) -> Dict:
+    """
+    Tiempo de importación en frío por módulo (mínimo de `runs` ejecuciones)
+
+    Si -X importtime no informa del módulo en ninguna ejecución, `import_us`
+    queda en None en lugar de abortar el benchmark.
+    """
+    results = {}
+    for module in modules:
+        samples = [_import_time_us(module) for _ in range(runs)]
+        import_times = [s["import_us"] for s in samples if s["import_us"] is not None]
+        if not import_times:
+            print(f"startup: no import time reported for {module}", file=sys.stderr)
+        results[module] = {
+            "import_us": min(import_times) if import_times else None,
+            "process_seconds": min(s["process_seconds"] for s in samples),
+        }
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> Dict:
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "catalog": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"catalog size={size}...", file=sys.stderr)
+            results["catalog"].append(bench_catalog(size, args.lookups, args.adds, Path(tmp)))
+        if not args.skip_api:
+            print("api...", file=sys.stderr)
+            results["api"] = bench_api(args.api_catalog_size, args.api_requests, args.api_clients, Path(tmp))
+    if not args.skip_startup:
+        print("startup...", file=sys.stderr)
+        results["startup"] = bench_startup(STARTUP_MODULES, args.startup_runs)
+    print("i18n...", file=sys.stderr)
+    results["i18n"] = bench_i18n(args.i18n_calls)
+    if not args.skip_gemini:
+        print("gemini...", file=sys.stderr)
+        results["gemini"] = bench_gemini(args.gemini_requests, args.gemini_concurrency, args.gemini_latency)
+        print("prompt budget...", file=sys.stderr)
+        results["prompt_budget"] = bench_prompt_budget(
+            args.budget_requests, args.budget_context_scale, args.budget_token_latency
+        )
+    return results
+
+
+def _flatten(data, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for item in data:
+            label = f"size={item['size']}" if isinstance(item, dict) and "size" in item else str(len(flat))
+            flat.update(_flatten(item, f"{prefix}{label}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip(".")] = data
+    return flat
+
+
+def compare(old_path: str, new_path: str):
+    """Imprime la variación porcentual de cada métrica entre dos ejecuciones"""
+    with open(old_path, encoding="utf-8") as f:
+        old = _flatten(json.load(f))
+    with open(new_path, encoding="utf-8") as f:
+        new = _flatten(json.load(f))
+    for key in sorted(old.keys() & new.keys()):
+        if old[key]:
+            change = (new[key] - old[key]) / old[key] * 100
+            print(f"{key:60s} {old[key]:>14.3f} {new[key]:>14.3f} {change:>+8.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--adds", type=int, default=20)
+    parser.add_argument("--i18n-calls", type=int, default=200000)
+    parser.add_argument("--gemini-requests", type=int, default=200)
+    parser.add_argument("--gemini-concurrency", type=int, default=8)
+    parser.add_argument("--gemini-latency", type=float, default=0.01)
+    parser.add_argument("--skip-gemini", action="store_true")
+    parser.add_argument("--budget-requests", type=int, default=100)
+    parser.add_argument("--budget-context-scale", type=int, default=50)
+    parser.add_argument("--budget-token-latency", type=float, default=1e-5)
+    parser.add_argument("--api-catalog-size", type=int, default=10000)
+    parser.add_argument("--api-requests", type=int, default=4000)
+    parser.add_argument("--api-clients", type=int, default=8)
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--skip-startup", action="store_true")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Generación de catálogos sintéticos para benchmarks
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Iterator
+
+GENRES = [
+    "Distopía", "Romance", "Fantasía", "Novela psicológica", "Realismo mágico",
+    "Ficción histórica", "Ciencia ficción", "Ensayo", "Poesía", "Misterio",
+]
+THEMES = ["Amistad", "Justicia", "Identidad", "Poder", "Amor", "Memoria", "Libertad", "No especificado"]
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Jane", "George", "Franz", "Gabriel", "Louisa", "Fiódor"]
+LAST_NAMES = ["García", "Orwell", "Austen", "Kafka", "Márquez", "Alcott", "Brontë", "Tolkien", "Pérez", "López"]
+
+
+def synthetic_book_dicts(count: int, seed: int = 0, start_id: int = 1) -> Iterator[dict]:
+    """Genera libros sintéticos con el mismo esquema que data/books.json"""
+    rng = random.Random(seed)
+    for book_id in range(start_id, start_id + count):
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {book_id % 997}"
+        yield {
+            "id": book_id,
+            "title": f"Libro sintético {book_id}",
+            "author": author,
+            "description": f"Descripción del libro sintético {book_id}. " * 3,
+            "year": rng.randint(1600, 2024),
+            "genre": rng.choice(GENRES),
+            "theme": rng.choice(THEMES),
+            "pre_questions": [f"¿Pregunta previa {i}?" for i in range(3)],
+            "post_questions": [f"¿Pregunta final {i}?" for i in range(3)],
+            "author_bio": f"{author} es un autor sintético.",
+        }
+
+
+def write_catalog(path: Path, count: int, seed: int = 0) -> Path:
+    """Escribe un catálogo sintético de `count` libros en formato JSON"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, book in enumerate(synthetic_book_dicts(count, seed)):
+            if i:
+                f.write(",")
+            json.dump(book, f, ensure_ascii=False)
+        f.write("]")
+    return path
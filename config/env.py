@@ -0,0 +1,26 @@
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env():
+    """
+    Carga las variables de `.env` una sola vez por proceso
+
+    `python-dotenv` se importa aquí y no en cada módulo que lee el entorno.
+    Las variables ya definidas en el entorno tienen prioridad. Sin
+    python-dotenv instalado solo se usa el entorno del proceso.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            try:
+                from dotenv import load_dotenv
+            except ImportError:
+                load_dotenv = None
+            if load_dotenv is not None:
+                load_dotenv()
+            _loaded = True
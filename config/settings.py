@@ -1,6 +1,11 @@
 import os
 from pathlib import Path
 
+from config.env import load_env
+
+# Algunas opciones se leen del entorno: cargar .env antes (una sola vez por proceso)
+load_env()
+
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 BOOKS_FILE = DATA_DIR / "books.json"
@@ -11,3 +16,109 @@ STREAMLIT_CONFIG = {
     "layout": "wide",
     "initial_sidebar_state": "expanded",
 }
+
+# Calificación de respuestas por lotes con Gemini
+GEMINI_GRADING_TOKEN_BUDGET = 6000  # Tokens estimados de prompt por petición
+GEMINI_GRADING_MAX_BATCH = 20  # Respuestas máximas por petición
+
+# Presupuesto de tokens estimados por prompt (ver src/services/prompt_budget.py)
+GEMINI_PROMPT_DEFAULT_BUDGET = 800
+GEMINI_PROMPT_TOKEN_BUDGETS = {
+    "compare_books": 1200,
+    "grade_answers": GEMINI_GRADING_TOKEN_BUDGET,
+}
+
+# Backend del modelo (ver src/services/model_backends.py)
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+GEMINI_REPLAY_DIR = DATA_DIR / "gemini_replay"
+
+# Caché compartida de respuestas de Gemini (GEMINI_CACHE_URL, ver src/cache/factory.py)
+GEMINI_CACHE_TTL = 7 * 24 * 3600  # Segundos
+
+# Similitud mínima (0-1) para reutilizar la respuesta de una consulta de texto libre parecida
+GEMINI_QUERY_SIMILARITY_THRESHOLD = 0.9
+
+# Precarga especulativa de análisis al seleccionar un libro (requiere caché de respuestas)
+GEMINI_PREFETCH_ENABLED = os.getenv("GEMINI_PREFETCH", "0") == "1"
+GEMINI_PREFETCH_OPERATIONS = ("get_book_summary", "analyze_themes_and_characters")
+GEMINI_PREFETCH_WORKERS = 2
+GEMINI_PREFETCH_BUDGET_PER_MINUTE = 10  # Peticiones especulativas por minuto y proceso
+
+# Planificador de peticiones a Gemini (ver src/services/request_scheduler.py)
+GEMINI_SCHEDULER_CONCURRENCY = 8  # Peticiones simultáneas por proceso
+GEMINI_SCHEDULER_CLASS_LIMITS = {"interactive": 8, "prefetch": 2, "batch": 2}
+GEMINI_SCHEDULER_DEADLINES = {"prefetch": 30, "batch": 600}  # Segundos máximos en cola
+
+# Telemetría de operaciones de Gemini (GEMINI_METRICS_FILE para exportar a JSON)
+GEMINI_METRICS_WINDOW = 1000  # Registros por operación e idioma
+GEMINI_METRICS_EXPORT_INTERVAL = 30  # Segundos entre exportaciones
+
+# Índice de autores del catálogo (ver src/services/author_index.py)
+AUTHOR_MATCH_THRESHOLD = 0.8  # Similitud mínima (0-1) para aceptar un nombre con erratas
+AUTHOR_WORKS_LIMIT = 3  # Obras por búsqueda de autor; Gemini solo completa las que falten
+
+# Comparación de varios libros a la vez (ver src/services/comparison_service.py)
+GEMINI_COMPARE_MAX_BOOKS = 10
+GEMINI_COMPARE_WORKERS = 4  # Pares comparados a la vez con el modelo
+
+# Cola de trabajos de análisis en segundo plano
+GEMINI_JOBS_DB = DATA_DIR / "gemini_jobs.sqlite3"
+GEMINI_JOBS_WORKERS = GEMINI_SCHEDULER_CONCURRENCY  # Cada clase usa como mucho GEMINI_SCHEDULER_CLASS_LIMITS
+GEMINI_JOBS_LEASE_SECONDS = 300  # Tras este tiempo, un trabajo "running" se considera abandonado
+GEMINI_JOBS_WAIT_SECONDS = 60  # Espera máxima en la página antes de mostrar "en curso"
+
+# Exportación masiva de análisis (ver src/services/export_service.py)
+GEMINI_EXPORT_OPERATIONS = ("get_book_summary", "analyze_themes_and_characters", "generate_discussion_questions")
+
+# Importación masiva del catálogo (ver src/services/catalog_importer.py)
+CATALOG_YEAR_RANGE = (-3000, 2100)  # Años válidos (negativos = a. C.)
+CATALOG_IMPORT_BATCH_SIZE = 10_000  # Registros por lote validado
+CATALOG_IMPORT_SAVE_EVERY = 100_000  # Registros añadidos entre escrituras del archivo
+
+# Selector de libros paginado (ver src/ui/book_selector.py)
+CATALOG_PAGE_SIZE = 50  # Títulos enviados al navegador por página
+
+# Eventos de cambio del catálogo (ver src/services/catalog_events.py)
+CATALOG_CHANGE_LOG_SIZE = 1000  # Eventos recientes que se conservan para `changes_since`
+
+# API HTTP/JSON sin interfaz (ver src/services/api_server.py)
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8600"))
+API_LANGS = ("es", "en")  # Catálogos expuestos
+API_MAX_PAGE_SIZE = 200  # Libros máximos por página de /books
+API_MAX_BODY_BYTES = 1_000_000  # Tamaño máximo del cuerpo de una petición
+API_KEEPALIVE_SECONDS = 15  # Espera máxima de una conexión inactiva
+API_GZIP_MIN_BYTES = 1024  # Respuestas más pequeñas se envían sin comprimir
+API_RESPONSE_CACHE_SIZE = 1024  # Respuestas ya serializadas (y comprimidas) por ETag
+
+# Variantes de imagen de la portada (ver src/services/asset_service.py)
+STATIC_DIR = BASE_DIR / "static"  # Servida por Streamlit en app/static/ (server.enableStaticServing)
+LANDING_IMAGE = BASE_DIR / "imagen_1.png"
+IMAGE_VARIANT_WIDTHS = (320, 640, 1024)  # Píxeles; nunca se amplía el original
+IMAGE_VARIANT_FORMATS = ("webp", "png")  # El primero es el preferido; el último, el de compatibilidad
+
+# Pool de clientes de Gemini (GEMINI_API_KEYS=clave1,clave2 para repartir entre varias claves)
+GEMINI_KEY_REQUESTS_PER_MINUTE = 15  # Cuota por clave; 0 = sin límite local
+GEMINI_KEY_MAX_FAILURES = 3  # Errores seguidos antes de apartar una clave
+GEMINI_KEY_COOLDOWN_SECONDS = 60  # Tiempo apartada tras errores o cuota agotada
+GEMINI_KEY_WAIT_SECONDS = 30  # Espera máxima por una clave disponible
+
+# Enrutado de operaciones a niveles de modelo (GEMINI_ROUTING=1, ver src/services/model_router.py)
+GEMINI_ROUTING_ENABLED = os.getenv("GEMINI_ROUTING", "0") == "1"
+GEMINI_MODEL_TIERS = {  # Modelos por nivel, en orden de preferencia (los siguientes son de respaldo)
+    "fast": ["gemini-2.0-flash-lite", "gemini-2.0-flash"],
+    "standard": ["gemini-2.0-flash", "gemini-2.0-flash-lite"],
+    "strong": ["gemini-1.5-pro", "gemini-2.0-flash"],
+}
+GEMINI_OPERATION_TIERS = {
+    "generate_discussion_questions": "fast",
+    "grade_answers": "fast",
+    "compare_books": "strong",
+    "analyze_themes_and_characters": "strong",
+}
+GEMINI_DEFAULT_TIER = "standard"
+GEMINI_ROUTER_WINDOW = 100  # Llamadas recientes por modelo para percentiles y tasa de error
+GEMINI_ROUTER_MIN_SAMPLES = 5  # Llamadas mínimas antes de juzgar la salud de un modelo
+GEMINI_ROUTER_MAX_ERROR_RATE = 0.5  # Por encima, el modelo se salta temporalmente
+GEMINI_ROUTER_SLOW_P95_SECONDS = 20.0  # p95 de latencia por encima del cual el modelo se considera lento
+GEMINI_ROUTER_COOLDOWN_SECONDS = 60  # Tiempo que se salta un modelo lento o con errores
@@ -1,6 +1,6 @@
 import streamlit as st
-from src.services.book_service import BookService
-from src.ui.pages import display_book_card, display_author_section, display_questions
+from src.ui.pages import get_book_service, display_book_card, display_author_section, display_questions
+from src.ui.book_selector import book_selector, facet_filters
 from src.i18n.i18n_service import t
 
 # Obtener idioma
@@ -15,7 +15,7 @@ st.divider()
 
 # Inicializar sesión
 if "book_service" not in st.session_state or st.session_state.get("last_lang") != lang:
-    st.session_state.book_service = BookService(lang=lang)
+    st.session_state.book_service = get_book_service(lang)
     st.session_state.last_lang = lang
 
 book_service = st.session_state.book_service
@@ -23,11 +23,8 @@ book_service = st.session_state.book_service
 # Sidebar - Selección de libro
 with st.sidebar:
     st.header(t("sidebar_select_book", lang))
-    books = book_service.get_all_books()
-    book_titles = [book.title for book in books]
-    
-    selected_title = st.selectbox(t("choose_book", lang), book_titles)
-    selected_book = book_service.get_book_by_title(selected_title)
+    facets = facet_filters(book_service, lang, key="principal_book")
+    selected_book = book_selector(book_service, lang, key="principal_book", facets=facets)
 
 # Tabs principales (SIN GEMINI)
 if selected_book:
@@ -64,7 +61,7 @@ if selected_book:
             st.success(t("success_post_answers", lang))
     
     with tab4:
-        display_author_section(selected_book, lang)
+        display_author_section(selected_book, lang, book_service)
         
         with st.expander(t("more_author_stats", lang)):
             col1, col2 = st.columns(2)
@@ -1,12 +1,15 @@
+import uuid
 import streamlit as st
-from dotenv import load_dotenv
-from src.services.book_service import BookService
+from config.env import load_env
+from src.ui.pages import get_book_service
 from src.models.book import Book
-from src.ui.gemini_page import display_gemini_page, display_gemini_setup_instructions
+from src.ui.book_selector import book_selector, facet_filters
+from src.ui.gemini_page import display_gemini_page, display_gemini_setup_instructions, display_export_panel
+from src.services.request_scheduler import Priority, scheduling
 from src.i18n.i18n_service import t
 
-# Cargar variables de entorno
-load_dotenv()
+# Cargar variables de entorno (una sola vez por proceso)
+load_env()
 
 # Obtener idioma (actualiza en cada recarga)
 lang = st.session_state.get('language', 'es')
@@ -28,7 +31,7 @@ st.divider()
 
 # Inicializar servicio
 if "book_service" not in st.session_state or st.session_state.get("last_lang") != lang:
-    st.session_state.book_service = BookService(lang=lang)
+    st.session_state.book_service = get_book_service(lang)
     st.session_state.last_lang = lang
 
 book_service = st.session_state.book_service
@@ -53,11 +56,8 @@ with st.sidebar:
     selected_book = None
     
     if input_mode == t("input_mode_list", lang):
-        books = book_service.get_all_books()
-        book_titles = [book.title for book in books]
-        
-        selected_title = st.selectbox(t("choose_book", lang), book_titles)
-        selected_book = book_service.get_book_by_title(selected_title)
+        facets = facet_filters(book_service, lang, key="gemini_book")
+        selected_book = book_selector(book_service, lang, key="gemini_book", facets=facets)
     
     else:  # Búsqueda inteligente (Top 3)
         st.subheader(t("search_intelligent", lang))
@@ -137,6 +137,9 @@ with st.sidebar:
                 st.session_state.search_mode = "theme"
                 st.session_state.search_query = theme_query
 
+    st.divider()
+    display_export_panel(lang)
+
 # Contenido principal
 if selected_book:
     st.info(
@@ -146,8 +149,12 @@ if selected_book:
     )
     st.divider()
     
-    # Mostrar página de Gemini (pasar idioma)
-    display_gemini_page(selected_book, lang)
+    # Mostrar página de Gemini (pasar idioma); las peticiones de esta sesión
+    # son interactivas y se reparten equitativamente frente a otras sesiones
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    with scheduling(Priority.INTERACTIVE, session_id=st.session_state.session_id):
+        display_gemini_page(selected_book, lang)
     
     st.divider()
     display_gemini_setup_instructions(lang)
@@ -0,0 +1,20 @@
+from src.cache.base import CacheBackend
+from src.cache.memory_cache import MemoryCache
+from src.cache.factory import create_cache
+
+# SQLite y Redis se importan solo si se usan (ver `create_cache`)
+_LAZY = {
+    'SQLiteCache': 'src.cache.sqlite_cache',
+    'RedisCache': 'src.cache.redis_cache',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['CacheBackend', 'MemoryCache', 'SQLiteCache', 'RedisCache', 'create_cache']
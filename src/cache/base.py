@@ -0,0 +1,152 @@
+import time
+import uuid
+import zlib
+from typing import Callable, Optional
+
+# Prefijos del valor almacenado: comprimido o sin comprimir
+_COMPRESSED = b"z"
+_RAW = b"r"
+
+
+class CacheBackend:
+    """
+    Interfaz de caché compartida entre procesos
+
+    Las subclases implementan el almacenamiento de bytes (`_get_raw`,
+    `_set_raw`, `delete`) y un cerrojo con expiración (`_try_lock`,
+    `_unlock`). Esta clase añade compresión, TTL y protección contra
+    estampidas en `get_or_compute`.
+    """
+
+    def __init__(self, default_ttl: Optional[float] = None, compress_min_size: int = 256):
+        """
+        Args:
+            default_ttl: Segundos de vida por defecto (None = sin expiración)
+            compress_min_size: Tamaño mínimo en bytes a partir del cual se comprime
+        """
+        self.default_ttl = default_ttl
+        self.compress_min_size = compress_min_size
+
+    # Almacenamiento (a implementar por cada backend)
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _set_raw(self, key: str, value: bytes, ttl: Optional[float]):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Elimina una entrada"""
+        raise NotImplementedError
+
+    def _try_lock(self, key: str, token: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def _unlock(self, key: str, token: str):
+        raise NotImplementedError
+
+    def close(self):
+        """Libera conexiones del backend"""
+
+    # Codificación
+
+    def _encode(self, value: str) -> bytes:
+        data = value.encode("utf-8")
+        if len(data) >= self.compress_min_size:
+            return _COMPRESSED + zlib.compress(data, 6)
+        return _RAW + data
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        if raw[:1] == _COMPRESSED:
+            return zlib.decompress(raw[1:]).decode("utf-8")
+        return raw[1:].decode("utf-8")
+
+    # API pública
+
+    def get(self, key: str) -> Optional[str]:
+        """Obtiene un valor, o None si no existe o ha expirado"""
+        raw = self._get_raw(key)
+        return None if raw is None else self._decode(raw)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """Guarda un valor con un TTL en segundos (por defecto, `default_ttl`)"""
+        self._set_raw(key, self._encode(value), ttl if ttl is not None else self.default_ttl)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], str],
+        ttl: Optional[float] = None,
+        lock_ttl: float = 60.0,
+        wait_timeout: float = 60.0,
+        poll_interval: float = 0.05,
+    ) -> str:
+        """
+        Obtiene un valor o lo calcula una sola vez entre todos los procesos
+
+        Solo quien obtiene el cerrojo de la clave ejecuta `compute`; el resto
+        espera a que aparezca el valor. Si `compute` lanza una excepción, no se
+        guarda nada y la excepción se propaga.
+
+        Args:
+            key: Clave de la entrada
+            compute: Función que genera el valor
+            ttl: Segundos de vida de la entrada
+            lock_ttl: Expiración del cerrojo (por si el proceso que calcula muere)
+            wait_timeout: Espera máxima antes de calcular sin cerrojo
+            poll_interval: Intervalo de sondeo mientras se espera
+
+        Returns:
+            Valor almacenado o recién calculado
+        """
+        value = self._safe_get(key)
+        if value is not None:
+            return value
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            try:
+                locked = self._try_lock(key, token, lock_ttl)
+            except Exception:
+                # Backend no disponible: calcular sin caché
+                return compute()
+
+            if locked:
+                try:
+                    # Otro proceso pudo haberlo calculado mientras esperábamos
+                    value = self._safe_get(key)
+                    if value is None:
+                        value = compute()
+                        self._safe_set(key, value, ttl)
+                    return value
+                finally:
+                    try:
+                        self._unlock(key, token)
+                    except Exception:
+                        pass  # El cerrojo expirará solo
+
+            time.sleep(poll_interval)
+            value = self._safe_get(key)
+            if value is not None:
+                return value
+            if time.monotonic() >= deadline:
+                # El proceso con el cerrojo tarda demasiado: calcular sin esperar más
+                value = compute()
+                self._safe_set(key, value, ttl)
+                return value
+
+    def _safe_get(self, key: str) -> Optional[str]:
+        """`get` que trata los fallos del backend como ausencia de entrada"""
+        try:
+            return self.get(key)
+        except Exception:
+            return None
+
+    def _safe_set(self, key: str, value: str, ttl: Optional[float]):
+        """`set` que ignora los fallos del backend (la caché es opcional)"""
+        try:
+            self.set(key, value, ttl)
+        except Exception:
+            pass
@@ -0,0 +1,41 @@
+from typing import Optional
+from urllib.parse import urlparse
+
+from src.cache.base import CacheBackend
+from src.cache.memory_cache import MemoryCache
+
+
+def create_cache(url: Optional[str], default_ttl: Optional[float] = None) -> Optional[CacheBackend]:
+    """
+    Crea una caché a partir de una URL
+
+    Formatos:
+        - memory://
+        - sqlite:///ruta/relativa.sqlite3 o sqlite:////ruta/absoluta.sqlite3
+        - redis://[:password@]host:puerto/db
+
+    Returns:
+        La caché configurada, o None si la URL está vacía
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryCache(default_ttl=default_ttl)
+    if parsed.scheme == "sqlite":
+        from src.cache.sqlite_cache import SQLiteCache
+
+        path = parsed.path[1:] if parsed.path.startswith("/") else parsed.path
+        return SQLiteCache(path, default_ttl=default_ttl)
+    if parsed.scheme == "redis":
+        from src.cache.redis_cache import RedisCache
+
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisCache(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=db,
+            password=parsed.password,
+            default_ttl=default_ttl,
+        )
+    raise ValueError(f"URL de caché no soportada: {url}")
@@ -0,0 +1,50 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.cache.base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """Caché en memoria del proceso (no se comparte entre workers)"""
+
+    def __init__(self, default_ttl: Optional[float] = None, compress_min_size: int = 256):
+        super().__init__(default_ttl, compress_min_size)
+        self._entries: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._mutex = threading.Lock()
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        with self._mutex:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            return value
+
+    def _set_raw(self, key: str, value: bytes, ttl: Optional[float]):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._mutex:
+            self._entries[key] = (value, expires_at)
+
+    def delete(self, key: str):
+        with self._mutex:
+            self._entries.pop(key, None)
+
+    def _try_lock(self, key: str, token: str, ttl: float) -> bool:
+        now = time.time()
+        with self._mutex:
+            current = self._locks.get(key)
+            if current is not None and current[1] > now:
+                return False
+            self._locks[key] = (token, now + ttl)
+            return True
+
+    def _unlock(self, key: str, token: str):
+        with self._mutex:
+            current = self._locks.get(key)
+            if current is not None and current[0] == token:
+                del self._locks[key]
@@ -0,0 +1,139 @@
+"""
+Servidor mínimo compatible con Redis para desarrollo local y pruebas
+
+Implementa solo los comandos que usa RedisCache: PING, AUTH, SELECT, GET,
+SET (EX/PX/NX), DEL, EXISTS y FLUSHDB.
+
+Uso:
+    python -m src.cache.mini_redis --port 6379
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class _Store:
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if line[:1] != b"*":
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, bytes):
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+        elif isinstance(value, Exception):
+            self.wfile.write(b"-ERR %s\r\n" % str(value).encode("utf-8"))
+        else:
+            self.wfile.write(b"+%s\r\n" % str(value).encode("utf-8"))
+
+    def handle(self):
+        store: _Store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            command = args[0].upper()
+            with store.lock:
+                try:
+                    self._reply(self._dispatch(store, command, args[1:]))
+                except Exception as e:  # Errores de sintaxis del comando
+                    self._reply(e)
+            self.wfile.flush()
+
+    @staticmethod
+    def _dispatch(store: _Store, command: bytes, args):
+        if command == b"PING":
+            return "PONG"
+        if command in (b"AUTH", b"SELECT"):
+            return "OK"
+        if command == b"GET":
+            return store.get(args[0])
+        if command == b"SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+            if b"NX" in options and store.get(key) is not None:
+                return None
+            store.data[key] = (value, expires_at)
+            return "OK"
+        if command == b"DEL":
+            return sum(1 for key in args if store.data.pop(key, None) is not None)
+        if command == b"EXISTS":
+            return sum(1 for key in args if store.get(key) is not None)
+        if command == b"FLUSHDB":
+            store.data.clear()
+            return "OK"
+        raise ValueError(f"unknown command '{command.decode()}'")
+
+
+class MiniRedisServer(socketserver.ThreadingTCPServer):
+    """Servidor Redis en memoria; `port=0` elige un puerto libre"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "MiniRedisServer":
+        """Arranca el servidor en un hilo en segundo plano"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor mínimo compatible con Redis")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+    server = MiniRedisServer(args.host, args.port)
+    print(f"mini_redis escuchando en {args.host}:{server.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import socket
+import threading
+from typing import List, Optional, Union
+
+from src.cache.base import CacheBackend
+
+
+class RedisError(Exception):
+    """Error devuelto por el servidor Redis"""
+
+
+class RedisConnection:
+    """Cliente mínimo del protocolo RESP2 (sin dependencias externas)"""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Conexión cerrada por el servidor Redis")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count == -1:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Respuesta RESP desconocida: {line!r}")
+
+    def execute(self, *args):
+        """Envía un comando y devuelve la respuesta decodificada"""
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+
+class RedisCache(CacheBackend):
+    """
+    Caché en un servidor compatible con Redis
+
+    Mantiene una conexión persistente por hilo. Los cerrojos usan
+    `SET clave token NX PX ttl`.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        prefix: str = "thinkink:",
+        default_ttl: Optional[float] = None,
+        compress_min_size: int = 256,
+    ):
+        super().__init__(default_ttl, compress_min_size)
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _conn(self) -> RedisConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = RedisConnection(self.host, self.port, self.db, self.password)
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, *args):
+        try:
+            return self._conn().execute(*args)
+        except (ConnectionError, OSError):
+            # Reintentar una vez con una conexión nueva
+            self.close()
+            return self._conn().execute(*args)
+
+    @staticmethod
+    def _ttl_args(ttl: Optional[float]) -> List[Union[str, int]]:
+        return ["PX", max(int(ttl * 1000), 1)] if ttl is not None else []
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        return self._execute("GET", self.prefix + key)
+
+    def _set_raw(self, key: str, value: bytes, ttl: Optional[float]):
+        self._execute("SET", self.prefix + key, value, *self._ttl_args(ttl))
+
+    def delete(self, key: str):
+        self._execute("DEL", self.prefix + key)
+
+    def _try_lock(self, key: str, token: str, ttl: float) -> bool:
+        return self._execute("SET", f"{self.prefix}lock:{key}", token, "NX", *self._ttl_args(ttl)) == "OK"
+
+    def _unlock(self, key: str, token: str):
+        lock_key = f"{self.prefix}lock:{key}"
+        # Sin EVAL: la ventana entre GET y DEL es mínima y el cerrojo expira de todos modos
+        if self._execute("GET", lock_key) == token.encode("utf-8"):
+            self._execute("DEL", lock_key)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
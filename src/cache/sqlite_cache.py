@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from src.cache.base import CacheBackend
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Caché en un archivo SQLite compartido por varios procesos
+
+    Usa modo WAL para que las lecturas no bloqueen a las escrituras y una
+    tabla de cerrojos con expiración para la protección contra estampidas.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        default_ttl: Optional[float] = None,
+        compress_min_size: int = 256,
+        timeout: float = 30.0,
+    ):
+        super().__init__(default_ttl, compress_min_size)
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_locks ("
+                "key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Una conexión por hilo (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, time.time())
+            )
+            return None
+        return bytes(value)
+
+    def _set_raw(self, key: str, value: bytes, ttl: Optional[float]):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, sqlite3.Binary(value), expires_at),
+        )
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def _try_lock(self, key: str, token: str, ttl: float) -> bool:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + ttl),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def _unlock(self, key: str, token: str):
+        self._connection().execute("DELETE FROM cache_locks WHERE key = ? AND token = ?", (key, token))
+
+    def purge_expired(self) -> int:
+        """Elimina las entradas expiradas y devuelve cuántas se borraron"""
+        cursor = self._connection().execute(
+            "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
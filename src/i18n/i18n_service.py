@@ -1,23 +1,34 @@
 import json
 import os
-from typing import Dict, Any
+import threading
+from typing import Any, Dict, List, Optional
 
 class I18nService:
     """Servicio de internacionalización (i18n) para ThinkInk"""
     
     def __init__(self):
-        """Inicializa el servicio de traducciones"""
+        """Inicializa el servicio de traducciones (el archivo se lee en el primer uso)"""
         # Obtener ruta al archivo de traducciones
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        translations_file = os.path.join(current_dir, 'translations.json')
-        
-        # Cargar traducciones
-        with open(translations_file, 'r', encoding='utf-8') as f:
-            self.translations: Dict[str, Dict[str, str]] = json.load(f)
-        
-        # Idiomas disponibles
-        self.available_languages = list(self.translations.keys())
+        self.translations_file = os.path.join(current_dir, 'translations.json')
+        self._translations: Optional[Dict[str, Dict[str, str]]] = None
+        self._lock = threading.Lock()
         self.default_language = 'es'
+
+    @property
+    def translations(self) -> Dict[str, Dict[str, str]]:
+        """Traducciones por idioma (se cargan una vez, al primer acceso)"""
+        if self._translations is None:
+            with self._lock:
+                if self._translations is None:
+                    with open(self.translations_file, 'r', encoding='utf-8') as f:
+                        self._translations = json.load(f)
+        return self._translations
+
+    @property
+    def available_languages(self) -> List[str]:
+        """Idiomas disponibles"""
+        return list(self.translations.keys())
     
     def get(self, key: str, language: str = 'es') -> str:
         """
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ReaderAnswer:
+    id: str
+    reader_id: str
+    question_type: str
+    question: str
+    answer: str
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "reader_id": self.reader_id,
+            "question_type": self.question_type,
+            "question": self.question,
+            "answer": self.answer,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
+
+@dataclass
+class AnswerGrade:
+    answer_id: str
+    score: Optional[int] = None
+    feedback: str = ""
+    error: str = ""
+
+    def is_graded(self) -> bool:
+        return self.score is not None and not self.error
+
+    def to_dict(self):
+        return {
+            "answer_id": self.answer_id,
+            "score": self.score,
+            "feedback": self.feedback,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from typing import List
+
+from src.models.book import Book
+
+
+@dataclass
+class CatalogPage:
+    items: List[Book]
+    total: int
+    offset: int
+    limit: int
+
+    @property
+    def page(self) -> int:
+        """Número de página (desde 1)"""
+        return self.offset // self.limit + 1 if self.limit else 1
+
+    @property
+    def pages(self) -> int:
+        """Número total de páginas (al menos 1)"""
+        return max(1, -(-self.total // self.limit)) if self.limit else 1
+
+    @property
+    def has_previous(self) -> bool:
+        return self.offset > 0
+
+    @property
+    def has_next(self) -> bool:
+        return self.offset + len(self.items) < self.total
+
+    def to_dict(self):
+        return {
+            "items": [book.to_dict() for book in self.items],
+            "total": self.total,
+            "offset": self.offset,
+            "limit": self.limit,
+            "page": self.page,
+            "pages": self.pages,
+        }
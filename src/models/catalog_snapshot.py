@@ -0,0 +1,34 @@
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NoReturn, Optional
+
+from src.models.book import Book
+
+
+class CatalogSnapshot(list):
+    """
+    Versión inmutable del catálogo
+
+    Es una lista de solo lectura: quien la obtiene puede recorrerla sin
+    bloqueos aunque otra sesión modifique el catálogo, porque cada cambio
+    publica una lista nueva en lugar de modificar esta. Lleva su propio
+    índice por id, así que un id encontrado en `by_id` siempre está en la
+    instantánea y viceversa.
+    """
+
+    __slots__ = ("version", "by_id")
+
+    def __init__(self, books: Iterable[Book] = (), version: int = 0, by_id: Optional[Dict[int, Book]] = None):
+        super().__init__(books)
+        self.version = version
+        self.by_id: Mapping[int, Book] = MappingProxyType(
+            by_id if by_id is not None else {book.id: book for book in self}
+        )
+
+    def _read_only(self, *args, **kwargs) -> NoReturn:
+        raise TypeError("El catálogo es de solo lectura: usa BookService para modificarlo")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return type(self), (list(self), self.version)
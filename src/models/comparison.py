@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from src.models.book import Book
+
+
+def pair_key(first_id: int, second_id: int) -> Tuple[int, int]:
+    """Clave simétrica de un par de libros (A vs B == B vs A)"""
+    return (first_id, second_id) if first_id <= second_id else (second_id, first_id)
+
+
+@dataclass(frozen=True)
+class BookDigest:
+    book_id: int
+    genre: str
+    author: str
+    theme: str
+    year: int
+    decade: int
+    keywords: FrozenSet[str]
+
+
+@dataclass
+class PairOverlap:
+    same_genre: bool
+    same_author: bool
+    same_theme: bool
+    same_decade: bool
+    shared_keywords: List[str]
+    keyword_similarity: float
+    year_gap: int
+
+    @property
+    def score(self) -> float:
+        """Afinidad local del par (0-1)"""
+        flags = (self.same_genre, self.same_author, self.same_theme, self.same_decade)
+        return round(0.6 * sum(flags) / len(flags) + 0.4 * self.keyword_similarity, 3)
+
+    def to_dict(self):
+        return {
+            "same_genre": self.same_genre,
+            "same_author": self.same_author,
+            "same_theme": self.same_theme,
+            "same_decade": self.same_decade,
+            "shared_keywords": self.shared_keywords,
+            "keyword_similarity": self.keyword_similarity,
+            "year_gap": self.year_gap,
+            "score": self.score,
+        }
+
+
+@dataclass
+class ComparisonMatrix:
+    books: List[Book]
+    overlaps: Dict[Tuple[int, int], PairOverlap]
+    comparisons: Dict[Tuple[int, int], str] = field(default_factory=dict)
+
+    @property
+    def pairs(self) -> List[Tuple[int, int]]:
+        """Pares sin repetir, en el orden de los libros"""
+        ids = [book.id for book in self.books]
+        return [pair_key(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]]
+
+    @property
+    def missing(self) -> List[Tuple[int, int]]:
+        """Pares que aún no tienen comparación del modelo"""
+        return [pair for pair in self.pairs if pair not in self.comparisons]
+
+    def overlap(self, first_id: int, second_id: int) -> PairOverlap:
+        return self.overlaps[pair_key(first_id, second_id)]
+
+    def comparison(self, first_id: int, second_id: int) -> Optional[str]:
+        return self.comparisons.get(pair_key(first_id, second_id))
+
+    def scores(self) -> List[List[Optional[float]]]:
+        """Matriz de afinidad local (diagonal vacía), fila y columna por libro"""
+        return [
+            [None if a.id == b.id else self.overlap(a.id, b.id).score for b in self.books]
+            for a in self.books
+        ]
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class BookResult:
+    title: str
+    author: str
+    year: Optional[int] = None
+    genre: str = ""
+    reason: str = ""
+    catalog_id: Optional[int] = None
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "genre": self.genre,
+            "reason": self.reason,
+            "catalog_id": self.catalog_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
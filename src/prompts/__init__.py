@@ -0,0 +1,3 @@
+from src.prompts.prompt_templates import PromptTemplate, PromptRegistry, prompts, render_prompt
+
+__all__ = ['PromptTemplate', 'PromptRegistry', 'prompts', 'render_prompt']
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+# {{variable}} o {{> parcial}}
+_TAG_RE = re.compile(r"\{\{\s*(>)?\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+_MAX_PARTIAL_DEPTH = 5
+
+
+class PromptTemplate:
+    """Plantilla de prompt precompilada en segmentos literales y variables"""
+
+    def __init__(self, name: str, language: str, source: str):
+        """
+        Compila la plantilla una sola vez
+
+        Args:
+            name: Nombre de la operación (ej: 'get_book_summary')
+            language: Idioma de la plantilla
+            source: Texto de la plantilla con los parciales ya expandidos
+        """
+        self.name = name
+        self.language = language
+        self.source = source
+        self.hash = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        self._literals, self._fields = self._compile(source)
+
+    @staticmethod
+    def _compile(source: str) -> Tuple[List[str], List[str]]:
+        """Divide el texto en literales intercalados con nombres de variables"""
+        literals: List[str] = []
+        fields: List[str] = []
+        position = 0
+        for match in _TAG_RE.finditer(source):
+            literals.append(source[position:match.start()])
+            fields.append(match.group(2))
+            position = match.end()
+        literals.append(source[position:])
+        return literals, fields
+
+    @property
+    def fields(self) -> List[str]:
+        """Variables que espera la plantilla"""
+        return list(dict.fromkeys(self._fields))
+
+    def render(self, **context) -> str:
+        """
+        Renderiza la plantilla
+
+        Raises:
+            KeyError: Si falta alguna variable en el contexto
+        """
+        literals = self._literals
+        parts = [literals[0]]
+        for index, field in enumerate(self._fields, 1):
+            parts.append(str(context[field]))
+            parts.append(literals[index])
+        return "".join(parts)
+
+
+class PromptRegistry:
+    """Carga y cachea las plantillas de prompts por operación e idioma"""
+
+    def __init__(self, templates_dir: str = None, default_language: str = "es"):
+        """
+        Args:
+            templates_dir: Carpeta con una subcarpeta por idioma
+                           (por defecto, `templates/` junto a este módulo)
+            default_language: Idioma usado cuando no existe la plantilla pedida
+        """
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.templates_dir = templates_dir or os.path.join(current_dir, "templates")
+        self.default_language = default_language
+        self._templates: Dict[Tuple[str, str], PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def _find_file(self, language: str, *parts: str) -> str:
+        """Busca un archivo en el idioma pedido o en el idioma por defecto"""
+        for lang in (language, self.default_language):
+            path = os.path.join(self.templates_dir, lang, *parts)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"Plantilla no encontrada: {'/'.join(parts)} ({language})")
+
+    def _read(self, language: str, *parts: str) -> str:
+        with open(self._find_file(language, *parts), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _expand_partials(self, source: str, language: str, depth: int = 0) -> str:
+        """Sustituye los parciales {{> nombre}} por su contenido"""
+        if depth > _MAX_PARTIAL_DEPTH:
+            raise ValueError("Demasiados niveles de parciales anidados")
+
+        def replace(match):
+            if not match.group(1):
+                return match.group(0)
+            partial = self._read(language, "partials", f"{match.group(2)}.txt").rstrip("\n")
+            return self._expand_partials(partial, language, depth + 1)
+
+        return _TAG_RE.sub(replace, source)
+
+    def get(self, name: str, language: str = "es") -> PromptTemplate:
+        """
+        Obtiene la plantilla compilada de una operación
+
+        Args:
+            name: Nombre de la operación
+            language: Código de idioma ('es' o 'en')
+
+        Returns:
+            Plantilla compilada (se compila solo la primera vez)
+        """
+        key = (name, language)
+        template = self._templates.get(key)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    source = self._expand_partials(self._read(language, f"{name}.txt"), language)
+                    template = PromptTemplate(name, language, source)
+                    self._templates[key] = template
+        return template
+
+    def render(self, name: str, language: str = "es", /, **context) -> str:
+        """Renderiza la plantilla de una operación"""
+        return self.get(name, language).render(**context)
+
+    def template_hash(self, name: str, language: str = "es") -> str:
+        """Hash estable del texto de la plantilla, útil como parte de claves de caché"""
+        return self.get(name, language).hash
+
+    def clear(self):
+        """Descarta las plantillas compiladas (ej: tras editar los archivos)"""
+        with self._lock:
+            self._templates.clear()
+
+
+# Instancia global para usar en toda la app
+prompts = PromptRegistry()
+
+
+def render_prompt(name: str, lang: str = 'es', /, **context) -> str:
+    """
+    Función abreviada para renderizar un prompt
+
+    Uso:
+    from src.prompts import render_prompt
+
+    prompt = render_prompt('get_book_summary', 'es', title='1984', ...)
+    """
+    return prompts.render(name, lang, **context)
@@ -0,0 +1,684 @@
+"""
+API HTTP/JSON sin interfaz
+
+Expone las consultas del catálogo (`BookService`), los análisis de Gemini
+ya generados y la calificación de respuestas para integraciones (ej: un
+LMS), sin pasar por los reruns de Streamlit. Usa los mismos servicios que
+la app: el catálogo con sus índices e instantáneas, la caché de respuestas
+y la cola de trabajos.
+
+El servidor es asyncio de la biblioteca estándar, con conexiones
+persistentes (keep-alive), compresión gzip y ETags. Las respuestas del
+catálogo llevan un ETag derivado de la versión del catálogo, así que una
+consulta repetida se responde con 304 (o desde las respuestas ya
+serializadas) sin volver a calcularse.
+
+Uso:
+    python -m src.services.api_server --port 8600
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.models.book import Book
+from src.services.request_scheduler import Priority, scheduling
+from config.settings import (
+    API_GZIP_MIN_BYTES,
+    API_HOST,
+    API_KEEPALIVE_SECONDS,
+    API_LANGS,
+    API_MAX_BODY_BYTES,
+    API_MAX_PAGE_SIZE,
+    API_PORT,
+    API_RESPONSE_CACHE_SIZE,
+    CATALOG_PAGE_SIZE,
+    GEMINI_EXPORT_OPERATIONS,
+)
+
+_MAX_HEADERS = 100
+_LATENCY_WINDOW = 1000
+
+
+class ApiError(Exception):
+    """Error que se devuelve al cliente con su código HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    method: str
+    target: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+    params: Dict[str, str] = field(default_factory=dict)
+    # Dirección del cliente: cada uno es una sesión del planificador de Gemini
+    client: str = ""
+
+    def __post_init__(self):
+        parts = urlsplit(self.target)
+        self.path = unquote(parts.path) or "/"
+        self.query: Dict[str, List[str]] = parse_qs(parts.query)
+
+    @property
+    def session_id(self) -> str:
+        return f"api:{self.client or 'local'}"
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def arg(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_arg(self, name: str, default: Optional[int] = None, minimum: Optional[int] = None,
+                maximum: Optional[int] = None) -> Optional[int]:
+        value = self.arg(name)
+        if value is None or value == "":
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ApiError(400, f"{name} debe ser un entero")
+        if minimum is not None and number < minimum:
+            raise ApiError(400, f"{name} debe ser >= {minimum}")
+        return min(number, maximum) if maximum is not None else number
+
+    def prefixed(self, prefix: str) -> Dict[str, str]:
+        """Parámetros con prefijo (ej: facet.genre=novela -> {"genre": "novela"})"""
+        return {name[len(prefix):]: values[0] for name, values in self.query.items()
+                if name.startswith(prefix) and values}
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body.decode("utf-8") or "null")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ApiError(400, "El cuerpo no es JSON válido")
+
+    def accepts_gzip(self) -> bool:
+        for item in self.headers.get("accept-encoding", "").split(","):
+            name, _, params = item.strip().partition(";")
+            if name.strip().lower() in ("gzip", "*"):
+                return params.replace(" ", "").lower() not in ("q=0", "q=0.0")
+        return False
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "application/json; charset=utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+    _gzipped: Optional[bytes] = field(default=None, repr=False)
+
+    def gzipped(self) -> bytes:
+        """Cuerpo comprimido (se calcula una vez: las respuestas cacheadas no se recomprimen)"""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=5, mtime=0)
+        return self._gzipped
+
+
+def json_response(data: Any, status: int = 200, **headers: str) -> Response:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(status=status, body=body, headers=dict(headers))
+
+
+@dataclass
+class Route:
+    method: str
+    pattern: re.Pattern
+    handler: Callable[[Request], Response]
+    # Versión de los datos de la respuesta: con ella el ETag se conoce antes de calcularla
+    version: Optional[Callable[[Request], str]] = None
+    # Llamadas que pueden bloquear (Gemini, SQLite, recorridos y carga del
+    # catálogo) van a un hilo, con prioridad BATCH y la sesión del cliente
+    blocking: bool = False
+    etag: bool = True
+
+
+class ApiMetrics:
+    """Contadores del servidor para /metrics (solo se actualizan desde el bucle de eventos)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.connections = 0
+        self.open_connections = 0
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.gzipped = 0
+        self.bytes_sent = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def record(self, status: int, latency: float):
+        self.requests += 1
+        self.statuses[status] += 1
+        self._latencies.append(latency)
+
+    def to_dict(self) -> Dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] if latencies else 0.0
+
+        uptime = time.time() - self.started_at
+        return {
+            "uptime_seconds": uptime,
+            "connections": self.connections,
+            "open_connections": self.open_connections,
+            "requests": self.requests,
+            "requests_per_connection": self.requests / self.connections if self.connections else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "not_modified": self.not_modified,
+            "response_cache_hits": self.cache_hits,
+            "gzipped": self.gzipped,
+            "bytes_sent": self.bytes_sent,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+        }
+
+
+class ApiApp:
+    """Rutas de la API sobre los servicios compartidos de la app"""
+
+    def __init__(
+        self,
+        book_service_factory: Optional[Callable[[str], Any]] = None,
+        gemini_service=None,
+        job_queue=None,
+        operations=GEMINI_EXPORT_OPERATIONS,
+        langs=API_LANGS,
+        gzip_min_bytes: int = API_GZIP_MIN_BYTES,
+        cache_size: int = API_RESPONSE_CACHE_SIZE,
+        max_page_size: int = API_MAX_PAGE_SIZE,
+    ):
+        """
+        Args:
+            book_service_factory: Función idioma -> BookService (por defecto, uno por idioma)
+            gemini_service: GeminiService (por defecto se crea al primer uso)
+            job_queue: Cola de trabajos (por defecto, la del proceso)
+            operations: Análisis por libro que se pueden consultar y encolar
+            langs: Idiomas (catálogos) expuestos
+            gzip_min_bytes: Tamaño mínimo de respuesta para comprimirla
+            cache_size: Respuestas serializadas que se conservan por ETag
+            max_page_size: Libros máximos por página
+        """
+        self.operations = tuple(operations)
+        self.langs = tuple(langs)
+        self.gzip_min_bytes = gzip_min_bytes
+        self.max_page_size = max_page_size
+        self.metrics = ApiMetrics()
+        self._book_service_factory = book_service_factory
+        self._book_services: Dict[str, Any] = {}
+        self._gemini_service = gemini_service
+        self._job_queue = job_queue
+        self._services_lock = threading.Lock()
+        self._cache_size = cache_size
+        self._responses: "OrderedDict[str, Response]" = OrderedDict()
+        self._routes: List[Route] = []
+
+        catalog_version = self._catalog_version
+        self._add("GET", r"/health", self._health, etag=False)
+        self._add("GET", r"/metrics", self._metrics, etag=False)
+        # La primera consulta de un idioma carga su catálogo: también la versión se calcula en un hilo
+        self._add("GET", r"/books", self._books, version=catalog_version, blocking=True)
+        self._add("GET", r"/books/(?P<book_id>-?\d+)", self._book, version=catalog_version, blocking=True)
+        self._add("GET", r"/facets/(?P<facet>\w+)", self._facets, version=catalog_version, blocking=True)
+        self._add("GET", r"/authors", self._author, version=catalog_version, blocking=True)
+        self._add("GET", r"/books/(?P<book_id>-?\d+)/analyses/(?P<operation>\w+)", self._analysis, blocking=True)
+        self._add("POST", r"/books/(?P<book_id>-?\d+)/analyses/(?P<operation>\w+)", self._submit_analysis,
+                  blocking=True)
+        self._add("GET", r"/jobs/(?P<job_id>\w+)", self._job, blocking=True, etag=False)
+        self._add("POST", r"/books/(?P<book_id>-?\d+)/answers", self._grade_answers, blocking=True)
+
+    def _add(self, method: str, pattern: str, handler: Callable[[Request], Response], **options):
+        self._routes.append(Route(method, re.compile(pattern + r"/?\Z"), handler, **options))
+
+    # --- Servicios compartidos ---
+
+    def book_service(self, lang: str):
+        if lang not in self.langs:
+            raise ApiError(400, f"Idioma no disponible: {lang}")
+        service = self._book_services.get(lang)
+        if service is None:
+            with self._services_lock:
+                service = self._book_services.get(lang)
+                if service is None:
+                    if self._book_service_factory is not None:
+                        service = self._book_service_factory(lang)
+                    else:
+                        from src.services.book_service import BookService
+
+                        service = BookService(lang=lang)
+                    self._book_services[lang] = service
+        return service
+
+    @property
+    def gemini_service(self):
+        if self._gemini_service is None:
+            with self._services_lock:
+                if self._gemini_service is None:
+                    from src.services.gemini_service import GeminiService
+
+                    self._gemini_service = GeminiService()
+        return self._gemini_service
+
+    @property
+    def job_queue(self):
+        if self._job_queue is None:
+            from src.services.job_queue import get_job_queue
+
+            self._job_queue = get_job_queue(self.gemini_service)
+        return self._job_queue
+
+    # --- Despacho ---
+
+    def _match(self, request: Request) -> Tuple[Route, Dict[str, str]]:
+        method = "GET" if request.method == "HEAD" else request.method
+        allowed = False
+        for route in self._routes:
+            match = route.pattern.match(request.path)
+            if match is None:
+                continue
+            if route.method == method:
+                return route, match.groupdict()
+            allowed = True
+        if allowed:
+            raise ApiError(405, "Método no permitido")
+        raise ApiError(404, "Ruta no encontrada")
+
+    async def handle(self, request: Request) -> Response:
+        """Resuelve una petición (los errores se convierten en respuestas JSON)"""
+        started = time.perf_counter()
+        try:
+            response = await self._dispatch(request)
+        except ApiError as e:
+            response = json_response({"error": e.message}, e.status)
+        except Exception as e:
+            response = json_response({"error": f"{type(e).__name__}: {e}"}, 500)
+        self.metrics.record(response.status, time.perf_counter() - started)
+        return response
+
+    async def _dispatch(self, request: Request) -> Response:
+        route, request.params = self._match(request)
+        cacheable = route.etag and route.method == "GET"
+        if not cacheable:
+            response = await self._call(route, request)
+            response.headers.setdefault("Cache-Control", "no-store")
+            return response
+
+        etag = None
+        if route.version is not None:
+            version = await self._run(route, route.version, request)
+            token = f"{version}|{request.path}?{urlsplit(request.target).query}"
+            etag = 'W/"' + hashlib.sha1(token.encode("utf-8")).hexdigest()[:20] + '"'
+            if self._not_modified(request, etag):
+                return self._response_304(etag)
+            cached = self._responses.get(etag)
+            if cached is not None:
+                self._responses.move_to_end(etag)
+                self.metrics.cache_hits += 1
+                return cached
+
+        response = await self._call(route, request)
+        if response.status != 200:
+            return response
+        if etag is None:
+            etag = '"' + hashlib.sha1(response.body).hexdigest()[:20] + '"'
+            if self._not_modified(request, etag):
+                return self._response_304(etag)
+        response.headers["ETag"] = etag
+        response.headers.setdefault("Cache-Control", "no-cache")
+        if route.version is not None and self._cache_size > 0:
+            self._responses[etag] = response
+            if len(self._responses) > self._cache_size:
+                self._responses.popitem(last=False)
+        return response
+
+    async def _call(self, route: Route, request: Request) -> Response:
+        return await self._run(route, route.handler, request)
+
+    async def _run(self, route: Route, fn: Callable[[Request], Any], request: Request) -> Any:
+        """Ejecuta `fn` en el bucle o, si la ruta puede bloquear, en un hilo"""
+        if not route.blocking:
+            return fn(request)
+
+        def run():
+            # Las peticiones de la API son trabajo de fondo frente a la interfaz
+            with scheduling(Priority.BATCH, session_id=request.session_id):
+                return fn(request)
+
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        tags = {tag.strip() for tag in header.split(",")}
+        return "*" in tags or etag in tags
+
+    def _response_304(self, etag: str) -> Response:
+        self.metrics.not_modified += 1
+        return Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    def serialize(self, request: Request, response: Response, keep_alive: bool) -> bytes:
+        """Respuesta HTTP/1.1 completa, comprimida si el cliente lo acepta y compensa"""
+        body = response.body
+        headers = {"Content-Type": response.content_type, **response.headers}
+        if response.status != 304 and body:
+            headers["Vary"] = "Accept-Encoding"
+            if len(body) >= self.gzip_min_bytes and request.accepts_gzip():
+                body = response.gzipped()
+                headers["Content-Encoding"] = "gzip"
+                self.metrics.gzipped += 1
+        if response.status == 304:
+            headers.pop("Content-Type", None)
+            body = b""
+        headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        if request.method == "HEAD":
+            body = b""
+        reason = HTTPStatus(response.status).phrase
+        head = f"HTTP/1.1 {response.status} {reason}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        data = head.encode("latin-1") + b"\r\n" + body
+        self.metrics.bytes_sent += len(data)
+        return data
+
+    # --- Utilidades de las rutas ---
+
+    def _catalog_version(self, request: Request) -> str:
+        lang = request.arg("lang", "es")
+        return f"{lang}:{self.book_service(lang).version}"
+
+    def _lang(self, request: Request) -> str:
+        lang = request.arg("lang", "es")
+        if lang not in self.langs:
+            raise ApiError(400, f"Idioma no disponible: {lang}")
+        return lang
+
+    def _get_book(self, request: Request) -> Tuple[Book, str]:
+        lang = self._lang(request)
+        book = self.book_service(lang).get_book_by_id(int(request.params["book_id"]))
+        if book is None:
+            raise ApiError(404, "Libro no encontrado")
+        return book, lang
+
+    def _operation(self, request: Request) -> str:
+        operation = request.params["operation"]
+        if operation not in self.operations:
+            raise ApiError(404, f"Análisis no disponible: {operation}")
+        return operation
+
+    # --- Rutas ---
+
+    def _health(self, request: Request) -> Response:
+        versions = {lang: service.version for lang, service in self._book_services.items()}
+        return json_response({"status": "ok", "catalog_versions": versions})
+
+    def _metrics(self, request: Request) -> Response:
+        from src.services.telemetry import get_telemetry
+
+        return json_response({"server": self.metrics.to_dict(), "gemini": get_telemetry().stats()})
+
+    def _books(self, request: Request) -> Response:
+        lang = self._lang(request)
+        service = self.book_service(lang)
+        try:
+            page = service.query_books(
+                offset=request.int_arg("offset", 0, minimum=0),
+                limit=request.int_arg("limit", CATALOG_PAGE_SIZE, minimum=1, maximum=self.max_page_size),
+                text=request.arg("text", ""),
+                genre=request.arg("genre"),
+                author=request.arg("author"),
+                year_min=request.int_arg("year_min"),
+                year_max=request.int_arg("year_max"),
+                sort_by=request.arg("sort_by", "title"),
+                descending=request.arg("descending", "").lower() in ("1", "true", "yes"),
+                facets=request.prefixed("facet."),
+            )
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return json_response({**page.to_dict(), "version": service.version})
+
+    def _book(self, request: Request) -> Response:
+        book, _ = self._get_book(request)
+        return json_response(book.to_dict())
+
+    def _facets(self, request: Request) -> Response:
+        lang = self._lang(request)
+        try:
+            counts = self.book_service(lang).facets.counts(request.params["facet"], request.prefixed("facet."))
+        except ValueError as e:
+            raise ApiError(404, str(e))
+        return json_response([{"key": key, "label": label, "count": count} for key, label, count in counts])
+
+    def _author(self, request: Request) -> Response:
+        lang = self._lang(request)
+        name = request.arg("name", "")
+        service = self.book_service(lang)
+        entry = service.authors.lookup(name) if name else None
+        if entry is None:
+            raise ApiError(404, "Autor no encontrado en el catálogo")
+        return json_response({
+            "name": entry.name,
+            "bio": entry.bio,
+            "books": [book.to_dict() for book in service.get_books_by_author(name)],
+        })
+
+    def _analysis(self, request: Request) -> Response:
+        """Análisis ya generado: de la caché de respuestas o de un trabajo terminado"""
+        from src.services.job_queue import DONE, book_payload
+
+        book, lang = self._get_book(request)
+        operation = self._operation(request)
+        text = self.gemini_service.cached_for_book(operation, book, lang)
+        if text is None:
+            job = self.job_queue.find(operation, book_payload(book, lang))
+            if job is None or job.status != DONE:
+                return json_response({
+                    "error": "Análisis no generado todavía (POST para encolarlo)",
+                    "status": job.status if job else None,
+                    "job_id": job.id if job else None,
+                }, 404)
+            text = job.result
+        return json_response({"book_id": book.id, "operation": operation, "lang": lang, "text": text})
+
+    def _submit_analysis(self, request: Request) -> Response:
+        """Encola un análisis en la cola de trabajos (o devuelve el trabajo idéntico existente)"""
+        from src.services.job_queue import book_payload
+
+        book, lang = self._get_book(request)
+        operation = self._operation(request)
+        job_id = self.job_queue.submit(
+            operation, book_payload(book, lang), priority=Priority.BATCH, session_id=request.session_id
+        )
+        return json_response({"job_id": job_id}, 202, Location=f"/jobs/{job_id}")
+
+    def _job(self, request: Request) -> Response:
+        job = self.job_queue.get(request.params["job_id"])
+        if job is None:
+            raise ApiError(404, "Trabajo no encontrado")
+        return json_response({"id": job.id, "operation": job.operation, "status": job.status,
+                              "result": job.result, "error": job.error})
+
+    def _grade_answers(self, request: Request) -> Response:
+        """
+        Califica respuestas de un lector
+
+        Cuerpo: {"reader_id": "...", "question_type": "pre"|"post",
+                 "answers": {"1": "respuesta", ...}} (índices desde 1)
+        """
+        from src.services.question_service import QuestionService
+
+        book, lang = self._get_book(request)
+        data = request.json()
+        if not isinstance(data, dict) or not isinstance(data.get("answers"), dict):
+            raise ApiError(400, "Se espera {\"answers\": {\"1\": \"...\"}}")
+        question_type = data.get("question_type", "post")
+        if question_type not in ("pre", "post"):
+            raise ApiError(400, "question_type debe ser \"pre\" o \"post\"")
+        try:
+            answers = {int(index): str(text) for index, text in data["answers"].items()}
+        except ValueError:
+            raise ApiError(400, "Los índices de las respuestas deben ser enteros")
+        reader_answers = QuestionService.build_reader_answers(
+            book, answers, question_type, str(data.get("reader_id") or "anon")
+        )
+        if not reader_answers:
+            raise ApiError(400, "No hay respuestas que calificar")
+        grades = self.gemini_service.grade_answers(book, reader_answers, lang)
+        return json_response({
+            "answers": [answer.to_dict() for answer in reader_answers],
+            "grades": [grade.to_dict() for grade in grades],
+        })
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = API_MAX_BODY_BYTES) -> Optional[Request]:
+    """
+    Lee una petición HTTP/1.x
+
+    Returns:
+        La petición, o None si el cliente cerró la conexión
+
+    Raises:
+        ApiError: Si la petición está mal formada o es demasiado grande
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "Línea de petición no válida")
+    if not version.startswith("HTTP/1."):
+        raise ApiError(505, "Versión HTTP no soportada")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= _MAX_HEADERS:
+            raise ApiError(431, "Demasiadas cabeceras")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise ApiError(501, "Transfer-Encoding no soportado (usa Content-Length)")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise ApiError(400, "Content-Length no válido")
+    if length > max_body:
+        raise ApiError(413, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return Request(method.upper(), target, headers, body, version)
+
+
+class ApiServer:
+    """Servidor asyncio con conexiones persistentes sobre una `ApiApp`"""
+
+    def __init__(self, app: ApiApp, host: str = API_HOST, port: int = API_PORT,
+                 keepalive: float = API_KEEPALIVE_SECONDS):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "ApiServer":
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        # Con port=0 el sistema elige uno libre
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        metrics = self.app.metrics
+        peer = writer.get_extra_info("peername")
+        client = str(peer[0]) if isinstance(peer, tuple) else ""
+        metrics.connections += 1
+        metrics.open_connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    break
+                except ApiError as e:
+                    bad = Request("GET", "/", {"connection": "close"})
+                    writer.write(self.app.serialize(bad, json_response({"error": e.message}, e.status), False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                request.client = client
+                response = await self.app.handle(request)
+                keep_alive = request.keep_alive
+                writer.write(self.app.serialize(request, response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            metrics.open_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON del catálogo y los análisis")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = await ApiServer(ApiApp(), args.host, args.port).start()
+        print(f"API en http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
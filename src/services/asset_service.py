@@ -0,0 +1,193 @@
+import hashlib
+import html
+import io
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+from config.settings import IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_WIDTHS, LANDING_IMAGE, STATIC_DIR
+
+MIME_TYPES = {"webp": "image/webp", "png": "image/png", "jpeg": "image/jpeg"}
+
+
+@dataclass
+class ImageVariant:
+    width: int
+    height: int
+    fmt: str
+    data: bytes
+    file_name: str
+
+    @property
+    def mime(self) -> str:
+        return MIME_TYPES[self.fmt]
+
+
+def _source_fingerprint(path: Path) -> str:
+    """Cambia cuando cambia el archivo de origen (invalida las variantes)"""
+    stat = path.stat()
+    return hashlib.sha256(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:10]
+
+
+def _encode(image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=80, method=4)
+    elif fmt == "png":
+        image.save(buffer, "PNG", compress_level=6)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build_variants(
+    path: Union[str, Path],
+    widths: Sequence[int] = IMAGE_VARIANT_WIDTHS,
+    formats: Sequence[str] = IMAGE_VARIANT_FORMATS,
+) -> List[ImageVariant]:
+    """
+    Genera variantes redimensionadas y comprimidas de una imagen
+
+    Las anchuras mayores que el original se limitan a su anchura real.
+
+    Returns:
+        Variantes ordenadas por formato y anchura
+    """
+    from PIL import Image
+
+    path = Path(path)
+    fingerprint = _source_fingerprint(path)
+    variants = []
+    with Image.open(path) as original:
+        original.load()
+        sizes = sorted({min(width, original.width) for width in widths})
+        for width in sizes:
+            height = round(original.height * width / original.width)
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                variants.append(ImageVariant(
+                    width=width,
+                    height=height,
+                    fmt=fmt,
+                    data=_encode(resized, fmt),
+                    file_name=f"{path.stem}-{fingerprint}-{width}.{fmt}",
+                ))
+    return variants
+
+
+_cache: Dict[Tuple[str, Tuple[int, ...], Tuple[str, ...]], List[ImageVariant]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_variants(
+    path: Union[str, Path] = LANDING_IMAGE,
+    widths: Sequence[int] = IMAGE_VARIANT_WIDTHS,
+    formats: Sequence[str] = IMAGE_VARIANT_FORMATS,
+    static_dir: Path = STATIC_DIR,
+) -> List[ImageVariant]:
+    """
+    Variantes de una imagen, generadas una vez por proceso y guardadas en memoria
+
+    La primera vez se leen de `static_dir` si ya se generaron (en el build o
+    en otro proceso); si no, se generan y se escriben allí para servirlas como
+    archivos estáticos.
+    """
+    path = Path(path)
+    key = (str(path.resolve()), tuple(widths), tuple(formats))
+    with _cache_lock:
+        variants = _cache.get(key)
+        if variants is None:
+            variants = _load_or_build(path, widths, formats, Path(static_dir))
+            _cache[key] = variants
+    return variants
+
+
+def _load_or_build(path: Path, widths: Sequence[int], formats: Sequence[str], static_dir: Path) -> List[ImageVariant]:
+    variants = _load_from_static(path, widths, formats, static_dir) if static_dir.is_dir() else None
+    if variants is None:
+        variants = build_variants(path, widths, formats)
+    try:
+        static_dir.mkdir(parents=True, exist_ok=True)
+        for variant in variants:
+            target = static_dir / variant.file_name
+            if not target.exists():
+                target.write_bytes(variant.data)
+    except OSError:
+        # Sin permisos de escritura: las variantes siguen disponibles en memoria
+        pass
+    return variants
+
+
+def _load_from_static(path: Path, widths: Sequence[int], formats: Sequence[str], static_dir: Path):
+    from PIL import Image
+
+    fingerprint = _source_fingerprint(path)
+    with Image.open(path) as original:
+        original_size = original.size
+    variants = []
+    for width in sorted({min(w, original_size[0]) for w in widths}):
+        height = round(original_size[1] * width / original_size[0])
+        for fmt in formats:
+            file_name = f"{path.stem}-{fingerprint}-{width}.{fmt}"
+            target = static_dir / file_name
+            if not target.is_file():
+                return None
+            variants.append(ImageVariant(width, height, fmt, target.read_bytes(), file_name))
+    return variants
+
+
+def picture_html(
+    variants: List[ImageVariant],
+    alt: str = "",
+    sizes: str = "(max-width: 640px) 100vw, 50vw",
+    base_url: str = "app/static",
+) -> str:
+    """
+    Etiqueta <picture> con srcset por formato
+
+    El navegador elige la anchura según el viewport (`sizes`) y el primer
+    formato que soporte; el último formato sirve de <img> de compatibilidad.
+    """
+    by_format: Dict[str, List[ImageVariant]] = {}
+    for variant in variants:
+        by_format.setdefault(variant.fmt, []).append(variant)
+    formats = list(by_format)
+
+    def srcset(items: List[ImageVariant]) -> str:
+        return ", ".join(f"{base_url}/{v.file_name} {v.width}w" for v in items)
+
+    sources = "".join(
+        f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset(by_format[fmt])}" sizes="{sizes}">'
+        for fmt in formats[:-1]
+    )
+    fallback = by_format[formats[-1]]
+    largest = fallback[-1]
+    return (
+        f"<picture>{sources}"
+        f'<img src="{base_url}/{fallback[0].file_name}" srcset="{srcset(fallback)}" sizes="{sizes}" '
+        f'width="{largest.width}" height="{largest.height}" alt="{html.escape(alt)}" '
+        f'style="width: 100%; height: auto;" loading="eager" decoding="async">'
+        f"</picture>"
+    )
+
+
+def pick_variant(variants: List[ImageVariant], width: int, fmt: str) -> ImageVariant:
+    """Variante más pequeña de un formato que cubre `width` (o la mayor disponible)"""
+    candidates = [v for v in variants if v.fmt == fmt] or variants
+    for variant in candidates:
+        if variant.width >= width:
+            return variant
+    return candidates[-1]
+
+
+def main():
+    """Genera las variantes de la portada en STATIC_DIR (paso de build opcional)"""
+    variants = get_variants()
+    for variant in variants:
+        print(f"{STATIC_DIR / variant.file_name}  {variant.width}px  {len(variant.data) // 1024} KB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
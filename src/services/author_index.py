@@ -0,0 +1,203 @@
+"""
+Índice de autores del catálogo
+
+Agrupa los libros por autor con nombres normalizados (sin tildes ni
+mayúsculas, "Apellido, Nombre" reordenado) y alias ("Tolkien" para
+"J. R. R. Tolkien", "García Márquez" para "Gabriel García Márquez"), de
+modo que una búsqueda por autor se pueda responder sin consultar a Gemini.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.models.book import Book
+from src.services.catalog_events import ADDED, DELETED, UPDATED, CatalogEvent
+from src.services.query_similarity import SemanticQueryIndex, fold_accents, normalize_query
+from config.settings import AUTHOR_MATCH_THRESHOLD
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_NAMESPACE = "authors"
+
+
+def normalize_author(name: str) -> str:
+    """
+    Clave normalizada de un autor
+
+    "García Márquez, Gabriel" y "gabriel garcia marquez" dan la misma clave.
+    """
+    name = (name or "").strip()
+    if name.count(",") == 1:
+        last, first = name.split(",")
+        name = f"{first} {last}"
+    folded = _NON_WORD_RE.sub(" ", fold_accents(name).casefold())
+    return " ".join(folded.split())
+
+
+def author_aliases(key: str) -> Set[str]:
+    """Formas abreviadas con las que se suele buscar a un autor (sin la clave completa)"""
+    words = key.split()
+    aliases = set()
+    without_initials = [w for w in words if len(w) > 1]
+    if without_initials and len(without_initials) < len(words):
+        aliases.add(" ".join(without_initials))
+    if len(without_initials) >= 2:
+        # Apellido, y apellidos compuestos ("garcia marquez")
+        aliases.add(without_initials[-1])
+        if len(without_initials) >= 3:
+            aliases.add(" ".join(without_initials[-2:]))
+    aliases.discard(key)
+    return aliases
+
+
+def merge_bios(bios: Iterable[str]) -> str:
+    """Une las biografías distintas de un autor, descartando las repetidas o contenidas en otra"""
+    kept: List[str] = []
+    seen: List[str] = []
+    for bio in sorted({b.strip() for b in bios if b and b.strip()}, key=len, reverse=True):
+        normalized = normalize_query(bio)
+        if any(normalized in other for other in seen):
+            continue
+        seen.append(normalized)
+        kept.append(bio)
+    return "\n\n".join(kept)
+
+
+@dataclass
+class AuthorEntry:
+    key: str
+    book_ids: List[int] = field(default_factory=list)
+    spellings: Counter = field(default_factory=Counter)
+    bios: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        """Forma del nombre más usada en el catálogo"""
+        return self.spellings.most_common(1)[0][0] if self.spellings else self.key
+
+    @property
+    def bio(self) -> str:
+        return merge_bios(self.bios)
+
+
+class AuthorIndex:
+    """Autores del catálogo con sus libros, alias y biografía unificada"""
+
+    def __init__(self, books: Iterable[Book] = (), threshold: float = AUTHOR_MATCH_THRESHOLD):
+        """
+        Args:
+            books: Libros iniciales
+            threshold: Similitud mínima (0-1) para aceptar un nombre mal escrito
+        """
+        self.threshold = threshold
+        self._entries: Dict[str, AuthorEntry] = {}
+        self._aliases: Dict[str, Set[str]] = {}
+        self._fuzzy: Optional[SemanticQueryIndex] = None
+        # Lo que aportó cada libro, para poder quitarlo sin el objeto original
+        self._by_book: Dict[int, Tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+        self._shared = False
+        for book in books:
+            self.add(book)
+        # A partir de aquí otras sesiones pueden estar leyendo: se copia antes de modificar
+        self._shared = True
+
+    def add(self, book: Book):
+        """Añade un libro a la entrada de su autor (no hace nada si ya está)"""
+        key = normalize_author(book.author)
+        if not key or book.id in self._by_book:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = AuthorEntry(key)
+            for alias in author_aliases(key):
+                self._aliases[alias] = self._aliases.get(alias, set()) | {key}
+            with self._lock:
+                if self._fuzzy is not None:
+                    self._fuzzy.add(_NAMESPACE, key)
+        spelling = book.author.strip()
+        if self._shared:
+            book_ids, spellings, bios = list(entry.book_ids), Counter(entry.spellings), list(entry.bios)
+        else:
+            book_ids, spellings, bios = entry.book_ids, entry.spellings, entry.bios
+        insort(book_ids, book.id)
+        spellings[spelling] += 1
+        if book.author_bio:
+            bios.append(book.author_bio)
+        entry.book_ids, entry.spellings, entry.bios = book_ids, spellings, bios
+        self._by_book[book.id] = (key, spelling, book.author_bio)
+
+    def remove(self, book_id: int):
+        """Quita un libro de la entrada de su autor (y el autor, si era su único libro)"""
+        contribution = self._by_book.pop(book_id, None)
+        if contribution is None:
+            return
+        key, spelling, bio = contribution
+        entry = self._entries[key]
+        book_ids, spellings, bios = list(entry.book_ids), Counter(entry.spellings), list(entry.bios)
+        del book_ids[bisect_left(book_ids, book_id)]
+        spellings[spelling] -= 1
+        if spellings[spelling] <= 0:
+            del spellings[spelling]
+        if bio:
+            bios.remove(bio)
+        entry.book_ids, entry.spellings, entry.bios = book_ids, spellings, bios
+        if entry.book_ids:
+            return
+        del self._entries[key]
+        for alias in author_aliases(key):
+            keys = self._aliases.get(alias, set()) - {key}
+            if keys:
+                self._aliases[alias] = keys
+            else:
+                self._aliases.pop(alias, None)
+        # El índice aproximado no admite bajas: se reconstruye en la próxima búsqueda
+        with self._lock:
+            self._fuzzy = None
+
+    def apply(self, event: CatalogEvent):
+        """Aplica un evento del catálogo (coste proporcional al libro afectado)"""
+        if event.kind in (UPDATED, DELETED):
+            self.remove(event.book_id)
+        if event.kind in (ADDED, UPDATED):
+            self.add(event.book)
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        with self._lock:
+            if self._fuzzy is None:
+                self._fuzzy = SemanticQueryIndex(self.threshold)
+                for known in list(self._entries):
+                    self._fuzzy.add(_NAMESPACE, known)
+            fuzzy = self._fuzzy
+        return fuzzy.lookup(_NAMESPACE, key)
+
+    def lookup(self, name: str) -> Optional[AuthorEntry]:
+        """
+        Busca un autor por nombre completo, alias o nombre con erratas
+
+        Un alias que comparten varios autores (ej: el mismo apellido) no
+        se resuelve.
+        """
+        key = normalize_author(name)
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        keys = self._aliases.get(key, set())
+        if len(keys) == 1:
+            return self._entries.get(next(iter(keys)))
+        if keys:
+            return None
+        match = self._fuzzy_match(key)
+        return self._entries.get(match) if match is not None else None
+
+    def entries(self) -> List[AuthorEntry]:
+        """Autores ordenados por nombre"""
+        return sorted(self._entries.values(), key=lambda entry: entry.key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
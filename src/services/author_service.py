@@ -1,19 +1,99 @@
+from typing import List, Optional
+
 from src.models.book import Book
+from src.models.search_result import BookResult
 from src.i18n.i18n_service import t
+from src.services.query_similarity import normalize_query
+from src.services.search_result_service import SearchResultService
+from config.settings import AUTHOR_WORKS_LIMIT
 
 
 class AuthorService:
     @staticmethod
-    def get_author_bio(book: Book) -> str:
-        """Obtiene la biografía del autor"""
+    def get_author_bio(book: Book, book_service=None) -> str:
+        """
+        Obtiene la biografía del autor
+
+        Si se pasa el catálogo, une sin repeticiones las biografías de todos
+        los libros del mismo autor.
+        """
+        if book_service is not None:
+            entry = book_service.authors.lookup(book.author)
+            if entry is not None and entry.bio:
+                return entry.bio
         return book.author_bio
 
     @staticmethod
-    def format_author_info(book: Book, lang: str = "es") -> str:
+    def format_author_info(book: Book, lang: str = "es", book_service=None) -> str:
         """Formatea la información del autor para mostrar"""
-        return f"""
+        info = f"""
 ### 🖊️ {t("principal_author_bio", lang)}
 **{book.author}**
 
-{book.author_bio}
+{AuthorService.get_author_bio(book, book_service)}
 """
+        if book_service is not None:
+            others = [b for b in book_service.get_books_by_author(book.author) if b.id != book.id]
+            if others:
+                titles = ", ".join(f"*{b.title}* ({b.year})" for b in others)
+                info += f"\n**{t('author_other_books', lang)}:** {titles}\n"
+        return info
+
+    @staticmethod
+    def catalog_works(book_service, author: str) -> List[BookResult]:
+        """Obras del autor presentes en el catálogo, por año de publicación"""
+        books = sorted(book_service.get_books_by_author(author), key=lambda b: (b.year, b.id))
+        return [
+            BookResult(title=b.title, author=b.author, year=b.year, genre=b.genre,
+                       reason=b.description, catalog_id=b.id)
+            for b in books
+        ]
+
+    @staticmethod
+    def search_author_works(
+        book_service,
+        gemini_service,
+        author: str,
+        lang: str = "es",
+        limit: int = AUTHOR_WORKS_LIMIT,
+    ) -> List[BookResult]:
+        """
+        Mejores obras de un autor, empezando por las del catálogo
+
+        Gemini solo se consulta si el catálogo tiene menos de `limit` obras
+        del autor, y sus resultados solo completan los huecos.
+
+        Raises:
+            GeminiError: Si el catálogo no tiene obras del autor y Gemini falla
+        """
+        from src.services.gemini_service import GeminiError
+
+        results = AuthorService.catalog_works(book_service, author)[:limit]
+        if len(results) >= limit:
+            return results
+
+        entry = book_service.authors.lookup(author)
+        try:
+            found = gemini_service.search_author_works_structured(entry.name if entry else author, lang, limit=limit)
+        except GeminiError:
+            if results:
+                return results
+            raise
+        SearchResultService.link_to_catalog(found, book_service)
+
+        seen = {normalize_query(r.title) for r in results}
+        seen_ids = {r.catalog_id for r in results}
+        for result in found:
+            if len(results) >= limit:
+                break
+            if normalize_query(result.title) in seen or (result.catalog_id is not None and result.catalog_id in seen_ids):
+                continue
+            seen.add(normalize_query(result.title))
+            results.append(result)
+        return results
+
+    @staticmethod
+    def known_author(book_service, author: str) -> Optional[str]:
+        """Nombre del autor tal como aparece en el catálogo, o None si no está"""
+        entry = book_service.authors.lookup(author)
+        return entry.name if entry else None
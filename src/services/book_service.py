@@ -1,19 +1,66 @@
 import json
-from typing import List, Optional
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 from pathlib import Path
 
 from src.models.book import Book
-from config.settings import BOOKS_FILE
+from src.models.catalog_page import CatalogPage
+from src.models.catalog_snapshot import CatalogSnapshot
+from src.services.author_index import AuthorIndex
+from src.services.catalog_events import ADDED, DELETED, UPDATED, CatalogEvent, ChangeLog
+from src.services.facet_service import FacetIndex
+from src.services.query_similarity import fold_accents
+from config.settings import BOOKS_FILE, CATALOG_CHANGE_LOG_SIZE
+
+SORT_FIELDS = ("title", "author", "year", "id")
+
+_T = TypeVar("_T")
+
+_SORT_KEYS: Dict[str, Callable[[Book], Any]] = {
+    "title": lambda book: fold_accents(book.title).casefold(),
+    "author": lambda book: fold_accents(book.author).casefold(),
+    "year": lambda book: book.year,
+    "id": lambda book: book.id,
+}
 
 
 class BookService:
+    """
+    Catálogo de libros con índices derivados
+
+    Los libros se publican como instantáneas inmutables (`CatalogSnapshot`):
+    las lecturas toman la instantánea vigente sin bloqueos y cada escritura
+    prepara una copia y la publica de una vez, así una sesión que recorre el
+    catálogo nunca ve el cambio de otra a medias. Los órdenes y los índices
+    de facetas y autores también copian lo que cambian en lugar de
+    modificar listas que una lectura puede estar recorriendo.
+    """
+
     def __init__(self, books_file: Path = BOOKS_FILE, lang: str = "es"):
         self.lang = lang
         if books_file == BOOKS_FILE:
             self.books_file = BOOKS_FILE.parent / f"books_{lang}.json" if lang == "en" else BOOKS_FILE
         else:
             self.books_file = books_file
-        self.books = self._load_books()
+        self._snapshot = CatalogSnapshot(self._load_books())
+        self._version = 0
+        self._by_title: Dict[str, List[Book]] = {}
+        # Por campo: claves de orden y libros en listas paralelas (bisect sin `key=`, Python 3.8+)
+        self._sorted: Dict[str, Tuple[List[Any], List[Book]]] = {}
+        self._search_text: Dict[int, str] = {}
+        self._facets: Optional[FacetIndex] = None
+        self._authors: Optional[AuthorIndex] = None
+        self._changes = ChangeLog(CATALOG_CHANGE_LOG_SIZE)
+        self._listeners: List[Callable[[CatalogEvent], None]] = []
+        # Solo los escritores se bloquean entre sí (reentrante: `save_books` dentro de una escritura)
+        self._write_lock = threading.RLock()
+        self._draft: List[Book] = []
+        self._draft_by_id: Dict[int, Book] = {}
+        self._draft_sorted: Dict[str, Tuple[List[Any], List[Book]]] = {}
+        for book in self._snapshot:
+            self._by_title.setdefault(book.title.lower(), []).append(book)
 
     def _load_books(self) -> List[Book]:
         """Carga los libros desde el archivo JSON"""
@@ -25,39 +72,391 @@ class BookService:
         
         return [Book.from_dict(book) for book in data]
 
-    def get_all_books(self) -> List[Book]:
-        """Retorna todos los libros"""
-        return self.books
+    @property
+    def books(self) -> CatalogSnapshot:
+        """Instantánea vigente del catálogo (de solo lectura)"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Versión de la instantánea vigente (aumenta con cada cambio)"""
+        return self._snapshot.version
+
+    def get_all_books(self) -> CatalogSnapshot:
+        """Retorna todos los libros (instantánea de solo lectura con su `version`)"""
+        return self._snapshot
 
     def get_book_by_id(self, book_id: int) -> Optional[Book]:
         """Obtiene un libro por ID"""
-        for book in self.books:
-            if book.id == book_id:
-                return book
-        return None
+        return self._snapshot.by_id.get(book_id)
 
     def get_book_by_title(self, title: str) -> Optional[Book]:
         """Obtiene un libro por título"""
-        for book in self.books:
-            if book.title.lower() == title.lower():
-                return book
-        return None
+        books = self._by_title.get(title.lower())
+        return books[0] if books else None
 
     def save_books(self):
         """Guarda los libros en el archivo JSON"""
-        self.books_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.books_file, "w", encoding="utf-8") as f:
-            data = [book.to_dict() for book in self.books]
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self._write_lock:
+            self.books_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.books_file, "w", encoding="utf-8") as f:
+                data = [book.to_dict() for book in self._snapshot]
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def subscribe(self, listener: Callable[[CatalogEvent], None]) -> Callable[[], None]:
+        """
+        Registra una función que recibe cada evento del catálogo
+
+        Returns:
+            Función que cancela la suscripción
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def changes_since(self, version: int) -> Optional[List[CatalogEvent]]:
+        """
+        Eventos posteriores a una versión del catálogo (ver `ChangeLog.since`)
+
+        Returns:
+            Lista de eventos, o None si son demasiado antiguos y hay que
+            reconstruir desde `get_all_books`
+        """
+        return self._changes.since(version, self.version)
+
+    @contextmanager
+    def _writing(self, save: bool):
+        """
+        Escritura del catálogo: prepara copias y las publica al terminar
+
+        Produce la lista donde `_publish` deja los eventos. La nueva
+        instantánea se publica (y se guarda, si `save`) aunque la escritura
+        se interrumpa, para que coincida con los índices ya actualizados.
+        Los libros y su índice por id se publican juntos en la instantánea.
+        """
+        with self._write_lock:
+            self._draft = list(self._snapshot)
+            self._draft_by_id = dict(self._snapshot.by_id)
+            self._draft_sorted = {}
+            events: List[CatalogEvent] = []
+            try:
+                yield events
+            finally:
+                if events:
+                    self._sorted.update(self._draft_sorted)
+                    for event in events:
+                        self._changes.append(event)
+                    self._snapshot = CatalogSnapshot(self._draft, self._version, self._draft_by_id)
+                self._draft = []
+                self._draft_by_id = {}
+                self._draft_sorted = {}
+                if events and save:
+                    self.save_books()
+
+    def _draft_view(self, field: str) -> Tuple[List[Any], List[Book]]:
+        """Copia (una por escritura) del orden de un campo"""
+        view = self._draft_sorted.get(field)
+        if view is None:
+            keys, books = self._sorted[field]
+            view = self._draft_sorted[field] = (list(keys), list(books))
+        return view
+
+    def _publish(self, kind: str, book: Book, previous: Optional[Book] = None) -> CatalogEvent:
+        """Aplica un cambio a la copia en preparación y actualiza los índices derivados"""
+        self._version += 1
+        event = CatalogEvent(kind, book, self._version, previous)
+        if kind == ADDED:
+            self._draft.append(book)
+            self._draft_by_id[book.id] = book
+        elif kind == UPDATED and previous is not book:
+            position = next(i for i, other in enumerate(self._draft) if other is previous)
+            self._draft[position] = book
+            self._draft_by_id[book.id] = book
+        elif kind == DELETED:
+            self._remove_from(self._draft, book)
+            self._draft_by_id.pop(book.id, None)
+
+        if kind == UPDATED:
+            self._unindex(previous, same_object=previous is book)
+        elif kind == DELETED:
+            self._unindex(book)
+        if kind in (ADDED, UPDATED):
+            title = book.title.lower()
+            self._by_title[title] = self._by_title.get(title, []) + [book]
+            for field in list(self._sorted):
+                keys, books = self._draft_view(field)
+                key = _SORT_KEYS[field](book)
+                position = bisect_right(keys, key)
+                keys.insert(position, key)
+                books.insert(position, book)
+        if self._facets is not None:
+            self._facets.apply(event)
+        if self._authors is not None:
+            self._authors.apply(event)
+        return event
+
+    def _notify(self, events: List[CatalogEvent]):
+        """
+        Avisa a los suscriptores (una vez publicado y guardado el cambio)
+
+        Un suscriptor que falla no impide avisar al resto; el primer error
+        se relanza al final.
+        """
+        error = None
+        for event in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(event)
+                except Exception as e:
+                    error = error or e
+        if error is not None:
+            raise error
+
+    def _unindex(self, book: Book, same_object: bool = False):
+        """
+        Quita un libro de los índices por título y de los órdenes
+
+        Si el libro se modificó en el mismo objeto, sus claves antiguas ya no
+        se conocen y se busca por identidad (coste lineal).
+        """
+        self._search_text.pop(book.id, None)
+        if same_object:
+            titles = [t for t, books in list(self._by_title.items()) if any(other is book for other in books)]
+        else:
+            titles = [book.title.lower()]
+        for title in titles:
+            rest = [other for other in self._by_title.get(title, []) if other is not book]
+            if rest:
+                self._by_title[title] = rest
+            else:
+                self._by_title.pop(title, None)
+        for field in list(self._sorted):
+            keys, books = self._draft_view(field)
+            if same_object:
+                position = next(i for i, other in enumerate(books) if other is book)
+            else:
+                position = bisect_left(keys, _SORT_KEYS[field](book))
+                while books[position] is not book:
+                    position += 1
+            del keys[position]
+            del books[position]
+
+    @staticmethod
+    def _remove_from(books: List[Book], book: Book):
+        for i, other in enumerate(books):
+            if other is book:
+                del books[i]
+                return
 
     def add_book(self, book: Book) -> bool:
         """Añade un nuevo libro"""
-        if self.get_book_by_id(book.id):
-            return False
-        self.books.append(book)
-        self.save_books()
+        with self._writing(save=True) as events:
+            if book.id in self._draft_by_id:
+                return False
+            events.append(self._publish(ADDED, book))
+        self._notify(events)
         return True
 
+    def add_books(self, books: Iterable[Book], save: bool = True) -> int:
+        """
+        Añade varios libros con una sola escritura del archivo
+
+        Los libros cuyo id ya existe se omiten. Todos se publican en la misma
+        instantánea.
+
+        Args:
+            books: Libros a añadir
+            save: Si es False, solo se actualiza la memoria (ver `save_books`)
+
+        Returns:
+            Número de libros añadidos
+        """
+        with self._writing(save) as events:
+            for book in books:
+                if book.id in self._draft_by_id:
+                    continue
+                events.append(self._publish(ADDED, book))
+        self._notify(events)
+        return len(events)
+
+    def update_book(self, book: Book, save: bool = True) -> bool:
+        """
+        Reemplaza el libro con el mismo id
+
+        Conviene pasar una copia modificada (`dataclasses.replace`) en lugar
+        de modificar el objeto del catálogo: así los índices se actualizan
+        sin recorrerlo y las lecturas en curso siguen viendo el libro anterior.
+
+        Returns:
+            False si no hay ningún libro con ese id
+        """
+        with self._writing(save) as events:
+            previous = self._draft_by_id.get(book.id)
+            if previous is None:
+                return False
+            events.append(self._publish(UPDATED, book, previous))
+        self._notify(events)
+        return True
+
+    def delete_book(self, book_id: int, save: bool = True) -> bool:
+        """
+        Elimina un libro del catálogo
+
+        Returns:
+            False si no hay ningún libro con ese id
+        """
+        with self._writing(save) as events:
+            book = self._draft_by_id.get(book_id)
+            if book is None:
+                return False
+            events.append(self._publish(DELETED, book))
+        self._notify(events)
+        return True
+
+    def _build_derived(self, build: Callable[[CatalogSnapshot], _T], current: Callable[[], Optional[_T]],
+                       install: Callable[[_T], None]) -> _T:
+        """
+        Construye un índice derivado la primera vez que se pide
+
+        Se construye sin bloqueo sobre la instantánea vigente y solo se
+        instala con el bloqueo de escritura; si entretanto se publicó otra
+        instantánea, se reconstruye sobre ella para no perder sus eventos.
+        """
+        snapshot = self._snapshot
+        built = build(snapshot)
+        with self._write_lock:
+            existing = current()
+            if existing is not None:
+                return existing
+            if self._snapshot is not snapshot:
+                built = build(self._snapshot)
+            install(built)
+            return built
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Índice de facetas (se construye la primera vez y luego se actualiza con cada evento)"""
+        facets = self._facets
+        if facets is None:
+            facets = self._build_derived(FacetIndex, lambda: self._facets,
+                                         lambda index: setattr(self, "_facets", index))
+        return facets
+
+    @property
+    def authors(self) -> AuthorIndex:
+        """Índice de autores (se construye la primera vez y luego se actualiza con cada evento)"""
+        authors = self._authors
+        if authors is None:
+            authors = self._build_derived(AuthorIndex, lambda: self._authors,
+                                          lambda index: setattr(self, "_authors", index))
+        return authors
+
+    def _books_by_ids(self, ids: Iterable[int]) -> List[Book]:
+        # Un id que el índice ya conoce y la instantánea aún no (o ya no) simplemente no aparece
+        by_id = self._snapshot.by_id
+        books = (by_id.get(book_id) for book_id in ids)
+        return [book for book in books if book is not None]
+
+    def get_books_by_author(self, author: str) -> List[Book]:
+        """Obtiene los libros de un autor (admite alias y nombres sin tildes)"""
+        entry = self.authors.lookup(author)
+        return self._books_by_ids(entry.book_ids) if entry else []
+
+    def get_books_by_facets(self, selected: Dict[str, str]) -> List[Book]:
+        """Obtiene los libros que cumplen todas las facetas seleccionadas (ordenados por id)"""
+        return self._books_by_ids(self.facets.ids(selected))
+
     def get_books_by_genre(self, genre: str) -> List[Book]:
         """Obtiene libros por género"""
-        return [book for book in self.books if book.genre.lower() == genre.lower()]
+        return self.get_books_by_facets({"genre": genre})
+
+    def _sorted_books(self, sort_by: str) -> List[Book]:
+        """Catálogo ordenado por un campo (se calcula una vez por campo y luego se mantiene)"""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Campo de orden no válido: {sort_by}")
+        view = self._sorted.get(sort_by)
+        if view is None:
+            key = _SORT_KEYS[sort_by]
+
+            def build(snapshot: CatalogSnapshot) -> Tuple[List[Any], List[Book]]:
+                books = sorted(snapshot, key=key)
+                return [key(book) for book in books], books
+
+            view = self._build_derived(build, lambda: self._sorted.get(sort_by),
+                                       lambda built: self._sorted.__setitem__(sort_by, built))
+        return view[1]
+
+    def _matches_text(self, book: Book, text: str) -> bool:
+        haystack = self._search_text.get(book.id)
+        if haystack is None:
+            haystack = fold_accents(f"{book.title} {book.author}").casefold()
+            self._search_text[book.id] = haystack
+        return text in haystack
+
+    def query_books(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        text: str = "",
+        genre: Optional[str] = None,
+        author: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        sort_by: str = "title",
+        descending: bool = False,
+        exclude_id: Optional[int] = None,
+        facets: Optional[Dict[str, str]] = None,
+    ) -> CatalogPage:
+        """
+        Consulta paginada y filtrada del catálogo
+
+        Args:
+            offset: Posición del primer libro de la página
+            limit: Libros por página
+            text: Texto a buscar en título o autor (sin distinguir tildes ni mayúsculas)
+            genre: Género exacto (sin distinguir mayúsculas)
+            author: Autor exacto (sin distinguir mayúsculas)
+            year_min: Año mínimo (incluido)
+            year_max: Año máximo (incluido)
+            sort_by: "title", "author", "year" o "id"
+            descending: Orden descendente
+            exclude_id: Id de un libro a omitir (ej: el libro ya seleccionado)
+            facets: Facetas seleccionadas {faceta: clave} (ver `FacetIndex`)
+
+        Returns:
+            Página de resultados con el total de coincidencias
+        """
+        books = self._sorted_books(sort_by)
+        if descending:
+            books = reversed(books)
+        text = fold_accents(text.strip()).casefold()
+        genre = genre.lower() if genre else None
+        author = author.lower() if author else None
+
+        allowed = set(self.facets.ids(facets)) if facets and any(facets.values()) else None
+
+        items = []
+        total = 0
+        for book in books:
+            if exclude_id is not None and book.id == exclude_id:
+                continue
+            if allowed is not None and book.id not in allowed:
+                continue
+            if genre and book.genre.lower() != genre:
+                continue
+            if author and book.author.lower() != author:
+                continue
+            if year_min is not None and book.year < year_min:
+                continue
+            if year_max is not None and book.year > year_max:
+                continue
+            if text and not self._matches_text(book, text):
+                continue
+            if offset <= total < offset + limit:
+                items.append(book)
+            total += 1
+        return CatalogPage(items=items, total=total, offset=offset, limit=limit)
@@ -0,0 +1,71 @@
+"""
+Eventos de cambio del catálogo
+
+`BookService` publica un evento por cada libro añadido, modificado o
+eliminado, con un número de versión creciente. Los índices derivados
+(facetas, autores, órdenes...) se actualizan con cada evento en lugar de
+reconstruirse, y quien guarde una estructura propia puede ponerse al día
+con `BookService.changes_since(versión)`.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from src.models.book import Book
+
+ADDED = "add"
+UPDATED = "update"
+DELETED = "delete"
+EVENT_KINDS = (ADDED, UPDATED, DELETED)
+
+
+@dataclass(frozen=True)
+class CatalogEvent:
+    kind: str
+    book: Book
+    version: int
+    previous: Optional[Book] = None
+
+    @property
+    def book_id(self) -> int:
+        return self.book.id
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "book_id": self.book.id,
+            "version": self.version,
+        }
+
+
+class ChangeLog:
+    """Últimos eventos del catálogo, para ponerse al día sin reconstruir"""
+
+    def __init__(self, max_events: int):
+        """
+        Args:
+            max_events: Eventos que se conservan (los más antiguos se descartan)
+        """
+        self._events: Deque[CatalogEvent] = deque(maxlen=max(max_events, 0))
+
+    def append(self, event: CatalogEvent):
+        self._events.append(event)
+
+    def since(self, version: int, current: int) -> Optional[List[CatalogEvent]]:
+        """
+        Eventos posteriores a `version`
+
+        Returns:
+            Lista de eventos (vacía si no hay cambios), o None si algunos ya
+            se descartaron y hay que reconstruir desde el catálogo completo
+        """
+        if version >= current:
+            return []
+        # Copia: un escritor puede añadir eventos mientras se lee
+        events = list(self._events)
+        if not events or events[0].version > version + 1:
+            return None
+        # Las versiones son consecutivas: los eventos pendientes están en posiciones conocidas
+        first = events[0].version
+        return events[version + 1 - first:current + 1 - first]
@@ -0,0 +1,289 @@
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from src.models.book import Book
+from src.services.book_service import BookService
+from src.services.query_similarity import fold_accents
+from config.settings import CATALOG_IMPORT_BATCH_SIZE, CATALOG_IMPORT_SAVE_EVERY, CATALOG_YEAR_RANGE
+
+_REQUIRED_TEXT = ("title", "author", "description", "genre")
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    imported: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
+    errors_sample: List[str] = field(default_factory=list)
+
+    @property
+    def records_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        return {
+            "read": self.read,
+            "imported": self.imported,
+            "invalid": self.invalid,
+            "duplicates": self.duplicates,
+            "seconds": self.seconds,
+        }
+
+
+def title_author_key(title: str, author: str) -> str:
+    """Clave normalizada para detectar el mismo libro con otro id"""
+    def norm(text: str) -> str:
+        return _NON_WORD_RE.sub(" ", fold_accents(text).casefold()).strip()
+
+    return f"{norm(title)}|{norm(author)}"
+
+
+def _parse_int(value) -> int:
+    """Entero estricto: rechaza booleanos y decimales con parte fraccionaria"""
+    if isinstance(value, bool):
+        raise TypeError("booleano")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError("decimal")
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return int(value.strip())
+    raise TypeError(type(value).__name__)
+
+
+def _parse_questions(value) -> List[str]:
+    """Acepta una lista, un array JSON o preguntas separadas por '|'"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            value = json.loads(text)
+        else:
+            return [q.strip() for q in text.split("|") if q.strip()]
+    if not isinstance(value, list):
+        raise ValueError("debe ser una lista de preguntas")
+    if not all(isinstance(q, str) for q in value):
+        raise ValueError("las preguntas deben ser texto")
+    return value
+
+
+def validate_record(raw: dict) -> Tuple[Optional[Book], List[str]]:
+    """
+    Valida un registro de origen y lo convierte en Book
+
+    Returns:
+        (libro, errores); el libro es None si hay algún error
+    """
+    errors = []
+
+    try:
+        book_id = _parse_int(raw.get("id"))
+        if book_id <= 0:
+            errors.append("id: debe ser positivo")
+    except (TypeError, ValueError):
+        errors.append("id: falta o no es un entero")
+        book_id = None
+
+    text = {}
+    for name in _REQUIRED_TEXT:
+        value = raw.get(name)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"{name}: obligatorio")
+        else:
+            text[name] = value.strip()
+
+    try:
+        year = _parse_int(raw.get("year"))
+        low, high = CATALOG_YEAR_RANGE
+        if not low <= year <= high:
+            errors.append(f"year: fuera de rango ({low}..{high})")
+    except (TypeError, ValueError):
+        errors.append("year: falta o no es un entero")
+        year = None
+
+    questions = {}
+    for name in ("pre_questions", "post_questions"):
+        try:
+            items = _parse_questions(raw.get(name))
+            if not all(q.strip() for q in items):
+                raise ValueError("contiene preguntas vacías")
+            questions[name] = [q.strip() for q in items]
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+
+    if errors:
+        return None, errors
+    theme = raw.get("theme")
+    author_bio = raw.get("author_bio")
+    return Book(
+        id=book_id,
+        year=year,
+        theme=theme.strip() if isinstance(theme, str) and theme.strip() else "No especificado",
+        author_bio=author_bio.strip() if isinstance(author_bio, str) else "",
+        **text,
+        **questions,
+    ), []
+
+
+def iter_records(path: Union[str, Path], fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """
+    Lee registros de un CSV o JSONL sin cargar el archivo en memoria
+
+    Returns:
+        Iterador de (número de línea, registro); las líneas JSON inválidas se
+        devuelven como {"__error__": mensaje}
+    """
+    path = Path(path)
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = {"__error__": f"JSON inválido: {e.msg}"}
+                if not isinstance(record, dict):
+                    record = {"__error__": "el registro no es un objeto JSON"}
+                yield number, record
+
+
+class CatalogImporter:
+    """
+    Importador masivo de libros desde CSV o JSONL
+
+    Valida cada registro, descarta duplicados (por id y por título+autor
+    normalizados, también frente al catálogo existente) y añade los libros por
+    lotes con `BookService.add_books`, escribiendo el archivo solo cada
+    `save_every` libros.
+    """
+
+    def __init__(
+        self,
+        book_service: BookService,
+        batch_size: int = CATALOG_IMPORT_BATCH_SIZE,
+        save_every: int = CATALOG_IMPORT_SAVE_EVERY,
+        progress: Optional[Callable[[ImportReport], None]] = None,
+    ):
+        self.book_service = book_service
+        self.batch_size = batch_size
+        self.save_every = save_every
+        self.progress = progress
+
+    def import_file(
+        self,
+        path: Union[str, Path],
+        fmt: Optional[str] = None,
+        error_file: Optional[Union[str, Path]] = None,
+    ) -> ImportReport:
+        """
+        Importa un archivo
+
+        Args:
+            path: Archivo CSV o JSONL
+            fmt: "csv" o "jsonl" (por defecto, según la extensión)
+            error_file: JSONL donde se escriben los registros rechazados con su motivo
+
+        Returns:
+            Resumen de la importación
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        seen_ids = set(book.id for book in self.book_service.get_all_books())
+        seen_keys = set(title_author_key(b.title, b.author) for b in self.book_service.get_all_books())
+        errors = open(error_file, "w", encoding="utf-8") if error_file else None
+        batch: List[Book] = []
+        unsaved = 0
+
+        def reject(number: int, raw: dict, messages: List[str]):
+            if len(report.errors_sample) < 20:
+                report.errors_sample.append(f"línea {number}: {'; '.join(messages)}")
+            if errors:
+                errors.write(json.dumps({"line": number, "errors": messages, "record": raw}, ensure_ascii=False) + "\n")
+
+        def commit():
+            nonlocal unsaved
+            report.imported += self.book_service.add_books(batch, save=False)
+            unsaved += len(batch)
+            batch.clear()
+            if unsaved >= self.save_every:
+                self.book_service.save_books()
+                unsaved = 0
+            report.seconds = time.perf_counter() - started
+            if self.progress:
+                self.progress(report)
+
+        try:
+            for number, raw in iter_records(path, fmt):
+                report.read += 1
+                if "__error__" in raw:
+                    report.invalid += 1
+                    reject(number, raw, [raw["__error__"]])
+                    continue
+                book, messages = validate_record(raw)
+                if book is None:
+                    report.invalid += 1
+                    reject(number, raw, messages)
+                    continue
+                key = title_author_key(book.title, book.author)
+                if book.id in seen_ids or key in seen_keys:
+                    report.duplicates += 1
+                    reject(number, raw, ["duplicado (id o título+autor)"])
+                    continue
+                seen_ids.add(book.id)
+                seen_keys.add(key)
+                batch.append(book)
+                if len(batch) >= self.batch_size:
+                    commit()
+            commit()
+            if unsaved:
+                self.book_service.save_books()
+        finally:
+            if errors:
+                errors.close()
+        report.seconds = time.perf_counter() - started
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa libros al catálogo desde CSV o JSONL")
+    parser.add_argument("source", help="Archivo .csv o .jsonl")
+    parser.add_argument("--lang", default="es", help="Catálogo de destino")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--errors", help="Archivo JSONL de registros rechazados")
+    parser.add_argument("--batch-size", type=int, default=CATALOG_IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    def progress(report: ImportReport):
+        print(
+            f"\r{report.read} leídos · {report.imported} importados · {report.invalid} inválidos · "
+            f"{report.duplicates} duplicados · {report.records_per_second:.0f} reg/s",
+            end="", file=sys.stderr,
+        )
+
+    importer = CatalogImporter(BookService(lang=args.lang), batch_size=args.batch_size, progress=progress)
+    report = importer.import_file(args.source, args.format, args.errors)
+    print(file=sys.stderr)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
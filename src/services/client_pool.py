@@ -0,0 +1,265 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.services.model_backends import BackendError, ModelBackend
+from config.settings import (
+    GEMINI_KEY_COOLDOWN_SECONDS,
+    GEMINI_KEY_MAX_FAILURES,
+    GEMINI_KEY_REQUESTS_PER_MINUTE,
+    GEMINI_KEY_WAIT_SECONDS,
+    GEMINI_MODEL_NAME,
+)
+
+_QUOTA_ERRORS = ("ResourceExhausted", "TooManyRequests")
+
+
+class PoolExhausted(BackendError):
+    """Ninguna clave de API está disponible dentro del tiempo de espera"""
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Indica si un error es de cuota (HTTP 429) sin importar el SDK"""
+    return type(error).__name__ in _QUOTA_ERRORS or getattr(error, "code", None) == 429
+
+
+def key_id(api_key: str) -> str:
+    """Identificador estable de una clave que no la revela (para logs y métricas)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+def default_model_factory(api_key: str, model_name: str):
+    """
+    Crea un GenerativeModel con su propio cliente para una clave
+
+    `genai.configure` es global, así que cada clave tiene un
+    `GenerativeServiceClient` propio asignado al modelo; su canal se mantiene
+    abierto y se reutiliza en todas las peticiones de esa clave.
+    """
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+
+    model = genai.GenerativeModel(model_name)
+    model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+    return model
+
+
+@dataclass
+class KeyState:
+    key_id: str
+    model: object = None
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    quota_errors: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    recent: Deque[float] = field(default_factory=deque)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def under_quota(self, now: float, per_minute: int) -> bool:
+        while self.recent and self.recent[0] <= now - 60:
+            self.recent.popleft()
+        return not per_minute or len(self.recent) < per_minute
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "key": self.key_id,
+            "healthy": self.healthy(now),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "quota_errors": self.quota_errors,
+            "requests_last_minute": len(self.recent),
+            "cooldown_seconds": max(0.0, self.cooldown_until - now),
+        }
+
+
+class ClientPool:
+    """
+    Pool de clientes de Gemini por proceso, con una o varias claves de API
+
+    - Un modelo (y su conexión) por clave, creado en el primer uso y reutilizado
+    - Reparto de peticiones a la clave sana con menos peticiones en curso
+      que aún no ha agotado su cuota local por minuto
+    - Las claves con errores seguidos o cuota agotada se apartan durante
+      `cooldown` segundos y luego vuelven a usarse
+    """
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        model_name: str = GEMINI_MODEL_NAME,
+        requests_per_minute: int = GEMINI_KEY_REQUESTS_PER_MINUTE,
+        max_failures: int = GEMINI_KEY_MAX_FAILURES,
+        cooldown: float = GEMINI_KEY_COOLDOWN_SECONDS,
+        wait_timeout: float = GEMINI_KEY_WAIT_SECONDS,
+        model_factory: Callable[[str, str], object] = default_model_factory,
+    ):
+        if not api_keys:
+            raise ValueError("El pool necesita al menos una clave de API")
+        self.model_name = model_name
+        self.requests_per_minute = requests_per_minute
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.wait_timeout = wait_timeout
+        self._model_factory = model_factory
+        self._keys: List[Tuple[str, KeyState]] = [(key, KeyState(key_id(key))) for key in dict.fromkeys(api_keys)]
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _pick(self, now: float, exclude: Sequence[str] = ()) -> Optional[Tuple[str, KeyState]]:
+        candidates = [
+            (key, state) for key, state in self._keys
+            if state.healthy(now) and state.under_quota(now, self.requests_per_minute)
+        ]
+        candidates = [item for item in candidates if item[1].key_id not in exclude] or candidates
+        if not candidates:
+            return None
+        return min(candidates, key=lambda item: (item[1].in_flight, len(item[1].recent)))
+
+    def _next_available(self, now: float) -> float:
+        """Segundos hasta que alguna clave vuelva a estar disponible"""
+        waits = []
+        for _, state in self._keys:
+            wait = max(0.0, state.cooldown_until - now)
+            if self.requests_per_minute and len(state.recent) >= self.requests_per_minute:
+                wait = max(wait, state.recent[0] + 60 - now)
+            waits.append(wait)
+        return min(waits)
+
+    @contextmanager
+    def lease(self, exclude: Sequence[str] = ()) -> Iterator[KeyState]:
+        """
+        Reserva una clave para una petición
+
+        Args:
+            exclude: Ids de claves a evitar (ej: la que acaba de fallar), si hay otras
+
+        Raises:
+            PoolExhausted: Si ninguna clave queda disponible a tiempo
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolExhausted("El pool de clientes está cerrado")
+                now = time.time()
+                picked = self._pick(now, exclude)
+                if picked is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted("Todas las claves de Gemini están ocupadas o sin cuota")
+                self._condition.wait(min(remaining, max(self._next_available(now), 0.05)))
+            key, state = picked
+            if state.model is None:
+                state.model = self._model_factory(key, self.model_name)
+            state.in_flight += 1
+            state.requests += 1
+            state.recent.append(now)
+
+        error: Optional[Exception] = None
+        try:
+            yield state
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(state, error)
+
+    def _release(self, state: KeyState, error: Optional[Exception]):
+        with self._condition:
+            state.in_flight -= 1
+            if error is None:
+                state.consecutive_failures = 0
+            else:
+                state.failures += 1
+                state.consecutive_failures += 1
+                if is_quota_error(error):
+                    state.quota_errors += 1
+                    state.cooldown_until = time.time() + self.cooldown
+                elif state.consecutive_failures >= self.max_failures:
+                    state.cooldown_until = time.time() + self.cooldown
+                    state.consecutive_failures = 0
+            self._condition.notify_all()
+
+    def stats(self) -> List[Dict]:
+        """Estado de cada clave (sin revelar las claves)"""
+        now = time.time()
+        with self._condition:
+            return [state.to_dict(now) for _, state in self._keys]
+
+    def close(self):
+        """Cierra las conexiones de todos los clientes"""
+        with self._condition:
+            self._closed = True
+            for _, state in self._keys:
+                transport = getattr(getattr(state.model, "_client", None), "transport", None)
+                if transport is not None and hasattr(transport, "close"):
+                    transport.close()
+                state.model = None
+            self._condition.notify_all()
+
+
+class PooledGeminiBackend(ModelBackend):
+    """
+    Backend real que reparte las peticiones entre las claves de un ClientPool
+
+    Si una clave agota su cuota, la petición se reintenta una vez con otra.
+    """
+
+    def __init__(self, pool: ClientPool):
+        self.pool = pool
+        self.model_name = pool.model_name
+
+    def generate_content(self, prompt: str):
+        tried: List[str] = []
+        while True:
+            state = None
+            try:
+                with self.pool.lease(exclude=tried) as state:
+                    return state.model.generate_content(prompt)
+            except Exception as e:
+                if state is None or not is_quota_error(e) or len(tried) + 1 >= min(2, len(self.pool)):
+                    raise
+                tried.append(state.key_id)
+
+    def stream_content(self, prompt: str) -> Iterator[str]:
+        with self.pool.lease() as state:
+            for chunk in state.model.generate_content(prompt, stream=True):
+                yield chunk.text
+
+
+def api_keys_from_env(api_key: Optional[str] = None) -> List[str]:
+    """Claves configuradas: `api_key` y/o GEMINI_API_KEYS (separadas por comas)"""
+    keys = [api_key] if api_key else []
+    keys += [k.strip() for k in os.getenv("GEMINI_API_KEYS", "").split(",") if k.strip()]
+    if not keys and os.getenv("GEMINI_API_KEY"):
+        keys.append(os.getenv("GEMINI_API_KEY"))
+    return list(dict.fromkeys(keys))
+
+
+_pools: Dict[Tuple[Tuple[str, ...], str], ClientPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_client_pool(api_keys: Sequence[str], model_name: str = GEMINI_MODEL_NAME) -> ClientPool:
+    """Pool compartido por el proceso para un conjunto de claves y un modelo"""
+    key = (tuple(api_keys), model_name)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ClientPool(api_keys, model_name)
+            _pools[key] = pool
+        return pool
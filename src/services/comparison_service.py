@@ -0,0 +1,190 @@
+"""
+Comparación de varios libros a la vez (matriz N x N)
+
+El solapamiento entre libros (género, autor, tema, década y palabras clave
+de la descripción) se calcula localmente a partir de un resumen de cada
+libro que se obtiene una sola vez. El modelo solo se consulta para los
+pares sin comparación previa, y cada par se guarda de forma simétrica:
+A vs B es la misma entrada que B vs A.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.models.book import Book
+from src.models.comparison import BookDigest, ComparisonMatrix, PairOverlap, pair_key
+from src.services.query_similarity import normalize_query
+from config.settings import GEMINI_COMPARE_MAX_BOOKS, GEMINI_COMPARE_WORKERS
+
+# Temas que no cuentan como coincidencia
+_UNSPECIFIED_THEMES = {"", "no especificado", "not specified"}
+_MIN_KEYWORD_LENGTH = 4
+
+
+def _fingerprint(book: Book) -> Tuple:
+    return (book.title, book.author, book.year, book.genre, book.theme, book.description)
+
+
+def build_digest(book: Book) -> BookDigest:
+    """Resumen de un libro con los rasgos usados para comparar"""
+    theme = (book.theme or "").strip().lower()
+    if theme in _UNSPECIFIED_THEMES:
+        theme = ""
+    words = normalize_query(f"{book.title} {book.description} {theme}").split()
+    return BookDigest(
+        book_id=book.id,
+        genre=(book.genre or "").strip().lower(),
+        author=normalize_query(book.author or ""),
+        theme=theme,
+        year=book.year,
+        decade=book.year // 10 * 10,
+        keywords=frozenset(w for w in words if len(w) >= _MIN_KEYWORD_LENGTH),
+    )
+
+
+def compute_overlap(first: BookDigest, second: BookDigest) -> PairOverlap:
+    """Solapamiento local entre dos libros (simétrico)"""
+    shared = first.keywords & second.keywords
+    union = first.keywords | second.keywords
+    return PairOverlap(
+        same_genre=bool(first.genre) and first.genre == second.genre,
+        same_author=bool(first.author) and first.author == second.author,
+        same_theme=bool(first.theme) and first.theme == second.theme,
+        same_decade=first.decade == second.decade,
+        shared_keywords=sorted(shared),
+        keyword_similarity=round(len(shared) / len(union), 3) if union else 0.0,
+        year_gap=abs(first.year - second.year),
+    )
+
+
+class ComparisonService:
+    """Matriz de comparación entre varios libros con reutilización de pares"""
+
+    def __init__(
+        self,
+        gemini_service,
+        max_books: int = GEMINI_COMPARE_MAX_BOOKS,
+        workers: int = GEMINI_COMPARE_WORKERS,
+    ):
+        """
+        Args:
+            gemini_service: GeminiService que genera las comparaciones de cada par
+            max_books: Libros máximos por matriz
+            workers: Pares que se comparan a la vez con el modelo
+        """
+        self.gemini_service = gemini_service
+        self.max_books = max_books
+        self.workers = max(workers, 1)
+        self._digests: Dict[int, Tuple[Tuple, BookDigest]] = {}
+        self._comparisons: Dict[Tuple[str, int, int], Tuple[Tuple, str]] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, book: Book) -> BookDigest:
+        """Resumen de un libro (se recalcula solo si el libro cambió)"""
+        fingerprint = _fingerprint(book)
+        with self._lock:
+            cached = self._digests.get(book.id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        digest = build_digest(book)
+        with self._lock:
+            self._digests[book.id] = (fingerprint, digest)
+        return digest
+
+    def overlap(self, first: Book, second: Book) -> PairOverlap:
+        return compute_overlap(self.digest(first), self.digest(second))
+
+    def _pair_state(self, first: Book, second: Book, lang: str) -> Tuple[Tuple[str, int, int], Tuple]:
+        low, high = pair_key(first.id, second.id)
+        books = (first, second) if first.id == low else (second, first)
+        return (lang, low, high), (_fingerprint(books[0]), _fingerprint(books[1]))
+
+    def cached_comparison(self, first: Book, second: Book, lang: str = "es") -> Optional[str]:
+        """Comparación ya generada de un par, en memoria o en la caché de Gemini"""
+        key, fingerprint = self._pair_state(first, second, lang)
+        with self._lock:
+            cached = self._comparisons.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        text = self.gemini_service.cached_comparison(first, second, lang)
+        if text is not None:
+            self._remember(key, fingerprint, text)
+        return text
+
+    def _remember(self, key: Tuple[str, int, int], fingerprint: Tuple, text: str):
+        with self._lock:
+            self._comparisons[key] = (fingerprint, text)
+
+    def _validate(self, books: Sequence[Book]) -> List[Book]:
+        unique = list({book.id: book for book in books}.values())
+        if len(unique) < 2:
+            raise ValueError("Se necesitan al menos 2 libros distintos para comparar")
+        if len(unique) > self.max_books:
+            raise ValueError(f"Se pueden comparar como máximo {self.max_books} libros")
+        return unique
+
+    def matrix(self, books: Sequence[Book], lang: str = "es") -> ComparisonMatrix:
+        """
+        Matriz con el solapamiento local de cada par y las comparaciones ya generadas
+
+        No consulta el modelo.
+
+        Raises:
+            ValueError: Si hay menos de 2 libros distintos o más de `max_books`
+        """
+        books = self._validate(books)
+        by_id = {book.id: book for book in books}
+        result = ComparisonMatrix(books=books, overlaps={})
+        for low, high in result.pairs:
+            result.overlaps[(low, high)] = self.overlap(by_id[low], by_id[high])
+            text = self.cached_comparison(by_id[low], by_id[high], lang)
+            if text is not None:
+                result.comparisons[(low, high)] = text
+        return result
+
+    def compare_all(
+        self,
+        books: Sequence[Book],
+        lang: str = "es",
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> ComparisonMatrix:
+        """
+        Completa la matriz consultando el modelo solo para los pares que faltan
+
+        Las respuestas de error no se guardan, así que un nuevo intento
+        vuelve a consultar esos pares.
+
+        Args:
+            books: Libros a comparar
+            lang: Idioma de las comparaciones
+            progress: Función (pares hechos, pares pendientes) tras cada par
+
+        Raises:
+            ValueError: Si hay menos de 2 libros distintos o más de `max_books`
+        """
+        result = self.matrix(books, lang)
+        missing = result.missing
+        if not missing:
+            return result
+
+        by_id = {book.id: book for book in result.books}
+
+        def compare(pair: Tuple[int, int]) -> Tuple[Tuple[int, int], str]:
+            return pair, self.gemini_service.compare_books(by_id[pair[0]], by_id[pair[1]], lang)
+
+        # Los hilos del pool no heredan el contexto: cada par se ejecuta con el
+        # `scheduling(...)` de quien pidió la matriz (prioridad y sesión)
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+            futures = [pool.submit(context.copy().run, compare, pair) for pair in missing]
+            for done, future in enumerate(futures, 1):
+                pair, text = future.result()
+                result.comparisons[pair] = text
+                if not self.gemini_service.is_error_response(text):
+                    key, fingerprint = self._pair_state(by_id[pair[0]], by_id[pair[1]], lang)
+                    self._remember(key, fingerprint, text)
+                if progress is not None:
+                    progress(done, len(missing))
+        return result
@@ -0,0 +1,196 @@
+import argparse
+import json
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from src.models.book import Book
+from config.settings import GEMINI_EXPORT_OPERATIONS
+
+EXPORT_FORMATS = {
+    "zip": ("zip", "application/zip"),
+    "jsonl": ("jsonl", "application/jsonl"),
+    "md": ("md", "text/markdown"),
+}
+
+
+@dataclass
+class AnalysisRecord:
+    book_id: int
+    title: str
+    author: str
+    lang: str
+    operation: str
+    text: str
+
+    def to_dict(self):
+        return {
+            "book_id": self.book_id,
+            "title": self.title,
+            "author": self.author,
+            "lang": self.lang,
+            "operation": self.operation,
+            "text": self.text,
+        }
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w-]+", "_", text, flags=re.UNICODE).strip("_")[:60] or "libro"
+
+
+def catalog_selections(
+    langs: Sequence[str],
+    book_ids: Optional[Iterable[int]] = None,
+    book_service_for: Optional[Callable[[str], object]] = None,
+) -> Iterator[Tuple[Book, str]]:
+    """
+    Pares (libro, idioma) del catálogo de cada idioma
+
+    Args:
+        langs: Idiomas a exportar (cada uno con su catálogo)
+        book_ids: Ids a incluir (None = todos)
+        book_service_for: Función idioma -> BookService (ej: el compartido de
+                          la app); por defecto se carga uno nuevo desde disco
+    """
+    if book_service_for is None:
+        from src.services.book_service import BookService
+
+        book_service_for = BookService
+
+    wanted = set(book_ids) if book_ids is not None else None
+    for lang in langs:
+        for book in book_service_for(lang).get_all_books():
+            if wanted is None or book.id in wanted:
+                yield book, lang
+
+
+def iter_analyses(
+    gemini_service,
+    selections: Iterable[Tuple[Book, str]],
+    operations: Sequence[str] = GEMINI_EXPORT_OPERATIONS,
+    job_queue=None,
+) -> Iterator[AnalysisRecord]:
+    """
+    Recorre los análisis ya disponibles, sin consultar el modelo
+
+    Para cada libro, idioma y operación se usa la respuesta de la caché
+    compartida o, si no está, el resultado de un trabajo terminado de la cola
+    (ver `job_queue`). Las combinaciones sin análisis se omiten.
+    """
+    from src.services.job_queue import DONE, book_payload
+
+    for book, lang in selections:
+        for operation in operations:
+            text = gemini_service.cached_for_book(operation, book, lang)
+            if text is None and job_queue is not None:
+                job = job_queue.find(operation, book_payload(book, lang))
+                if job is not None and job.status == DONE:
+                    text = job.result
+            if text:
+                yield AnalysisRecord(book.id, book.title, book.author, lang, operation, text)
+
+
+def write_jsonl(records: Iterable[AnalysisRecord], fp: BinaryIO) -> int:
+    """Escribe un registro JSON por línea; devuelve el número de registros"""
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record.to_dict(), ensure_ascii=False).encode("utf-8") + b"\n")
+        count += 1
+    return count
+
+
+def _markdown_section(record: AnalysisRecord) -> str:
+    return f"## {record.title} — {record.author}\n\n*{record.operation} · {record.lang}*\n\n{record.text.strip()}\n\n"
+
+
+def write_markdown(records: Iterable[AnalysisRecord], fp: BinaryIO) -> int:
+    """Escribe todos los análisis en un único documento Markdown"""
+    fp.write("# ThinkInk — Análisis exportados\n\n".encode("utf-8"))
+    count = 0
+    for record in records:
+        fp.write(_markdown_section(record).encode("utf-8"))
+        count += 1
+    return count
+
+
+def write_zip(records: Iterable[AnalysisRecord], fp: BinaryIO) -> int:
+    """
+    Escribe un ZIP con un archivo Markdown por análisis y un índice JSONL
+
+    Cada entrada se comprime y escribe en cuanto se genera, así que la
+    memoria no crece con el número de libros (funciona también sobre
+    flujos no posicionables).
+    """
+    count = 0
+    # El índice se acumula en disco: ZipFile no admite dos entradas abiertas a la vez
+    with tempfile.TemporaryFile() as index, zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for record in records:
+            name = f"{record.lang}/{record.book_id}_{_slug(record.title)}/{record.operation}.md"
+            with archive.open(name, "w") as entry:
+                entry.write(_markdown_section(record).encode("utf-8"))
+            entry_info = {k: v for k, v in record.to_dict().items() if k != "text"}
+            entry_info["path"] = name
+            index.write(json.dumps(entry_info, ensure_ascii=False).encode("utf-8") + b"\n")
+            count += 1
+        index.seek(0)
+        with archive.open("index.jsonl", "w") as entry:
+            shutil.copyfileobj(index, entry)
+    return count
+
+
+_WRITERS: Dict[str, Callable[[Iterable[AnalysisRecord], BinaryIO], int]] = {
+    "zip": write_zip,
+    "jsonl": write_jsonl,
+    "md": write_markdown,
+}
+
+
+def export_analyses(records: Iterable[AnalysisRecord], fp: BinaryIO, fmt: str = "zip") -> int:
+    """
+    Exporta análisis al formato indicado de forma incremental
+
+    Args:
+        records: Análisis a exportar (normalmente de `iter_analyses`)
+        fp: Flujo binario de salida
+        fmt: "zip", "jsonl" o "md"
+
+    Returns:
+        Número de análisis exportados
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    return _WRITERS[fmt](records, fp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta los análisis de Gemini ya generados")
+    parser.add_argument("--format", choices=sorted(_WRITERS), default="zip")
+    parser.add_argument("--langs", nargs="+", default=["es"])
+    parser.add_argument("--books", nargs="*", type=int, help="Ids de libros (por defecto, todos)")
+    parser.add_argument("--operations", nargs="+", default=list(GEMINI_EXPORT_OPERATIONS))
+    parser.add_argument("--output", help="Archivo de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    from src.services.gemini_service import GeminiService
+    from src.services.job_queue import get_job_queue
+
+    records = iter_analyses(
+        GeminiService(),
+        catalog_selections(args.langs, args.books or None),
+        args.operations,
+        job_queue=get_job_queue(),
+    )
+    if args.output:
+        with open(args.output, "wb") as fp:
+            count = export_analyses(records, fp, args.format)
+    else:
+        count = export_analyses(records, sys.stdout.buffer, args.format)
+    print(f"{count} análisis exportados", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.models.book import Book
+from src.services.catalog_events import ADDED, DELETED, UPDATED, CatalogEvent
+
+FACETS = ("genre", "author", "decade", "theme")
+
+
+def _decade(book: Book) -> Tuple[str, str]:
+    start = book.year // 10 * 10
+    return str(start), f"{start}–{start + 9}"
+
+
+def _text_facet(attribute: str) -> Callable[[Book], Tuple[str, str]]:
+    def extract(book: Book) -> Tuple[str, str]:
+        label = (getattr(book, attribute) or "").strip()
+        return label.lower(), label
+
+    return extract
+
+
+_EXTRACTORS: Dict[str, Callable[[Book], Tuple[str, str]]] = {
+    "genre": _text_facet("genre"),
+    "author": _text_facet("author"),
+    "decade": _decade,
+    "theme": _text_facet("theme"),
+}
+
+
+def intersect_sorted(arrays: List[List[int]]) -> List[int]:
+    """Intersección de listas de ids ordenadas (empieza por la más corta)"""
+    if not arrays:
+        return []
+    arrays = sorted(arrays, key=len)
+    result = arrays[0]
+    for other in arrays[1:]:
+        if not result:
+            break
+        merged = []
+        start = 0
+        for value in result:
+            start = bisect_left(other, value, start)
+            if start == len(other):
+                break
+            if other[start] == value:
+                merged.append(value)
+        result = merged
+    return result
+
+
+class FacetIndex:
+    """
+    Índice de facetas del catálogo (género, autor, década y tema)
+
+    Cada valor de faceta guarda la lista ordenada de ids de sus libros, así
+    que los conteos y los filtros combinados se resuelven con intersecciones
+    de listas ordenadas, sin recorrer los objetos `Book`. Se actualiza de
+    forma incremental con los eventos del catálogo (ver `apply`).
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self._ids: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        self._labels: Dict[str, Dict[str, str]] = {facet: {} for facet in FACETS}
+        self._key_of: Dict[str, Dict[int, str]] = {facet: {} for facet in FACETS}
+        self._all: List[int] = []
+        self._shared = False
+        for book in books:
+            self.add(book)
+        # Ya construido, puede haber lecturas en curso: los cambios copian la lista de ids afectada
+        self._shared = True
+
+    def _writable(self, ids: List[int]) -> List[int]:
+        return list(ids) if self._shared else ids
+
+    def add(self, book: Book):
+        """Añade un libro al índice"""
+        position = bisect_left(self._all, book.id)
+        if position < len(self._all) and self._all[position] == book.id:
+            return
+        self._all.insert(position, book.id)
+        for facet, extract in _EXTRACTORS.items():
+            key, label = extract(book)
+            self._labels[facet].setdefault(key, label)
+            self._key_of[facet][book.id] = key
+            ids = self._writable(self._ids[facet].get(key, []))
+            insort(ids, book.id)
+            self._ids[facet][key] = ids
+
+    def remove(self, book_id: int):
+        """Quita un libro del índice (no hace nada si no está)"""
+        position = bisect_left(self._all, book_id)
+        if position == len(self._all) or self._all[position] != book_id:
+            return
+        del self._all[position]
+        for facet in FACETS:
+            key = self._key_of[facet][book_id]
+            ids = self._writable(self._ids[facet][key])
+            del ids[bisect_left(ids, book_id)]
+            if ids:
+                self._ids[facet][key] = ids
+            else:
+                del self._ids[facet][key]
+                del self._labels[facet][key]
+            del self._key_of[facet][book_id]
+
+    def apply(self, event: CatalogEvent):
+        """Aplica un evento del catálogo (coste proporcional al libro afectado)"""
+        if event.kind in (UPDATED, DELETED):
+            self.remove(event.book_id)
+        if event.kind in (ADDED, UPDATED):
+            self.add(event.book)
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def ids(self, selected: Optional[Dict[str, str]] = None) -> List[int]:
+        """
+        Ids (ordenados) de los libros que cumplen todas las facetas seleccionadas
+
+        Args:
+            selected: {faceta: clave de valor}; las facetas vacías se ignoran
+        """
+        arrays = []
+        for facet, key in (selected or {}).items():
+            if not key:
+                continue
+            if facet not in self._ids:
+                raise ValueError(f"Faceta desconocida: {facet}")
+            arrays.append(self._ids[facet].get(key.lower(), []))
+        return intersect_sorted(arrays) if arrays else list(self._all)
+
+    def counts(self, facet: str, selected: Optional[Dict[str, str]] = None) -> List[Tuple[str, str, int]]:
+        """
+        Conteos de una faceta dentro de la selección actual
+
+        La propia faceta se excluye de la selección, así se ven las
+        alternativas disponibles ("drill-down").
+
+        Returns:
+            Lista de (clave, etiqueta, conteo) con conteo > 0, de mayor a menor
+        """
+        if facet not in self._ids:
+            raise ValueError(f"Faceta desconocida: {facet}")
+        others = {f: key for f, key in (selected or {}).items() if f != facet and key}
+        labels = self._labels[facet]
+        if not others:
+            counts = [(key, labels.get(key, key), len(ids)) for key, ids in list(self._ids[facet].items())]
+        else:
+            # Con filtros, contar recorriendo solo los ids ya seleccionados
+            key_of = self._key_of[facet]
+            tally = Counter(key_of.get(book_id) for book_id in self.ids(others))
+            tally.pop(None, None)
+            counts = [(key, labels.get(key, key), count) for key, count in tally.items()]
+        counts = [item for item in counts if item[2] > 0]
+        counts.sort(key=lambda item: (-item[2], item[1]) if facet != "decade" else int(item[0]))
+        return counts
@@ -1,431 +1,672 @@
+import hashlib
 import os
-from typing import Optional
-from dotenv import load_dotenv
-import google.generativeai as genai
+import time
+from typing import Dict, List, Optional, Tuple
+from src.cache import CacheBackend, create_cache
 from src.models.book import Book
-
-# Cargar variables de entorno
-load_dotenv()
+from src.models.answer import AnswerGrade, ReaderAnswer
+from src.models.search_result import BookResult
+from src.prompts import prompts
+from src.services.json_output import extract_json
+from src.services.model_backends import ModelBackend, create_backend
+from src.services.model_router import RoutedResponse
+from src.services.prompt_budget import budget_for, fit_context, format_list
+from src.services.query_similarity import SemanticQueryIndex
+from src.services.request_scheduler import Priority, RequestScheduler, get_default_scheduler, scheduling
+from src.services.telemetry import OperationRecord, Telemetry, get_telemetry
+from src.services.search_result_service import SearchResultService
+from config.settings import (
+    GEMINI_CACHE_TTL,
+    GEMINI_GRADING_MAX_BATCH,
+    GEMINI_GRADING_TOKEN_BUDGET,
+    GEMINI_QUERY_SIMILARITY_THRESHOLD,
+)
+
+
+ERROR_PREFIX = "❌ Error al consultar Gemini"
+NOT_CONFIGURED_PREFIX = "⚠️ Gemini"
+# Instrucciones fijas (idioma y restricciones) que encabezan todos los prompts
+SYSTEM_TEMPLATE = "system"
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimación local de tokens (~4 caracteres por token)"""
+    return len(text) // 4 + 1
+
+
+def _usage_tokens(response, prompt: str, text: str) -> Tuple[int, int, bool]:
+    """
+    Tokens de entrada y salida de una respuesta
+
+    Usa `usage_metadata` si el backend lo proporciona; si no, los estima.
+
+    Returns:
+        (tokens del prompt, tokens de salida, si son estimados)
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) if usage is not None else 0
+    if prompt_tokens:
+        return prompt_tokens, getattr(usage, "candidates_token_count", 0) or 0, False
+    return _estimate_tokens(prompt), _estimate_tokens(text), True
+
+
+def _lang_name(lang: str) -> str:
+    return "Spanish" if lang == "es" else "English"
+
+
+def _book_context(book: Book, prefix: str = "") -> Dict[str, object]:
+    """Variables de plantilla para un libro"""
+    return {
+        f"{prefix}title": book.title,
+        f"{prefix}author": book.author,
+        f"{prefix}year": book.year,
+        f"{prefix}genre": book.genre,
+        f"{prefix}theme": book.theme,
+        f"{prefix}description": book.description,
+        f"{prefix}author_bio": book.author_bio,
+        f"{prefix}pre_questions": format_list(book.pre_questions),
+        f"{prefix}post_questions": format_list(book.post_questions),
+    }
+
+
+def _comparison_context(book1: Book, book2: Book) -> Dict[str, object]:
+    """
+    Variables de plantilla de una comparación, en orden canónico (por id)
+
+    Así A vs B y B vs A producen el mismo prompt y comparten la entrada de caché.
+    """
+    if book2.id < book1.id:
+        book1, book2 = book2, book1
+    return {**_book_context(book1, "book1_"), **_book_context(book2, "book2_")}
+
+
+class GeminiError(Exception):
+    """Error al obtener una respuesta estructurada de Gemini"""
 
 
 class GeminiService:
     """Servicio para consultar libros usando Google Gemini API"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        backend: Optional[ModelBackend] = None,
+        cache: Optional[CacheBackend] = None,
+        query_index: Optional[SemanticQueryIndex] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        telemetry: Optional[Telemetry] = None,
+        prompt_budget: bool = True,
+    ):
         """
         Inicializa el servicio de Gemini
-        
+
         Args:
-            api_key: Clave de API de Google Gemini (si no se proporciona, 
+            api_key: Clave de API de Google Gemini (si no se proporciona,
                      se obtiene de la variable de entorno GEMINI_API_KEY)
+            backend: Backend del modelo (si no se proporciona, se crea el
+                     indicado por GEMINI_BACKEND; ver model_backends)
+            cache: Caché de respuestas (si no se proporciona, se crea la
+                   indicada por GEMINI_CACHE_URL; sin ella no se cachea)
+            query_index: Índice de consultas de texto libre ya respondidas,
+                         para reutilizar respuestas de consultas casi iguales
+            scheduler: Planificador de peticiones (por defecto, el compartido
+                       por el proceso)
+            telemetry: Registro de tokens, latencia y errores (por defecto,
+                       el compartido por el proceso)
+            prompt_budget: Resumir el contexto de los libros para que cada
+                           prompt quepa en el presupuesto de su operación
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel("gemini-2.0-flash")
-        else:
-            self.model = None
+        self.model = backend if backend is not None else create_backend(api_key=self.api_key)
+        self.cache = cache if cache is not None else create_cache(os.getenv("GEMINI_CACHE_URL"), GEMINI_CACHE_TTL)
+        if query_index is None and self.cache is not None:
+            query_index = SemanticQueryIndex(GEMINI_QUERY_SIMILARITY_THRESHOLD)
+        self.query_index = query_index
+        self.scheduler = scheduler if scheduler is not None else get_default_scheduler()
+        self.telemetry = telemetry if telemetry is not None else get_telemetry()
+        self.prompt_budget = prompt_budget
 
     def is_configured(self) -> bool:
         """Verifica si Gemini está configurado"""
         return self.model is not None
 
-    def get_book_summary(self, book: Book, lang: str = "es") -> str:
+    @staticmethod
+    def _not_configured_message(lang: str) -> str:
+        return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
+                else "⚠️ Gemini is not configured. Please provide your API_KEY.")
+
+    @staticmethod
+    def is_error_response(text: str) -> bool:
+        """Indica si un texto devuelto es un mensaje de error del servicio (no del modelo)"""
+        return text.startswith((ERROR_PREFIX, NOT_CONFIGURED_PREFIX))
+
+    @staticmethod
+    def template_hash(operation: str, lang: str = "es") -> str:
+        """Hash de la plantilla de una operación (cambia cuando cambia el prompt o el prefijo fijo)"""
+        source = prompts.template_hash(SYSTEM_TEMPLATE, lang) + prompts.template_hash(operation, lang)
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def system_prefix(lang: str = "es") -> str:
         """
-        Obtiene un resumen análitico del libro usando Gemini
-        
+        Instrucciones fijas con las que empiezan todos los prompts de un idioma
+
+        Es idéntico byte a byte entre operaciones y llamadas, así que el
+        proveedor puede reutilizar su procesamiento (caché de prefijos).
+        """
+        return prompts.render(SYSTEM_TEMPLATE, lang, lang_name=_lang_name(lang)).rstrip("\n")
+
+    def _render(self, operation: str, lang: str, **context) -> str:
+        """
+        Renderiza el prompt de una operación tras el prefijo fijo
+
+        Si el prompt supera el presupuesto de tokens de la operación, se
+        resume el contexto largo de los libros (ver prompt_budget).
+        """
+        prefix = self.system_prefix(lang)
+        template = prompts.get(operation, lang)
+        context["lang_name"] = _lang_name(lang)
+        if self.prompt_budget:
+            context = fit_context(template, context, budget_for(operation) - _estimate_tokens(prefix))
+        return f"{prefix}\n\n{template.render(**context)}"
+
+    def cache_key(self, operation: str, lang: str, prompt: str) -> str:
+        """
+        Clave de caché de una respuesta
+
+        Incluye el hash de la plantilla, así que editar un prompt invalida
+        exactamente las entradas de esa operación.
+        """
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+        return f"gemini:{operation}:{lang}:{self.result_version(operation, lang)}:{digest}"
+
+    def result_version(self, operation: str, lang: str = "es") -> str:
+        """
+        Versión de las respuestas de una operación: hash de la plantilla y modelo
+
+        Cambia al editar el prompt o al cambiar de modelo, así que sirve para
+        no reutilizar resultados guardados (caché, cola de trabajos) obsoletos.
+        """
+        return f"{self.template_hash(operation, lang)}:{self._model_name(operation)}"
+
+    def _cached(self, operation: str, lang: str, **context) -> Optional[str]:
+        """Respuesta cacheada de una operación, sin consultar el modelo"""
+        if self.cache is None:
+            return None
+        prompt = self._render(operation, lang, **context)
+        try:
+            return self.cache.get(self.cache_key(operation, lang, prompt))
+        except Exception:
+            return None
+
+    def cached_for_book(self, operation: str, book: Book, lang: str = "es") -> Optional[str]:
+        """Respuesta cacheada de una operación sobre un libro, sin consultar el modelo"""
+        return self._cached(operation, lang, **_book_context(book))
+
+    def cached_comparison(self, book1: Book, book2: Book, lang: str = "es") -> Optional[str]:
+        """Comparación cacheada de dos libros (en cualquier orden), sin consultar el modelo"""
+        return self._cached("compare_books", lang, **_comparison_context(book1, book2))
+
+    def is_cached_for_book(self, operation: str, book: Book, lang: str = "es") -> bool:
+        """Indica si la respuesta de una operación sobre un libro ya está en la caché"""
+        return self.cached_for_book(operation, book, lang) is not None
+
+    def _model_name(self, operation: str) -> str:
+        """Modelo que atiende una operación (con enrutado, el principal de su nivel)"""
+        model_name_for = getattr(self.model, "model_name_for", None)
+        if model_name_for is not None:
+            return model_name_for(operation)
+        return getattr(self.model, "model_name", "")
+
+    def _record(self, operation: str, lang: str, started: float, **fields):
+        fields.setdefault("model", self._model_name(operation))
+        self.telemetry.record(OperationRecord(
+            operation=operation,
+            lang=lang,
+            latency=time.perf_counter() - started,
+            **fields,
+        ))
+
+    def _call_model(self, operation: str, lang: str, prompt: str) -> str:
+        """
+        Consulta el modelo a través del planificador y registra la telemetría
+
+        La prioridad, la sesión y el plazo se toman del contexto actual
+        (ver `request_scheduler.scheduling`).
+        """
+        # Con un ModelRouter, la operación decide el nivel de modelo
+        generate_for = getattr(self.model, "generate_for", None)
+        if generate_for is not None:
+            call = lambda: generate_for(operation, prompt)
+        else:
+            call = lambda: self.model.generate_content(prompt)
+
+        started = time.perf_counter()
+        try:
+            response = self.scheduler.run(call)
+            text = response.text
+        except Exception as e:
+            self._record(operation, lang, started, error_class=type(e).__name__)
+            raise
+        prompt_tokens, output_tokens, estimated = _usage_tokens(response, prompt, text)
+        self._record(
+            operation, lang, started,
+            prompt_tokens=prompt_tokens, output_tokens=output_tokens, tokens_estimated=estimated,
+            model=response.model_name if isinstance(response, RoutedResponse) else self._model_name(operation),
+        )
+        return text
+
+    def _generate(self, operation: str, lang: str, prompt: str, validate=None) -> str:
+        """
+        Consulta el modelo pasando por la caché compartida, si existe
+
         Args:
-            book: Libro a resumir
-            
+            operation: Nombre de la operación (parte de la clave)
+            lang: Idioma (parte de la clave)
+            prompt: Prompt renderizado
+            validate: Función opcional que lanza una excepción si el texto no
+                      es válido; así las respuestas inválidas no se cachean
+
         Returns:
-            Resumen del libro generado por Gemini
+            Texto generado
+        """
+        called = []
+
+        def call() -> str:
+            called.append(True)
+            text = self._call_model(operation, lang, prompt)
+            if validate is not None:
+                validate(text)
+            return text
+
+        if self.cache is None:
+            return call()
+        started = time.perf_counter()
+        text = self.cache.get_or_compute(self.cache_key(operation, lang, prompt), call)
+        if not called:
+            self._record(operation, lang, started, cache_hit=True)
+        return text
+
+    def _run(self, operation: str, lang: str, **context) -> str:
+        """
+        Renderiza el prompt de una operación y consulta a Gemini
+
+        Args:
+            operation: Nombre de la operación (y de su plantilla)
+            lang: Idioma de la respuesta
+            **context: Variables de la plantilla
+
+        Returns:
+            Texto generado o mensaje de error
         """
         if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica primero que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book.title}" es UN LIBRO (novela, ensayo, poesía, etc.).
-        Si NO es un libro (es película, serie, videojuego, etc.), responde:
-        "❌ Lo siento, solo analizo LIBROS. '{book.title}' no es un libro. Por favor, ingresa un libro válido."
-        
-        Si ES un libro, proporciona un resumen detallado y analítico de "{book.title}" 
-        escrito por {book.author} ({book.year}).
-        
-        Género: {book.genre}
-        Tema principal: {book.theme}
-        Descripción: {book.description}
-        
-        RESTRICCIONES IMPORTANTES:
-        - NO utilices lenguaje ofensivo, discriminatorio o que promueva el odio
-        - NO hagas referencias negativas hacia grupos de personas, razas, géneros, religiones o orientaciones sexuales
-        - Mantén un tono académico y respetuoso
-        
-        Por favor incluye:
-        - Resumen del argumento (2-3 párrafos)
-        - Temas principales
-        - Significancia literaria
-        - Público objetivo
-        
-        Sé conciso pero informativo.
+            return self._not_configured_message(lang)
+
+        prompt = self._render(operation, lang, **context)
+        try:
+            return self._generate(operation, lang, prompt)
+        except Exception as e:
+            return f"{ERROR_PREFIX}: {str(e)}"
+
+    def _run_query(self, operation: str, lang: str, field: str, query: str, scope: str = "", **context) -> str:
+        """
+        Variante de `_run` para consultas de texto libre
+
+        Si ya se respondió una consulta equivalente ("La amistad" / "amistad",
+        "García Márquez" / "garcia marquez"), se reutiliza esa consulta para
+        que la respuesta salga de la caché.
+
+        Args:
+            operation: Nombre de la operación
+            lang: Idioma de la respuesta
+            field: Variable de la plantilla que recibe la consulta
+            query: Texto introducido por el usuario
+            scope: Contexto adicional del espacio de consultas (ej: id del libro)
+            **context: Resto de variables de la plantilla
+        """
+        if not self.is_configured():
+            return self._not_configured_message(lang)
+
+        namespace = f"{operation}:{lang}:{scope}"
+        canonical = self.query_index.lookup(namespace, query) if self.query_index else None
+        prompt = self._render(operation, lang, **{field: canonical or query}, **context)
+        try:
+            text = self._generate(operation, lang, prompt)
+        except Exception as e:
+            return f"{ERROR_PREFIX}: {str(e)}"
+        if self.query_index is not None and canonical is None:
+            self.query_index.add(namespace, query)
+        return text
+
+    def _run_structured(self, operation: str, lang: str, **context) -> List[BookResult]:
+        """
+        Variante de `_run` para operaciones que devuelven resultados JSON
+
+        Raises:
+            GeminiError: Si Gemini no está configurado, falla, rechaza la
+                         entrada o devuelve un JSON inválido
         """
+        if not self.is_configured():
+            raise GeminiError(self._not_configured_message(lang))
+
+        operation = f"{operation}_structured"
+        prompt = self._render(operation, lang, **context)
+
+        def parse(text: str) -> List[BookResult]:
+            try:
+                data = extract_json(text)
+                if isinstance(data, dict) and data.get("error") and not data.get("results"):
+                    raise GeminiError(f"❌ {data['error']}")
+                return SearchResultService.validate_results(data)
+            except ValueError as e:
+                raise GeminiError(f"❌ Respuesta no válida: {str(e)}") from e
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            text = self._generate(operation, lang, prompt, validate=parse)
+        except GeminiError:
+            raise
         except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+            raise GeminiError(f"{ERROR_PREFIX}: {str(e)}") from e
+        return parse(text)
+
+    def get_book_summary(self, book: Book, lang: str = "es") -> str:
+        """
+        Obtiene un resumen análitico del libro usando Gemini
+
+        Args:
+            book: Libro a resumir
+
+        Returns:
+            Resumen del libro generado por Gemini
+        """
+        return self._run("get_book_summary", lang, **_book_context(book))
 
     def analyze_themes_and_characters(self, book: Book, lang: str = "es") -> str:
         """
         Analiza temas y personajes principales del libro
-        
+
         Args:
             book: Libro a analizar
-            
+
         Returns:
             Análisis de temas y personajes
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book.title}" es UN LIBRO. Si no lo es, rechaza el análisis.
-        
-        Analiza en profundidad el libro "{book.title}" de {book.author}.
-        
-        Tema principal: {book.theme}
-        
-        RESTRICCIONES IMPORTANTES:
-        - NO utilices lenguaje ofensivo, discriminatorio o que promueva el odio
-        - NO hagas referencias negativas hacia grupos de personas
-        - Mantén un tono académico y respetuoso
-        
-        Por favor incluye:
-        1. **Personajes Principales**: Nombres y características clave
-        2. **Temas Centrales**: Ideas principales del libro
-        3. **Conflictos**: Tensiones narrativas principales
-        4. **Simbolismo**: Elementos simbólicos importantes
-        5. **Impacto Cultural**: Influencia en la literatura
-        
-        Mantén el análisis estructurado y claro.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run("analyze_themes_and_characters", lang, **_book_context(book))
 
     def get_book_recommendations(self, book: Book, interests: str = "", lang: str = "es") -> str:
         """
         Obtiene recomendaciones basadas en el libro actual
-        
+
         Args:
             book: Libro de referencia
             interests: Intereses adicionales del usuario
-            
+
         Returns:
             Recomendaciones de libros similares
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        Basándote en el libro 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book.title}" de {book.author} (Género: {book.genre}),
-        proporciona recomendaciones de libros similares.
-        
-        Intereses del usuario: {interests if interests else 'No especificados'}
-        
-        Por favor:
-        1. Recomienda 5 libros similares
-        2. Explica por qué son relevantes
-        3. Sugiere libros del mismo autor si existen
-        4. Indica el nivel de dificultad de lectura
-        
-        Formatea la respuesta de manera clara y útil.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run(
+            "get_book_recommendations", lang,
+            interests=interests if interests else "No especificados",
+            **_book_context(book),
+        )
 
     def explain_concept(self, book: Book, concept: str, lang: str = "es") -> str:
         """
         Explica un concepto específico del libro
-        
+
         Args:
             book: Libro del cual explicar el concepto
             concept: Concepto a explicar
-            
+
         Returns:
             Explicación detallada del concepto
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book.title}" es UN LIBRO. Si no lo es, rechaza el análisis.
-        
-        Explica el concepto o tema "{concept}" en el contexto del libro 
-        "{book.title}" de {book.author}.
-        
-        Tema principal del libro: {book.theme}
-        
-        RESTRICCIONES IMPORTANTES:
-        - NO utilices lenguaje ofensivo, discriminatorio o que promueva el odio
-        - Mantén un tono académico y respetuoso
-        
-        Por favor:
-        1. Define el concepto claramente
-        2. Muestra cómo aparece en el libro
-        3. Explica su importancia en la trama
-        4. Proporciona ejemplos específicos del texto
-        5. Relaciona con el contexto histórico/cultural si es relevante
-        
-        Mantén la explicación accesible pero profunda.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run_query(
+            "explain_concept", lang, "concept", concept, scope=str(book.id), **_book_context(book)
+        )
 
     def compare_books(self, book1: Book, book2: Book, lang: str = "es") -> str:
         """
         Compara dos libros
-        
+
+        El orden no importa: A vs B y B vs A comparten la respuesta cacheada.
+
         Args:
             book1: Primer libro
             book2: Segundo libro
-            
+
         Returns:
             Comparación detallada de los libros
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        Compara detalladamente los libros:
-        
-        Libro 1: 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book1.title}" por {book1.author} ({book1.year})
-        Género: {book1.genre}
-        
-        Libro 2: "{book2.title}" por {book2.author} ({book2.year})
-        Género: {book2.genre}
-        
-        Por favor:
-        1. Similitudes temáticas
-        2. Diferencias en estilo y narrativa
-        3. Contexto histórico de cada uno
-        4. Influencia mutua (si la hay)
-        5. Cuál recomendar según preferencias
-        
-        Sé equilibrado en la comparación.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run("compare_books", lang, **_comparison_context(book1, book2))
 
     def generate_discussion_questions(self, book: Book, lang: str = "es") -> str:
         """
         Genera preguntas de discusión para el libro
-        
+
         Args:
             book: Libro para el cual generar preguntas
-            
+
         Returns:
             Preguntas de discusión
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{book.title}" es UN LIBRO. Si no lo es, rechaza el análisis.
-        
-        Genera preguntas de discusión profundas para el libro "{book.title}" 
-        de {book.author}.
-        
-        Tema principal: {book.theme}
-        
-        RESTRICCIONES IMPORTANTES:
-        - NO crees preguntas que inciten a lenguaje ofensivo o discriminatorio
-        - Las preguntas deben ser inclusivas y respetuosas
-        - Mantén un tono académico
-        
-        Las preguntas deben:
-        1. Explorar temas principales
-        2. Invitar a reflexión personal
-        3. Conectar con experiencias del lector
-        4. Ser desafiantes pero accesibles
-        5. Promover debate constructivo
-        
-        Proporciona 8-10 preguntas bien formuladas.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run("generate_discussion_questions", lang, **_book_context(book))
 
     def search_similar_books(self, title: str, lang: str = "es") -> str:
         """
         Busca libros similares basado en un título dado
-        
+
         Args:
             title: Título del libro para buscar similares
-            
+
         Returns:
             Top 3 libros similares con análisis
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{title}" es UN LIBRO. Si no lo es, responde:
-        "❌ Lo siento, solo analizo LIBROS. '{title}' no es un libro."
-        
-        Si es un libro, basándote en él, proporciona un análisis de 
-        los 3 LIBROS MÁS SIMILARES.
-        
-        RESTRICCIONES IMPORTANTES:
-        - Solo menciona LIBROS (novelas, ensayos, etc.)
-        - NO utilices lenguaje ofensivo o discriminatorio
-        - Mantén un tono respetuoso
-        
-        Para cada uno de los 3 libros, incluye:
-        1. **Título y Autor**
-        2. **Año de publicación**
-        3. **Género**
-        4. **Por qué es similar** - Explicación clara de similitudes temáticas, 
-           narrativas o de estilo
-        5. **Sinopsis breve** (2-3 líneas)
-        
-        Formatea la respuesta de manera clara y estructurada.
-        Usa emojis para hacer más legible.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run_query("search_similar_books", lang, "title", title)
 
     def search_author_works(self, author: str, lang: str = "es") -> str:
         """
         Busca las mejores obras de un autor de libros
-        
+
         Args:
             author: Nombre del autor
-            
+
         Returns:
             Top 3 libros del autor con análisis
         """
-        if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        IMPORTANTE: Verifica que 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{author}" es un AUTOR DE LIBROS. 
-        Si es director de cine, compositor, músico, dramaturgo o cualquier otra cosa 
-        (pero NO autor de libros), responde:
-        "❌ Lo siento, solo analizo LIBROS. '{author}' no es un autor de libros. 
-        Por favor, ingresa el nombre de un autor de libros válido."
-        
-        Si es un autor de libros, proporciona un análisis de los 3 MEJORES LIBROS de {author}.
-        
-        RESTRICCIONES IMPORTANTES:
-        - Solo menciona LIBROS (novelas, ensayos, poesía, etc.)
-        - NO utilices lenguaje ofensivo o discriminatorio
-        - Mantén un tono respetuoso
-        
-        Para cada libro, incluye:
-        1. **Título**
-        2. **Año de publicación**
-        3. **Género**
-        4. **Por qué es destacada** - Lo que la hace especial y representativa del autor
-        5. **Sinopsis breve** (2-3 líneas)
-        6. **Tema principal**
-        
-        Formatea la respuesta de manera clara y estructurada.
-        Usa emojis para hacer más legible.
-        Sé preciso: solo 3 libros, ordenados por importancia/popularidad.
-        """
-
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+        return self._run_query("search_author_works", lang, "author", author)
 
     def search_books_by_theme(self, theme: str, lang: str = "es") -> str:
         """
         Busca libros que tratan un tema específico
-        
+
         Args:
             theme: Tema a buscar (ej: Amistad, Justicia, Identidad)
-            
+
         Returns:
             Top 3 libros que abordan ese tema
         """
+        return self._run_query("search_books_by_theme", lang, "theme", theme)
+
+    def search_similar_books_structured(self, title: str, lang: str = "es", limit: int = 3) -> List[BookResult]:
+        """
+        Versión estructurada de `search_similar_books`
+
+        Returns:
+            Libros similares como BookResult
+
+        Raises:
+            GeminiError: Si no se pudo obtener un resultado válido
+        """
+        return self._run_structured("search_similar_books", lang, title=title, limit=limit)
+
+    def search_author_works_structured(self, author: str, lang: str = "es", limit: int = 3) -> List[BookResult]:
+        """
+        Versión estructurada de `search_author_works`
+
+        Raises:
+            GeminiError: Si no se pudo obtener un resultado válido
+        """
+        return self._run_structured("search_author_works", lang, author=author, limit=limit)
+
+    def search_books_by_theme_structured(self, theme: str, lang: str = "es", limit: int = 3) -> List[BookResult]:
+        """
+        Versión estructurada de `search_books_by_theme`
+
+        Raises:
+            GeminiError: Si no se pudo obtener un resultado válido
+        """
+        return self._run_structured("search_books_by_theme", lang, theme=theme, limit=limit)
+
+    def get_book_recommendations_structured(
+        self, book: Book, interests: str = "", lang: str = "es", limit: int = 5
+    ) -> List[BookResult]:
+        """
+        Versión estructurada de `get_book_recommendations`
+
+        Raises:
+            GeminiError: Si no se pudo obtener un resultado válido
+        """
+        return self._run_structured(
+            "get_book_recommendations", lang,
+            interests=interests if interests else "No especificados",
+            limit=limit,
+            **_book_context(book),
+        )
+
+    def grade_answers(
+        self,
+        book: Book,
+        answers: List[ReaderAnswer],
+        lang: str = "es",
+        token_budget: int = GEMINI_GRADING_TOKEN_BUDGET,
+        max_batch: int = GEMINI_GRADING_MAX_BATCH,
+    ) -> List[AnswerGrade]:
+        """
+        Califica por lotes las respuestas de los lectores a las preguntas de un libro
+
+        Empaqueta muchas respuestas (de varias preguntas y lectores) en pocos
+        prompts acotados por `token_budget`. Si la respuesta de un lote no se
+        puede interpretar, el lote se divide en dos y se reintenta.
+
+        Args:
+            book: Libro al que pertenecen las preguntas
+            answers: Respuestas a calificar
+            lang: Idioma de la retroalimentación
+            token_budget: Tokens estimados máximos por prompt
+            max_batch: Respuestas máximas por prompt
+
+        Returns:
+            Una calificación por respuesta, en el mismo orden de entrada
+        """
         if not self.is_configured():
-            return ("⚠️ Gemini no está configurado. Por favor, proporciona tu API_KEY." if lang == "es"
-                   else "⚠️ Gemini is not configured. Please provide your API_KEY.")
-
-        lang_name = "Spanish" if lang == "es" else "English"
-        prompt = f"""
-        Proporciona recomendaciones de los 3 MEJORES LIBROS que abordan el tema: 
-        RESPONSE_LANGUAGE: Respond in {lang_name}. "{theme}"
-        
-        RESTRICCIONES IMPORTANTES:
-        - Solo menciona LIBROS (novelas, ensayos, poesía, etc.)
-        - NO utilices lenguaje ofensivo o discriminatorio
-        - Mantén un tono respetuoso e inclusivo
-        
-        Para cada uno de los 3 libros, incluye:
-        1. **Título y Autor**
-        2. **Año de publicación**
-        3. **Género**
-        4. **Cómo aborda el tema** - Explicación de cómo el libro trata el tema "{theme}"
-        5. **Sinopsis breve** (2-3 líneas)
-        6. **Por qué recomendarlo** - Lo que lo hace especial para este tema
-        
-        Formatea la respuesta de manera clara y estructurada.
-        Usa emojis para hacer más legible.
-        Sé preciso: solo 3 libros, ordenados por relevancia al tema.
+            message = self._not_configured_message(lang)
+            return [AnswerGrade(answer_id=a.id, error=message) for a in answers]
+
+        grades: Dict[str, AnswerGrade] = {}
+        with scheduling(Priority.BATCH):
+            for batch in self._pack_answer_batches(book, answers, lang, token_budget, max_batch):
+                self._grade_batch(book, batch, lang, grades, token_budget)
+        return [grades[a.id] for a in answers]
+
+    def _grading_prompt(self, book: Book, lang: str, items: str) -> str:
+        return self._render("grade_answers", lang, items=items, **_book_context(book))
+
+    @staticmethod
+    def _format_answer_item(local_id: int, answer: ReaderAnswer, max_chars: Optional[int] = None) -> str:
+        """Formatea una respuesta para incluirla en un lote"""
+        text = answer.answer
+        if max_chars is not None and len(text) > max_chars:
+            text = text[:max(max_chars, 0)] + "…"
+        return f"[{local_id}] ({answer.question_type}) P: {answer.question}\nR: {text}\n"
+
+    def _pack_answer_batches(
+        self, book: Book, answers: List[ReaderAnswer], lang: str, token_budget: int, max_batch: int
+    ) -> List[List[ReaderAnswer]]:
+        """Agrupa respuestas en lotes cuyo prompt estimado cabe en el presupuesto"""
+        available = token_budget - _estimate_tokens(self._grading_prompt(book, lang, ""))
+        batches: List[List[ReaderAnswer]] = []
+        current: List[ReaderAnswer] = []
+        used = 0
+        for answer in answers:
+            cost = _estimate_tokens(self._format_answer_item(0, answer))
+            if current and (used + cost > available or len(current) >= max_batch):
+                batches.append(current)
+                current, used = [], 0
+            current.append(answer)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _build_grading_prompt(self, book: Book, batch: List[ReaderAnswer], lang: str, token_budget: int) -> str:
+        """Construye el prompt de un lote, recortando respuestas individuales demasiado largas"""
+        max_chars = None
+        if len(batch) == 1:
+            # Una sola respuesta que no cabe en el presupuesto se recorta
+            overhead = _estimate_tokens(self._grading_prompt(book, lang, ""))
+            max_chars = max((token_budget - overhead) * 4 - len(batch[0].question) - 32, 0)
+        items = "".join(
+            self._format_answer_item(i, answer, max_chars) for i, answer in enumerate(batch, 1)
+        )
+        return self._grading_prompt(book, lang, items)
+
+    @staticmethod
+    def _parse_grades(text: str, batch: List[ReaderAnswer]) -> Dict[str, AnswerGrade]:
         """
+        Interpreta la respuesta JSON de un lote
 
+        Raises:
+            ValueError: Si la respuesta no contiene una calificación válida por respuesta
+        """
+        data = extract_json(text)
+        if not isinstance(data, list):
+            raise ValueError("Se esperaba un array JSON")
+
+        grades: Dict[str, AnswerGrade] = {}
+        for item in data:
+            if not isinstance(item, dict):
+                raise ValueError("Elemento de calificación inválido")
+            try:
+                local_id = int(item["id"])
+                score = int(item["score"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Calificación incompleta: {item}") from e
+            if not 1 <= local_id <= len(batch) or not 0 <= score <= 10:
+                raise ValueError(f"Calificación fuera de rango: {item}")
+            answer = batch[local_id - 1]
+            grades[answer.id] = AnswerGrade(
+                answer_id=answer.id, score=score, feedback=str(item.get("feedback", "")).strip()
+            )
+
+        if len(grades) != len(batch):
+            raise ValueError("Faltan calificaciones en la respuesta")
+        return grades
+
+    def _grade_batch(
+        self,
+        book: Book,
+        batch: List[ReaderAnswer],
+        lang: str,
+        grades: Dict[str, AnswerGrade],
+        token_budget: int = GEMINI_GRADING_TOKEN_BUDGET,
+    ):
+        """Califica un lote; si la respuesta es ilegible, lo divide y reintenta"""
+        prompt = self._build_grading_prompt(book, batch, lang, token_budget)
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            text = self._call_model("grade_answers", lang, prompt)
         except Exception as e:
-            return f"❌ Error al consultar Gemini: {str(e)}"
+            # Error de la API: reintentar con lotes más pequeños no ayudaría
+            for answer in batch:
+                grades[answer.id] = AnswerGrade(answer_id=answer.id, error=f"{ERROR_PREFIX}: {str(e)}")
+            return
+
+        try:
+            grades.update(self._parse_grades(text, batch))
+        except ValueError as e:
+            if len(batch) == 1:
+                grades[batch[0].id] = AnswerGrade(answer_id=batch[0].id, error=f"❌ Respuesta no válida: {str(e)}")
+                return
+            middle = len(batch) // 2
+            self._grade_batch(book, batch[:middle], lang, grades, token_budget)
+            self._grade_batch(book, batch[middle:], lang, grades, token_budget)
@@ -0,0 +1,426 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+from src.models.book import Book
+from src.services.request_scheduler import Priority, current_context, scheduling
+from config.settings import (
+    GEMINI_CACHE_TTL,
+    GEMINI_JOBS_DB,
+    GEMINI_JOBS_LEASE_SECONDS,
+    GEMINI_JOBS_WORKERS,
+    GEMINI_SCHEDULER_CLASS_LIMITS,
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobFailed(Exception):
+    """El trabajo terminó con un error que no debe cachearse como resultado"""
+
+
+@dataclass
+class Job:
+    id: str
+    operation: str
+    payload: dict
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    priority: Priority = Priority.INTERACTIVE
+    session_id: str = "default"
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+def job_key(operation: str, payload: dict, version: str = "") -> str:
+    """Clave de deduplicación: misma operación, con los mismos datos y la misma versión (plantilla, modelo)"""
+    canonical = json.dumps(
+        {"operation": operation, "payload": payload, "version": version}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """
+    Cola de trabajos persistente en SQLite con workers en hilos
+
+    Los trabajos sobreviven a los reruns de Streamlit y a las desconexiones:
+    la página solo guarda el id y consulta el estado. Los workers de
+    cualquier proceso que comparta el archivo pueden reclamar trabajos, y los
+    que quedaron "running" en un proceso que murió se reencolan al vencer su
+    concesión.
+
+    Los trabajos se reclaman por prioridad y, dentro de cada clase, por
+    antigüedad; cada clase ocupa como mucho su límite de workers (los del
+    planificador), así que un lote de trabajos BATCH no retrasa los clics
+    interactivos.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        runner: Callable[[str, dict], str],
+        workers: int = GEMINI_JOBS_WORKERS,
+        lease_seconds: float = GEMINI_JOBS_LEASE_SECONDS,
+        poll_interval: float = 1.0,
+        versioner: Optional[Callable[[str, dict], str]] = None,
+        result_ttl: Optional[float] = GEMINI_CACHE_TTL,
+        class_limits: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            db_path: Archivo SQLite de la tabla de trabajos
+            runner: Función (operación, payload) -> resultado; lanza una
+                    excepción si el trabajo falla
+            workers: Hilos que ejecutan trabajos
+            lease_seconds: Tiempo tras el cual un trabajo "running" se considera abandonado
+            poll_interval: Segundos entre sondeos de trabajos de otros procesos
+            versioner: Función (operación, payload) -> versión que se añade a la
+                       clave de deduplicación, para no reutilizar resultados de
+                       otra plantilla o modelo
+            result_ttl: Segundos durante los que un resultado terminado se
+                        reutiliza (None = sin caducidad)
+            class_limits: Workers máximos por clase ("interactive", "prefetch",
+                          "batch"); por defecto, los límites del planificador
+        """
+        self.db_path = Path(db_path)
+        self.runner = runner
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.versioner = versioner
+        self.result_ttl = result_ttl
+        limits = dict(GEMINI_SCHEDULER_CLASS_LIMITS)
+        limits.update(class_limits or {})
+        self.class_limits = {p: limits.get(p.name.lower(), workers) for p in Priority}
+        self._running: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._claim_lock = threading.Lock()
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._closed = False
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, dedupe_key TEXT NOT NULL UNIQUE, operation TEXT NOT NULL, "
+                "payload TEXT NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, "
+                "priority INTEGER NOT NULL DEFAULT 0, session_id TEXT NOT NULL DEFAULT 'default', "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Las tablas creadas antes de guardar el contexto de planificación no tienen estas columnas
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "priority" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            if "session_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN session_id TEXT NOT NULL DEFAULT 'default'")
+            conn.execute("DROP INDEX IF EXISTS jobs_status")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, created_at)")
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads = [
+            threading.Thread(target=self._work, name=f"gemini-job-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            operation=row["operation"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            result=row["result"],
+            error=row["error"],
+            attempts=row["attempts"],
+            priority=Priority(row["priority"]),
+            session_id=row["session_id"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def _key(self, operation: str, payload: dict) -> str:
+        version = self.versioner(operation, payload) if self.versioner is not None else ""
+        return job_key(operation, payload, version)
+
+    def _expired(self, row: sqlite3.Row, now: float) -> bool:
+        """Un resultado terminado caduca al pasar `result_ttl` desde que se guardó"""
+        return row["status"] == DONE and self.result_ttl is not None and row["updated_at"] < now - self.result_ttl
+
+    def submit(self, operation: str, payload: dict, priority: Optional[Priority] = None,
+               session_id: Optional[str] = None) -> str:
+        """
+        Encola un trabajo, o devuelve el id de uno idéntico ya existente
+
+        Un trabajo fallido o caducado con la misma clave se reencola, y uno
+        aún en cola sube de clase si se pide con más prioridad. La prioridad
+        y la sesión se guardan con el trabajo para que el worker lo ejecute
+        dentro del mismo `scheduling(...)` que la página que lo pidió.
+
+        Args:
+            priority: Clase de prioridad (por defecto, la del contexto actual)
+            session_id: Sesión para el reparto equitativo (por defecto, la actual)
+
+        Returns:
+            Id del trabajo
+        """
+        context = current_context()
+        priority = context.priority if priority is None else priority
+        session_id = context.session_id if session_id is None else session_id
+        key = self._key(operation, payload)
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, status, priority, updated_at FROM jobs WHERE dedupe_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, dedupe_key, operation, payload, status, priority, session_id, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, key, operation, json.dumps(payload, ensure_ascii=False), QUEUED,
+                     int(priority), session_id, now, now),
+                )
+            else:
+                job_id = row["id"]
+                if row["status"] == FAILED or self._expired(row, now):
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, result = NULL, error = NULL, priority = ?, session_id = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (QUEUED, int(priority), session_id, now, job_id),
+                    )
+                elif row["status"] == QUEUED and priority < row["priority"]:
+                    # Alguien más prioritario espera el mismo resultado: el trabajo sube de clase
+                    conn.execute(
+                        "UPDATE jobs SET priority = ?, session_id = ? WHERE id = ?",
+                        (int(priority), session_id, job_id),
+                    )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Obtiene un trabajo por id"""
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def find(self, operation: str, payload: dict) -> Optional[Job]:
+        """Busca un trabajo por su contenido (sin encolarlo); los resultados caducados no cuentan"""
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE dedupe_key = ?", (self._key(operation, payload),)
+        ).fetchone()
+        if row is None or self._expired(row, time.time()):
+            return None
+        return self._to_job(row)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.1) -> Optional[Job]:
+        """Espera a que un trabajo termine (o a que venza `timeout`) y lo devuelve"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            job = self.get(job_id)
+            if job is None or job.finished:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def counts(self) -> Dict[str, int]:
+        """Número de trabajos por estado"""
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def _claim(self) -> Optional[Job]:
+        """
+        Reclama el trabajo encolado (o abandonado) más prioritario y antiguo
+
+        Solo se consideran las clases que no han llegado a su límite de
+        workers en este proceso.
+        """
+        with self._claim_lock:
+            allowed = [int(p) for p in Priority if self._running[p] < self.class_limits[p]]
+            if not allowed:
+                return None
+            now = time.time()
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = ? OR (status = ? AND updated_at < ?)) "
+                    f"AND priority IN ({', '.join('?' * len(allowed))}) "
+                    "ORDER BY priority, created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - self.lease_seconds, *allowed),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, owner = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (RUNNING, self._owner, now, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if row is None:
+                return None
+            job = self._to_job(row)
+            self._running[job.priority] += 1
+            return job
+
+    def _release(self, job: Job):
+        """Libera el hueco de la clase del trabajo y despierta a otro worker"""
+        with self._claim_lock:
+            self._running[job.priority] -= 1
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ? AND owner = ?",
+            (status, result, error, time.time(), job_id, self._owner),
+        )
+
+    def _work(self):
+        while not self._closed:
+            try:
+                job = self._claim()
+            except sqlite3.Error:
+                job = None
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            try:
+                with scheduling(job.priority, session_id=job.session_id):
+                    result = self.runner(job.operation, job.payload)
+            except Exception as e:
+                self._finish(job.id, FAILED, error=str(e))
+            else:
+                self._finish(job.id, DONE, result=result)
+            finally:
+                self._release(job)
+
+    def close(self):
+        """Detiene los workers (los trabajos en curso terminan)"""
+        self._closed = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+
+def book_payload(book: Book, lang: str, **kwargs) -> dict:
+    """Payload de un trabajo de análisis sobre un libro"""
+    return {"book": book.to_dict(), "lang": lang, "kwargs": kwargs}
+
+
+def _shared_service(service_factory: Callable[[], object]) -> Callable[[], object]:
+    """Crea el servicio la primera vez que se usa y devuelve siempre el mismo"""
+    lock = threading.Lock()
+    holder = {}
+
+    def get_service():
+        with lock:
+            if "service" not in holder:
+                holder["service"] = service_factory()
+        return holder["service"]
+
+    return get_service
+
+
+def make_gemini_runner(service_factory: Callable[[], object]) -> Callable[[str, dict], str]:
+    """
+    Crea un runner que ejecuta métodos de GeminiService a partir de un payload
+
+    Payload: {"lang": ..., "kwargs": {...}, "book": {...}, "other_book": {...}}
+    (`book` y `other_book` son opcionales y se pasan como argumentos posicionales)
+    """
+    get_service = _shared_service(service_factory)
+
+    def runner(operation: str, payload: dict) -> str:
+        service = get_service()
+        if operation.startswith("_") or not hasattr(service, operation):
+            raise JobFailed(f"Operación desconocida: {operation}")
+
+        args = [Book.from_dict(payload[k]) for k in ("book", "other_book") if k in payload]
+        result = getattr(service, operation)(*args, lang=payload.get("lang", "es"), **payload.get("kwargs", {}))
+        if service.is_error_response(result):
+            raise JobFailed(result)
+        return result
+
+    return runner
+
+
+def make_gemini_versioner(service_factory: Callable[[], object]) -> Callable[[str, dict], str]:
+    """
+    Crea un versioner con la plantilla y el modelo de cada operación de GeminiService
+
+    Así, editar un prompt o cambiar de modelo hace que los trabajos se
+    vuelvan a ejecutar en lugar de devolver el resultado anterior.
+    """
+    get_service = _shared_service(service_factory)
+
+    def versioner(operation: str, payload: dict) -> str:
+        service = get_service()
+        try:
+            return service.result_version(operation, payload.get("lang", "es"))
+        except OSError:
+            # Operación sin plantilla: el runner la rechazará
+            return ""
+
+    return versioner
+
+
+_default_queue: Optional[JobQueue] = None
+_default_lock = threading.Lock()
+
+
+def get_job_queue(gemini_service=None) -> JobQueue:
+    """
+    Cola de trabajos de análisis compartida por el proceso
+
+    Args:
+        gemini_service: GeminiService con el que ejecutar los trabajos (ej: el
+                        compartido de la app, para usar el mismo backend, caché
+                        y telemetría); solo cuenta en la primera llamada. Por
+                        defecto se crea uno al primer trabajo.
+    """
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            if gemini_service is None:
+                from src.services.gemini_service import GeminiService
+
+                get_service = _shared_service(GeminiService)
+            else:
+                get_service = _shared_service(lambda: gemini_service)
+            _default_queue = JobQueue(
+                GEMINI_JOBS_DB, make_gemini_runner(get_service), versioner=make_gemini_versioner(get_service)
+            )
+        return _default_queue
@@ -0,0 +1,49 @@
+import json
+import re
+from typing import Any
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Extrae el primer documento JSON (lista u objeto) de una respuesta del modelo
+
+    Acepta respuestas envueltas en bloques ```json ... ``` o con texto
+    adicional antes/después del documento.
+
+    Args:
+        text: Texto devuelto por el modelo
+
+    Returns:
+        Documento JSON decodificado
+
+    Raises:
+        ValueError: Si no se encuentra un JSON válido
+    """
+    if not text:
+        raise ValueError("Respuesta vacía")
+
+    fenced = _FENCE_RE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    candidate = candidate.strip()
+
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    # Buscar el primer bloque delimitado por [] o {}
+    starts = [i for i in (candidate.find("["), candidate.find("{")) if i != -1]
+    if not starts:
+        raise ValueError("No se encontró JSON en la respuesta")
+    start = min(starts)
+    closing = "]" if candidate[start] == "[" else "}"
+    end = candidate.rfind(closing)
+    if end <= start:
+        raise ValueError("JSON incompleto en la respuesta")
+
+    try:
+        return json.loads(candidate[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido en la respuesta: {e}") from e
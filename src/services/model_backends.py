@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+from config.settings import GEMINI_MODEL_NAME, GEMINI_REPLAY_DIR, GEMINI_ROUTING_ENABLED
+
+
+class BackendError(Exception):
+    """Error simulado o de infraestructura en un backend de modelo"""
+
+
+class ReplayMissError(BackendError):
+    """No hay respuesta grabada para el prompt solicitado"""
+
+
+class UsageMetadata:
+    """Conteo de tokens con la misma forma que `usage_metadata` de Gemini"""
+
+    def __init__(self, prompt_token_count: int = 0, candidates_token_count: int = 0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class ModelResponse:
+    """Respuesta mínima compatible con la de `GenerativeModel.generate_content`"""
+
+    def __init__(self, text: str, usage_metadata: Optional[UsageMetadata] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class ModelBackend:
+    """
+    Interfaz de los backends de modelo usados por GeminiService
+
+    Cualquier objeto con `generate_content(prompt)` que devuelva algo con
+    `.text` sirve como backend; esta clase documenta el contrato completo.
+    """
+
+    model_name: str = ""
+
+    def generate_content(self, prompt: str) -> ModelResponse:
+        """Genera la respuesta completa para un prompt"""
+        raise NotImplementedError
+
+    def stream_content(self, prompt: str) -> Iterator[str]:
+        """Genera la respuesta por fragmentos (por defecto, un único fragmento)"""
+        yield self.generate_content(prompt).text
+
+
+class FakeBackend(ModelBackend):
+    """
+    Backend en proceso para pruebas de carga sin consumir cuota
+
+    Simula latencia, errores y streaming de forma reproducible (con `seed`).
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str], str]] = None,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        chunk_size: int = 64,
+        chunk_delay: float = 0.0,
+        seed: Optional[int] = None,
+        model_name: str = "fake-model",
+        prompt_token_latency: float = 0.0,
+    ):
+        """
+        Args:
+            responder: Función prompt -> texto (por defecto, un texto fijo)
+            latency: Segundos de espera por petición, o rango (mín, máx)
+            error_rate: Probabilidad (0-1) de lanzar BackendError
+            chunk_size: Caracteres por fragmento en `stream_content`
+            chunk_delay: Segundos de espera entre fragmentos
+            seed: Semilla para latencias y errores reproducibles
+            model_name: Nombre informativo del modelo simulado
+            prompt_token_latency: Segundos extra por token del prompt (simula
+                                  el procesamiento de la entrada antes del
+                                  primer token de salida)
+        """
+        self.responder = responder or self._default_responder
+        self.latency = latency
+        self.error_rate = error_rate
+        self.chunk_size = max(chunk_size, 1)
+        self.chunk_delay = chunk_delay
+        self.model_name = model_name
+        self.prompt_token_latency = prompt_token_latency
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_responder(prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"Respuesta simulada ({digest})"
+
+    def _next_delay_and_error(self) -> Tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            if isinstance(self.latency, tuple):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = self.latency
+            failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    def generate_content(self, prompt: str) -> ModelResponse:
+        delay, failed = self._next_delay_and_error()
+        delay += self.prompt_token_latency * _estimate_tokens(prompt)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise BackendError("Error simulado del backend")
+        text = self.responder(prompt)
+        return ModelResponse(text, UsageMetadata(_estimate_tokens(prompt), _estimate_tokens(text)))
+
+    def stream_content(self, prompt: str) -> Iterator[str]:
+        text = self.generate_content(prompt).text
+        for start in range(0, len(text), self.chunk_size):
+            if start and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield text[start:start + self.chunk_size]
+
+
+class RecordReplayBackend(ModelBackend):
+    """
+    Graba respuestas reales en disco y las reproduce de forma determinista
+
+    Modos:
+        - "record": consulta el backend interno y guarda cada respuesta
+        - "replay": solo reproduce; lanza ReplayMissError si falta una grabación
+        - "replay_or_record": reproduce si existe, si no consulta y graba
+    """
+
+    MODES = ("record", "replay", "replay_or_record")
+
+    def __init__(self, directory: Union[str, Path], mode: str = "replay", inner: Optional[ModelBackend] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo no válido: {mode}")
+        if mode != "replay" and inner is None:
+            raise ValueError("Los modos de grabación necesitan un backend interno")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.inner = inner
+        # En "replay" no hay backend interno: se informa el modelo configurado
+        self.model_name = getattr(inner, "model_name", "") or GEMINI_MODEL_NAME
+
+    def _path(self, prompt: str) -> Path:
+        # Solo el prompt: lo grabado con el modelo real se reproduce sin backend interno
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _load(self, path: Path) -> ModelResponse:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        usage = data.get("usage") or {}
+        return ModelResponse(data["text"], UsageMetadata(**usage) if usage else None)
+
+    def _save(self, path: Path, prompt: str, response) -> ModelResponse:
+        usage = getattr(response, "usage_metadata", None)
+        record = {"model": self.model_name, "prompt": prompt, "text": response.text}
+        if usage is not None:
+            record["usage"] = {
+                "prompt_token_count": getattr(usage, "prompt_token_count", 0),
+                "candidates_token_count": getattr(usage, "candidates_token_count", 0),
+            }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica para que varios procesos puedan grabar a la vez
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return self._load(path)
+
+    def generate_content(self, prompt: str) -> ModelResponse:
+        path = self._path(prompt)
+        if self.mode != "record" and path.exists():
+            return self._load(path)
+        if self.mode == "replay":
+            raise ReplayMissError(f"Sin grabación para el prompt ({path.name})")
+        return self._save(path, prompt, self.inner.generate_content(prompt))
+
+
+def create_backend(kind: Optional[str] = None, api_key: Optional[str] = None) -> Optional[ModelBackend]:
+    """
+    Crea el backend configurado
+
+    Args:
+        kind: "gemini", "fake", "replay" o "record" (por defecto, la variable
+              de entorno GEMINI_BACKEND o "gemini")
+        api_key: Clave de API para los backends que consultan Gemini (se suma a
+                 las de GEMINI_API_KEYS; ver `client_pool.api_keys_from_env`)
+
+    Returns:
+        Backend listo para usar, o None si falta la API key del backend real
+    """
+    kind = (kind or os.getenv("GEMINI_BACKEND") or "gemini").lower()
+    replay_dir = os.getenv("GEMINI_REPLAY_DIR") or GEMINI_REPLAY_DIR
+
+    def gemini() -> Optional[ModelBackend]:
+        # Clientes reales compartidos por el proceso (una o varias claves)
+        from src.services.client_pool import PooledGeminiBackend, api_keys_from_env, get_client_pool
+
+        keys = api_keys_from_env(api_key)
+        if not keys:
+            return None
+        if GEMINI_ROUTING_ENABLED:
+            from src.services.model_router import ModelRouter
+
+            return ModelRouter(lambda model_name: PooledGeminiBackend(get_client_pool(keys, model_name)))
+        return PooledGeminiBackend(get_client_pool(keys))
+
+    if kind == "fake":
+        return FakeBackend(
+            latency=float(os.getenv("GEMINI_FAKE_LATENCY", "0")),
+            error_rate=float(os.getenv("GEMINI_FAKE_ERROR_RATE", "0")),
+        )
+    if kind == "replay":
+        return RecordReplayBackend(replay_dir, mode="replay")
+    if kind in ("record", "replay_or_record"):
+        inner = gemini()
+        return RecordReplayBackend(replay_dir, mode=kind, inner=inner) if inner else None
+    if kind == "gemini":
+        return gemini()
+    raise ValueError(f"Backend desconocido: {kind}")
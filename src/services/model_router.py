@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.services.model_backends import ModelBackend
+from config.settings import (
+    GEMINI_DEFAULT_TIER,
+    GEMINI_MODEL_TIERS,
+    GEMINI_OPERATION_TIERS,
+    GEMINI_ROUTER_COOLDOWN_SECONDS,
+    GEMINI_ROUTER_MAX_ERROR_RATE,
+    GEMINI_ROUTER_MIN_SAMPLES,
+    GEMINI_ROUTER_SLOW_P95_SECONDS,
+    GEMINI_ROUTER_WINDOW,
+)
+
+
+class RoutedResponse:
+    """Respuesta de un modelo junto con el nombre del modelo que la generó"""
+
+    def __init__(self, response, model_name: str):
+        self.response = response
+        self.model_name = model_name
+
+    @property
+    def text(self) -> str:
+        return self.response.text
+
+    @property
+    def usage_metadata(self):
+        return getattr(self.response, "usage_metadata", None)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ModelHealth:
+    """Latencias y errores recientes de un modelo"""
+
+    def __init__(self, window: int):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.skipped_until = 0.0
+        self.calls = 0
+        self.failovers = 0
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((latency, ok))
+        self.calls += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency(self, fraction: float) -> float:
+        return _percentile(sorted(latency for latency, ok in self.samples if ok), fraction)
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "calls": self.calls,
+            "failovers": self.failovers,
+            "error_rate": self.error_rate,
+            "latency_p50": self.latency(0.50),
+            "latency_p95": self.latency(0.95),
+            "latency_p99": self.latency(0.99),
+            "skipped_seconds": max(0.0, self.skipped_until - now),
+        }
+
+
+class ModelRouter(ModelBackend):
+    """
+    Envía cada operación al nivel de modelo configurado, con respaldo automático
+
+    Cada nivel es una lista de modelos en orden de preferencia. Se usa el
+    primero sano; si falla, se prueba el siguiente. Un modelo con demasiados
+    errores o un p95 de latencia excesivo se salta durante `cooldown`
+    segundos y después vuelve a probarse.
+    """
+
+    model_name = "router"
+
+    def __init__(
+        self,
+        backend_factory: Callable[[str], ModelBackend],
+        tiers: Optional[Dict[str, Sequence[str]]] = None,
+        operation_tiers: Optional[Dict[str, str]] = None,
+        default_tier: str = GEMINI_DEFAULT_TIER,
+        window: int = GEMINI_ROUTER_WINDOW,
+        min_samples: int = GEMINI_ROUTER_MIN_SAMPLES,
+        max_error_rate: float = GEMINI_ROUTER_MAX_ERROR_RATE,
+        slow_p95: float = GEMINI_ROUTER_SLOW_P95_SECONDS,
+        cooldown: float = GEMINI_ROUTER_COOLDOWN_SECONDS,
+    ):
+        """
+        Args:
+            backend_factory: Crea el backend de un modelo a partir de su nombre
+            tiers: {nivel: [modelos]}; por defecto, GEMINI_MODEL_TIERS
+            operation_tiers: {operación: nivel}; por defecto, GEMINI_OPERATION_TIERS
+            default_tier: Nivel de las operaciones no configuradas
+        """
+        self.tiers = {tier: list(models) for tier, models in (tiers or GEMINI_MODEL_TIERS).items()}
+        self.operation_tiers = dict(GEMINI_OPERATION_TIERS if operation_tiers is None else operation_tiers)
+        if default_tier not in self.tiers:
+            raise ValueError(f"Nivel por defecto desconocido: {default_tier}")
+        self.default_tier = default_tier
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.slow_p95 = slow_p95
+        self.cooldown = cooldown
+        self._factory = backend_factory
+        self._backends: Dict[str, ModelBackend] = {}
+        self._health: Dict[str, ModelHealth] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def models_for(self, operation: Optional[str]) -> List[str]:
+        """Modelos candidatos de una operación, en orden de preferencia"""
+        tier = self.operation_tiers.get(operation or "", self.default_tier)
+        return self.tiers.get(tier, self.tiers[self.default_tier])
+
+    def model_name_for(self, operation: Optional[str]) -> str:
+        """Modelo principal de una operación (forma parte de la clave de caché)"""
+        return self.models_for(operation)[0]
+
+    def _backend(self, model: str) -> ModelBackend:
+        with self._lock:
+            backend = self._backends.get(model)
+            if backend is None:
+                backend = self._factory(model)
+                self._backends[model] = backend
+                self._health[model] = ModelHealth(self._window)
+            return backend
+
+    def _available(self, models: List[str], now: float) -> List[str]:
+        """Candidatos sanos primero; si ninguno lo está, todos (mejor intentar que fallar)"""
+        with self._lock:
+            healthy = [m for m in models if m not in self._health or self._health[m].skipped_until <= now]
+        return healthy or list(models)
+
+    def _record(self, model: str, latency: float, ok: bool):
+        with self._lock:
+            health = self._health[model]
+            health.record(latency, ok)
+            if len(health.samples) < self.min_samples:
+                return
+            if health.error_rate > self.max_error_rate or health.latency(0.95) > self.slow_p95:
+                health.skipped_until = time.time() + self.cooldown
+                # Tras la pausa el modelo empieza de cero: una muestra nueva decide
+                health.samples.clear()
+
+    def generate_for(self, operation: Optional[str], prompt: str) -> RoutedResponse:
+        """
+        Genera la respuesta de una operación con el primer modelo sano de su nivel
+
+        Raises:
+            La excepción del último modelo probado, si fallan todos
+        """
+        candidates = self._available(self.models_for(operation), time.time())
+        last_error: Optional[Exception] = None
+        for index, model in enumerate(candidates):
+            backend = self._backend(model)
+            started = time.perf_counter()
+            try:
+                response = backend.generate_content(prompt)
+                response.text
+            except Exception as e:
+                self._record(model, time.perf_counter() - started, ok=False)
+                last_error = e
+                if index + 1 < len(candidates):
+                    with self._lock:
+                        self._health[model].failovers += 1
+                continue
+            self._record(model, time.perf_counter() - started, ok=True)
+            return RoutedResponse(response, model)
+        raise last_error
+
+    def generate_content(self, prompt: str) -> RoutedResponse:
+        return self.generate_for(None, prompt)
+
+    def stream_content(self, prompt: str) -> Iterator[str]:
+        model = self._available(self.models_for(None), time.time())[0]
+        yield from self._backend(model).stream_content(prompt)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Latencias (p50/p95/p99), tasa de error y respaldos por modelo"""
+        now = time.time()
+        with self._lock:
+            return {model: health.to_dict(now) for model, health in self._health.items()}
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from src.models.book import Book
+from src.services.request_scheduler import Priority, scheduling
+from config.settings import GEMINI_PREFETCH_BUDGET_PER_MINUTE, GEMINI_PREFETCH_OPERATIONS, GEMINI_PREFETCH_WORKERS
+
+
+class PrefetchBudget:
+    """Límite de peticiones especulativas por ventana de tiempo (compartido por el proceso)"""
+
+    def __init__(self, max_requests: int, window_seconds: float = 60.0):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Reserva una petición si queda presupuesto en la ventana actual"""
+        now = time.monotonic()
+        with self._lock:
+            while self._timestamps and now - self._timestamps[0] >= self.window_seconds:
+                self._timestamps.popleft()
+            if len(self._timestamps) >= self.max_requests:
+                return False
+            self._timestamps.append(now)
+            return True
+
+
+_shared_lock = threading.Lock()
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_budget: Optional[PrefetchBudget] = None
+
+
+def _shared_resources() -> Tuple[ThreadPoolExecutor, PrefetchBudget]:
+    global _shared_executor, _shared_budget
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                max_workers=GEMINI_PREFETCH_WORKERS, thread_name_prefix="gemini-prefetch"
+            )
+            _shared_budget = PrefetchBudget(GEMINI_PREFETCH_BUDGET_PER_MINUTE)
+        return _shared_executor, _shared_budget
+
+
+class Prefetcher:
+    """
+    Precarga en segundo plano los análisis más probables de un libro
+
+    Se usa una instancia por sesión. Al cambiar la selección se cancelan las
+    peticiones pendientes de la selección anterior. Los resultados quedan en
+    la caché de respuestas del GeminiService, así que sin caché no hace nada.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[ThreadPoolExecutor] = None,
+        budget: Optional[PrefetchBudget] = None,
+        operations: Sequence[str] = GEMINI_PREFETCH_OPERATIONS,
+    ):
+        """
+        Args:
+            executor: Pool de hilos (por defecto, uno compartido por el proceso)
+            budget: Presupuesto de peticiones (por defecto, uno compartido)
+            operations: Métodos de GeminiService a precargar, en orden de prioridad
+        """
+        if executor is None or budget is None:
+            shared_executor, shared_budget = _shared_resources()
+            executor = executor or shared_executor
+            budget = budget or shared_budget
+        self.executor = executor
+        self.budget = budget
+        self.operations = tuple(operations)
+        self._selection: Optional[Tuple[int, str]] = None
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def on_selection(self, gemini_service, book: Book, lang: str = "es") -> List[Future]:
+        """
+        Notifica la selección actual; lanza la precarga si ha cambiado
+
+        Args:
+            gemini_service: Servicio con caché de respuestas
+            book: Libro seleccionado
+            lang: Idioma de los análisis
+
+        Returns:
+            Peticiones lanzadas (vacío si la selección no cambió o no hay presupuesto)
+        """
+        selection = (book.id, lang)
+        with self._lock:
+            if selection == self._selection:
+                return []
+            self._cancel_pending()
+            self._selection = selection
+
+            if gemini_service.cache is None or not gemini_service.is_configured():
+                return []
+
+            for operation in self.operations:
+                if gemini_service.is_cached_for_book(operation, book, lang):
+                    continue
+                if not self.budget.try_acquire():
+                    break
+                self._futures.append(
+                    self.executor.submit(self._run, gemini_service, operation, book, lang, selection)
+                )
+            return list(self._futures)
+
+    def _run(self, gemini_service, operation: str, book: Book, lang: str, selection: Tuple[int, str]):
+        # Si la selección cambió mientras esperaba en la cola, no gastar cuota
+        if self._selection != selection:
+            return None
+        with scheduling(Priority.PREFETCH, session_id=f"prefetch:{id(self)}"):
+            return getattr(gemini_service, operation)(book, lang)
+
+    def _cancel_pending(self):
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def cancel(self):
+        """Cancela las precargas pendientes"""
+        with self._lock:
+            self._cancel_pending()
+            self._selection = None
@@ -0,0 +1,101 @@
+"""
+Presupuesto de tokens de los prompts de Gemini
+
+Estima localmente el tamaño de un prompt y, si supera el presupuesto de su
+operación, resume el contexto largo del libro (descripción, biografía del
+autor, listas de preguntas) hasta que quepa. Las instrucciones fijas no se
+recortan nunca: solo los campos de `TRIMMABLE_FIELDS`.
+"""
+
+import re
+from typing import Dict, List, Mapping
+
+from src.prompts import PromptTemplate
+from config.settings import GEMINI_PROMPT_DEFAULT_BUDGET, GEMINI_PROMPT_TOKEN_BUDGETS
+
+# Campos de contexto que se pueden resumir (también con prefijo, ej: book1_description)
+TRIMMABLE_FIELDS = ("description", "author_bio", "pre_questions", "post_questions")
+ELLIPSIS = "…"
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación local de tokens (~4 caracteres por token)"""
+    return len(text) // 4 + 1
+
+
+def budget_for(operation: str) -> int:
+    """Presupuesto de tokens de prompt de una operación"""
+    return GEMINI_PROMPT_TOKEN_BUDGETS.get(operation, GEMINI_PROMPT_DEFAULT_BUDGET)
+
+
+def format_list(items: List[str]) -> str:
+    """Una línea por elemento, para incluir listas (ej: preguntas) en un prompt"""
+    return "\n".join(f"- {item}" for item in items)
+
+
+def summarize_text(text: str, max_tokens: int) -> str:
+    """
+    Resume un texto de forma extractiva para que quepa en `max_tokens`
+
+    Conserva líneas completas (listas) u oraciones completas desde el
+    principio; si ni la primera cabe, corta por la última palabra entera.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Margen para el separador y la elipsis finales
+    max_chars = max(max_tokens - 1, 0) * 4 - len(ELLIPSIS) - 1
+    if max_chars <= 0:
+        return ""
+
+    units = text.splitlines() if "\n" in text else _SENTENCE_RE.split(text)
+    separator = "\n" if "\n" in text else " "
+    kept: List[str] = []
+    used = 0
+    for unit in units:
+        cost = len(unit) + (len(separator) if kept else 0)
+        if used + cost > max_chars:
+            break
+        kept.append(unit)
+        used += cost
+    if kept:
+        return separator.join(kept) + separator + ELLIPSIS
+
+    cut = text[:max_chars]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip(" ,;:") + ELLIPSIS
+
+
+def _trimmable(field: str) -> bool:
+    return any(field == name or field.endswith(f"_{name}") for name in TRIMMABLE_FIELDS)
+
+
+def fit_context(template: PromptTemplate, context: Mapping[str, object], max_tokens: int) -> Dict[str, object]:
+    """
+    Ajusta el contexto de una plantilla para que el prompt quepa en `max_tokens`
+
+    El coste fijo (plantilla y campos no recortables) se mide renderizando
+    con los campos recortables vacíos; lo que queda se reparte entre ellos
+    a partes iguales, y lo que no usa un campo corto pasa a los demás.
+
+    Returns:
+        Contexto (una copia si hubo que recortar)
+    """
+    fields = [f for f in template.fields if _trimmable(f) and f in context]
+    if not fields or estimate_tokens(template.render(**context)) <= max_tokens:
+        return dict(context)
+
+    trimmed = dict(context)
+    for field in fields:
+        trimmed[field] = ""
+    available = max_tokens - estimate_tokens(template.render(**trimmed))
+    # Repartir de menor a mayor: los campos cortos ceden su sobrante
+    pending = sorted(fields, key=lambda f: len(str(context[f])))
+    for index, field in enumerate(pending):
+        share = max(available, 0) // (len(pending) - index)
+        text = summarize_text(str(context[field]), share)
+        trimmed[field] = text
+        available -= estimate_tokens(text) if text else 0
+    return trimmed
@@ -0,0 +1,175 @@
+import re
+import threading
+import unicodedata
+import zlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+# numpy se importa al vectorizar la primera consulta, no al importar el módulo
+if TYPE_CHECKING:
+    import numpy as np
+
+STOPWORDS = {
+    # Español
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al", "y", "e",
+    "en", "que", "lo", "su", "sus", "libro", "libros", "tema",
+    # Inglés
+    "the", "a", "an", "of", "and", "in", "on", "to", "book", "books", "topic", "theme",
+}
+
+# Palabras que cambian el sentido de la consulta ("amor sin esperanza" no es
+# "amor con esperanza"): no son vacías y deben coincidir para reutilizar una respuesta
+POLARITY_WORDS = {
+    # Español
+    "sin", "con", "no", "ni", "nunca", "para", "por", "sobre", "contra", "o", "u",
+    # Inglés
+    "without", "with", "no", "not", "never", "for", "by", "about", "against", "or",
+}
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACES_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def fold_accents(text: str) -> str:
+    """Elimina tildes y diacríticos ("García Márquez" -> "Garcia Marquez")"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normaliza una consulta de texto libre
+
+    Pliega tildes, pasa a minúsculas, elimina puntuación y palabras vacías.
+    Si la consulta solo contiene palabras vacías, se conservan.
+    """
+    folded = _NON_WORD_RE.sub(" ", fold_accents(text).casefold())
+    words = _SPACES_RE.sub(" ", folded).strip().split(" ")
+    meaningful = [w for w in words if w and w not in STOPWORDS]
+    return " ".join(meaningful or [w for w in words if w])
+
+
+def anchor_tokens(normalized: str) -> Tuple[str, ...]:
+    """
+    Números y palabras de polaridad de una consulta normalizada
+
+    Dos consultas parecidas solo son equivalentes si sus anclas coinciden
+    ("consulta 12" -> ("12",), "amor sin esperanza" -> ("sin",)).
+    """
+    anchors = []
+    for word in normalized.split(" "):
+        if word in POLARITY_WORDS:
+            anchors.append(word)
+        else:
+            anchors.extend(_NUMBER_RE.findall(word))
+    return tuple(anchors)
+
+
+class QueryVectorizer:
+    """Vectores de n-gramas de caracteres con hashing estable (crc32)"""
+
+    def __init__(self, dim: int = 512, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def vectorize(self, normalized: str) -> "np.ndarray":
+        """Vector L2-normalizado de una consulta ya normalizada"""
+        import numpy as np
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {normalized} "
+        for i in range(max(len(padded) - self.ngram + 1, 1)):
+            gram = padded[i:i + self.ngram]
+            vector[zlib.crc32(gram.encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class _Namespace:
+    def __init__(self, dim: int):
+        import numpy as np
+
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.queries: List[str] = []
+        self.anchors: List[Tuple[str, ...]] = []
+        self.exact: Dict[str, str] = {}
+
+    def add(self, normalized: str, query: str, vector: "np.ndarray"):
+        import numpy as np
+
+        if len(self.queries) == len(self.matrix):
+            grown = np.zeros((len(self.matrix) * 2, self.matrix.shape[1]), dtype=np.float32)
+            grown[:len(self.matrix)] = self.matrix
+            self.matrix = grown
+        self.matrix[len(self.queries)] = vector
+        self.queries.append(query)
+        self.anchors.append(anchor_tokens(normalized))
+        self.exact[normalized] = query
+
+
+class SemanticQueryIndex:
+    """
+    Índice de consultas ya respondidas para reutilizar respuestas cacheadas
+
+    Cada espacio de nombres (ej: operación + idioma) guarda las consultas
+    originales. Una consulta nueva se asocia a una previa si su forma
+    normalizada coincide o si la similitud coseno de sus n-gramas supera
+    el umbral y ambas tienen las mismas anclas: números y palabras de
+    polaridad ("Los miserables 2" no reutiliza "Los miserables", ni
+    "amor sin esperanza" reutiliza "amor con esperanza").
+    """
+
+    def __init__(self, threshold: float = 0.9, dim: int = 512, ngram: int = 3):
+        """
+        Args:
+            threshold: Similitud coseno mínima (0-1) para reutilizar una consulta
+            dim: Dimensión de los vectores de n-gramas
+            ngram: Longitud de los n-gramas de caracteres
+        """
+        self.threshold = threshold
+        self.vectorizer = QueryVectorizer(dim, ngram)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: str, query: str) -> Optional[str]:
+        """
+        Busca una consulta previa equivalente
+
+        Returns:
+            La consulta original ya respondida, o None si no hay ninguna parecida
+        """
+        normalized = normalize_query(query)
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is None or not space.queries:
+                return None
+            exact = space.exact.get(normalized)
+            if exact is not None:
+                return exact
+            matrix = space.matrix[:len(space.queries)]
+            queries = space.queries
+            anchors = space.anchors
+
+        import numpy as np
+
+        scores = matrix @ self.vectorizer.vectorize(normalized)
+        wanted = anchor_tokens(normalized)
+        candidates = np.flatnonzero(scores >= self.threshold)
+        # La más parecida cuyas anclas coincidan: otra cifra o preposición es otra pregunta
+        for best in candidates[np.argsort(-scores[candidates])]:
+            if anchors[best] == wanted:
+                return queries[best]
+        return None
+
+    def add(self, namespace: str, query: str):
+        """Registra una consulta cuya respuesta ya está en la caché"""
+        normalized = normalize_query(query)
+        vector = self.vectorizer.vectorize(normalized)
+        with self._lock:
+            space = self._namespaces.setdefault(namespace, _Namespace(self.vectorizer.dim))
+            if normalized not in space.exact:
+                space.add(normalized, query, vector)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(space.queries) for space in self._namespaces.values())
@@ -1,5 +1,6 @@
 from typing import List, Dict
 from src.models.book import Book
+from src.models.answer import ReaderAnswer
 
 
 class QuestionService:
@@ -26,3 +27,33 @@ class QuestionService:
             "total_questions": len(answers),
             "answered": len([a for a in answers.values() if a.strip()]),
         }
+
+    @staticmethod
+    def build_reader_answers(
+        book: Book, answers: Dict[int, str], question_type: str, reader_id: str = "anon"
+    ) -> List[ReaderAnswer]:
+        """
+        Convierte las respuestas de `display_questions` en ReaderAnswer
+
+        Args:
+            book: Libro al que pertenecen las preguntas
+            answers: Respuestas indexadas desde 1 (como las devuelve display_questions)
+            question_type: "pre" o "post"
+            reader_id: Identificador del lector
+
+        Returns:
+            Lista de respuestas no vacías listas para calificar
+        """
+        questions = book.pre_questions if question_type == "pre" else book.post_questions
+        result = []
+        for index, answer in answers.items():
+            if not answer or not answer.strip() or not 1 <= index <= len(questions):
+                continue
+            result.append(ReaderAnswer(
+                id=f"{book.id}:{reader_id}:{question_type}:{index}",
+                reader_id=reader_id,
+                question_type=question_type,
+                question=questions[index - 1],
+                answer=answer.strip(),
+            ))
+        return result
@@ -0,0 +1,249 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Deque, Dict, Optional
+
+from config.settings import (
+    GEMINI_SCHEDULER_CLASS_LIMITS,
+    GEMINI_SCHEDULER_CONCURRENCY,
+    GEMINI_SCHEDULER_DEADLINES,
+)
+
+
+class Priority(IntEnum):
+    """Clases de prioridad (menor valor = más prioritaria)"""
+
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BATCH = 2
+
+
+class DeadlineExceeded(Exception):
+    """La petición esperó en la cola más allá de su plazo y se descartó"""
+
+
+def class_timeout(priority: Priority) -> Optional[float]:
+    """Segundos máximos en cola de una clase (None = sin plazo)"""
+    return GEMINI_SCHEDULER_DEADLINES.get(priority.name.lower())
+
+
+class RequestContext:
+    """
+    Prioridad, sesión y espera máxima en cola de las peticiones del hilo actual
+
+    `timeout` es relativo: el plazo de cada petición se calcula al encolarla,
+    así que un bloque largo (ej: un lote) no deja sin plazo a sus últimas
+    peticiones.
+    """
+
+    def __init__(self, priority: Priority = Priority.INTERACTIVE, session_id: str = "default",
+                 timeout: Optional[float] = None):
+        self.priority = priority
+        self.session_id = session_id
+        self.timeout = timeout
+
+
+_current_context = contextvars.ContextVar("gemini_request_context", default=RequestContext())
+
+
+def current_context() -> RequestContext:
+    return _current_context.get()
+
+
+@contextmanager
+def scheduling(priority: Optional[Priority] = None, session_id: Optional[str] = None,
+               timeout: Optional[float] = None):
+    """
+    Define la prioridad, sesión y plazo de las peticiones dentro del bloque
+
+    Uso:
+        with scheduling(Priority.BATCH, session_id="job-42", timeout=300):
+            gemini_service.get_book_summary(book)
+
+    Args:
+        priority: Clase de prioridad (por defecto, la del contexto actual)
+        session_id: Sesión para el reparto equitativo (por defecto, la actual)
+        timeout: Segundos máximos de espera en cola (por defecto, el de la clase)
+    """
+    parent = current_context()
+    priority = parent.priority if priority is None else priority
+    if timeout is None:
+        timeout = class_timeout(priority)
+    token = _current_context.set(RequestContext(
+        priority=priority,
+        session_id=parent.session_id if session_id is None else session_id,
+        timeout=parent.timeout if timeout is None else timeout,
+    ))
+    try:
+        yield
+    finally:
+        _current_context.reset(token)
+
+
+class _Task:
+    __slots__ = ("fn", "future", "deadline")
+
+    def __init__(self, fn: Callable, future: Future, deadline: Optional[float]):
+        self.fn = fn
+        self.future = future
+        self.deadline = deadline
+
+
+class RequestScheduler:
+    """
+    Planificador central de peticiones al modelo
+
+    - Clases de prioridad: siempre se atiende primero la más prioritaria
+    - Límite de concurrencia por clase, para que el trabajo en segundo plano
+      nunca ocupe todos los workers
+    - Reparto round-robin entre sesiones dentro de cada clase
+    - Las peticiones cuyo plazo vence mientras esperan se descartan
+    """
+
+    def __init__(self, max_concurrency: int = GEMINI_SCHEDULER_CONCURRENCY,
+                 class_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_concurrency: Peticiones simultáneas en total
+            class_limits: Peticiones simultáneas por clase ("interactive",
+                          "prefetch", "batch"); por defecto, las de settings
+        """
+        limits = dict(GEMINI_SCHEDULER_CLASS_LIMITS)
+        limits.update(class_limits or {})
+        self.max_concurrency = max_concurrency
+        self.class_limits = {p: min(limits.get(p.name.lower(), max_concurrency), max_concurrency) for p in Priority}
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[_Task]]"] = {p: OrderedDict() for p in Priority}
+        self._running: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._dropped = 0
+        self._condition = threading.Condition()
+        self._workers = []
+        self._closed = False
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        for i in range(self.max_concurrency):
+            worker = threading.Thread(target=self._work, name=f"gemini-scheduler-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, fn: Callable, priority: Optional[Priority] = None, session_id: Optional[str] = None,
+               deadline: Optional[float] = None) -> Future:
+        """
+        Encola una petición
+
+        Args:
+            fn: Función sin argumentos que realiza la llamada al modelo
+            priority: Clase de prioridad (por defecto, la del contexto actual)
+            session_id: Sesión que origina la petición (por defecto, la del contexto)
+            deadline: Instante (time.monotonic) tras el cual descartarla (por
+                      defecto, ahora más la espera máxima del contexto o de la clase)
+
+        Returns:
+            Future con el resultado, o con DeadlineExceeded si se descartó
+        """
+        context = current_context()
+        if priority is None or priority == context.priority:
+            priority, timeout = context.priority, context.timeout
+        else:
+            timeout = class_timeout(priority)
+        session_id = context.session_id if session_id is None else session_id
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("El planificador está cerrado")
+            self._ensure_workers()
+            self._queues[priority].setdefault(session_id, deque()).append(_Task(fn, future, deadline))
+            self._condition.notify()
+        return future
+
+    def run(self, fn: Callable, **kwargs):
+        """Encola una petición y espera su resultado"""
+        return self.submit(fn, **kwargs).result()
+
+    def _next_task(self):
+        """Elige la siguiente tarea (se llama con el Condition adquirido)"""
+        for priority in Priority:
+            if self._running[priority] >= self.class_limits[priority]:
+                continue
+            sessions = self._queues[priority]
+            while sessions:
+                session_id, tasks = next(iter(sessions.items()))
+                task = tasks.popleft()
+                # Round-robin: la sesión pasa al final de la cola
+                del sessions[session_id]
+                if tasks:
+                    sessions[session_id] = tasks
+                if task.future.set_running_or_notify_cancel():
+                    return priority, task
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                selected = self._next_task()
+                while selected is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    selected = self._next_task()
+                priority, task = selected
+                self._running[priority] += 1
+
+            try:
+                if task.deadline is not None and time.monotonic() > task.deadline:
+                    with self._condition:
+                        self._dropped += 1
+                    task.future.set_exception(DeadlineExceeded("Plazo vencido en la cola"))
+                else:
+                    try:
+                        task.future.set_result(task.fn())
+                    except BaseException as e:
+                        task.future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._running[priority] -= 1
+                    self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Tareas en cola y en ejecución por clase"""
+        with self._condition:
+            return {
+                p.name.lower(): {
+                    "queued": sum(len(q) for q in self._queues[p].values()),
+                    "running": self._running[p],
+                }
+                for p in Priority
+            }
+
+    @property
+    def dropped_count(self) -> int:
+        """Peticiones descartadas por plazo vencido"""
+        with self._condition:
+            return self._dropped
+
+    def shutdown(self):
+        """Detiene los workers cuando terminan las tareas en curso"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """Planificador compartido por todo el proceso"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
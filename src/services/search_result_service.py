@@ -0,0 +1,114 @@
+import json
+from typing import Any, List
+
+from src.models.search_result import BookResult
+from src.i18n.i18n_service import t
+from config.settings import CATALOG_YEAR_RANGE
+
+
+class SearchResultService:
+    @staticmethod
+    def validate_results(data: Any) -> List[BookResult]:
+        """
+        Valida la salida JSON del modelo y la convierte en BookResult
+
+        Acepta tanto `{"results": [...]}` como una lista directa. Descarta
+        resultados duplicados (mismo título y autor).
+
+        Raises:
+            ValueError: Si la estructura no es válida
+        """
+        items = data.get("results") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError("Se esperaba una lista de resultados")
+
+        results: List[BookResult] = []
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError(f"Resultado inválido: {item}")
+            title = str(item.get("title") or "").strip()
+            author = str(item.get("author") or "").strip()
+            if not title or not author:
+                raise ValueError(f"Resultado sin título o autor: {item}")
+
+            year = item.get("year")
+            try:
+                year = int(year) if year not in (None, "") else None
+            except (TypeError, ValueError):
+                year = None
+            if year is not None and not CATALOG_YEAR_RANGE[0] <= year <= CATALOG_YEAR_RANGE[1]:
+                year = None
+
+            key = (title.casefold(), author.casefold())
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(BookResult(
+                title=title,
+                author=author,
+                year=year,
+                genre=str(item.get("genre") or "").strip(),
+                reason=str(item.get("reason") or "").strip(),
+            ))
+        return results
+
+    @staticmethod
+    def link_to_catalog(results: List[BookResult], book_service) -> List[BookResult]:
+        """
+        Enlaza cada resultado con el libro del catálogo local, si existe
+
+        Args:
+            results: Resultados a enlazar (se modifican en el sitio)
+            book_service: BookService con el catálogo
+
+        Returns:
+            Los mismos resultados, con `catalog_id` cuando hay coincidencia
+        """
+        for result in results:
+            book = book_service.get_book_by_title(result.title)
+            if book is None:
+                continue
+            catalog_author = book.author.casefold()
+            author = result.author.casefold()
+            # Tolerar variantes como "Orwell" frente a "George Orwell"
+            if author in catalog_author or catalog_author in author:
+                result.catalog_id = book.id
+        return results
+
+    @staticmethod
+    def format_results_markdown(results: List[BookResult], lang: str = "es") -> str:
+        """Formatea los resultados como markdown para mostrar"""
+        if not results:
+            return t("result_none", lang)
+
+        blocks = []
+        for i, result in enumerate(results, 1):
+            lines = [f"### {i}. 📖 {result.title} — *{result.author}*"]
+            details = []
+            if result.year is not None:
+                details.append(f"**{t('result_year', lang)}:** {result.year}")
+            if result.genre:
+                details.append(f"**{t('result_genre', lang)}:** {result.genre}")
+            if details:
+                lines.append(" | ".join(details))
+            if result.reason:
+                lines.append(f"**{t('result_reason', lang)}:** {result.reason}")
+            if result.catalog_id is not None:
+                lines.append(t("result_in_catalog", lang))
+            blocks.append("\n\n".join(lines))
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def to_compact_json(results: List[BookResult]) -> str:
+        """Serializa los resultados de forma compacta (omite campos vacíos)"""
+        return json.dumps(
+            [{k: v for k, v in r.to_dict().items() if v not in (None, "")} for r in results],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+    @staticmethod
+    def from_compact_json(text: str) -> List[BookResult]:
+        """Restaura resultados serializados con `to_compact_json`"""
+        return [BookResult.from_dict(item) for item in json.loads(text)]
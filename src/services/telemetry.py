@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import GEMINI_METRICS_EXPORT_INTERVAL, GEMINI_METRICS_WINDOW
+
+
+@dataclass
+class OperationRecord:
+    operation: str
+    lang: str
+    latency: float
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    tokens_estimated: bool = False
+    cache_hit: bool = False
+    error_class: Optional[str] = None
+    model: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _summarize(records: Iterable[OperationRecord]) -> Dict:
+    """Estadísticas agregadas de un conjunto de registros"""
+    records = list(records)
+    calls = [r for r in records if not r.cache_hit and r.error_class is None]
+    latencies = sorted(r.latency for r in calls)
+    errors = Counter(r.error_class for r in records if r.error_class)
+    cache_hits = sum(1 for r in records if r.cache_hit)
+    return {
+        "count": len(records),
+        "model_calls": len(calls),
+        "cache_hits": cache_hits,
+        "cache_hit_rate": cache_hits / len(records) if records else 0.0,
+        "errors": dict(errors),
+        "prompt_tokens": sum(r.prompt_tokens for r in calls),
+        "output_tokens": sum(r.output_tokens for r in calls),
+        "estimated_token_calls": sum(1 for r in calls if r.tokens_estimated),
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_p99": _percentile(latencies, 0.99),
+        "latency_max": latencies[-1] if latencies else 0.0,
+    }
+
+
+class Telemetry:
+    """
+    Estadísticas móviles por operación e idioma de las llamadas a Gemini
+
+    Conserva los últimos `window` registros de cada par (operación, idioma)
+    y, si se indica `export_path`, vuelca periódicamente un JSON con las
+    estadísticas agregadas.
+    """
+
+    def __init__(self, window: int = GEMINI_METRICS_WINDOW, export_path: Optional[str] = None,
+                 export_interval: float = GEMINI_METRICS_EXPORT_INTERVAL):
+        """
+        Args:
+            window: Registros conservados por operación e idioma
+            export_path: Archivo JSON donde exportar las métricas (opcional)
+            export_interval: Segundos mínimos entre exportaciones automáticas
+        """
+        self.window = window
+        self.export_path = Path(export_path) if export_path else None
+        self.export_interval = export_interval
+        self._records: Dict[Tuple[str, str], Deque[OperationRecord]] = {}
+        self._totals: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+
+    def record(self, record: OperationRecord):
+        """Registra una operación"""
+        with self._lock:
+            key = (record.operation, record.lang)
+            bucket = self._records.get(key)
+            if bucket is None:
+                bucket = self._records[key] = deque(maxlen=self.window)
+            bucket.append(record)
+            self._totals["count"] += 1
+            if not record.cache_hit and record.error_class is None:
+                self._totals["prompt_tokens"] += record.prompt_tokens
+                self._totals["output_tokens"] += record.output_tokens
+            should_export = (
+                self.export_path is not None
+                and time.monotonic() - self._last_export >= self.export_interval
+            )
+            if should_export:
+                self._last_export = time.monotonic()
+        if should_export:
+            try:
+                self.export(self.export_path)
+            except OSError:
+                pass  # Las métricas no deben romper la aplicación
+
+    def stats(self) -> Dict:
+        """
+        Estadísticas agregadas
+
+        Returns:
+            Diccionario con `operations` (por operación y por idioma),
+            `languages` (por idioma) y `totals` (acumulados desde el arranque)
+        """
+        with self._lock:
+            snapshot = {key: list(bucket) for key, bucket in self._records.items()}
+            totals = dict(self._totals)
+
+        operations: Dict[str, Dict] = {}
+        by_language: Dict[str, List[OperationRecord]] = {}
+        for (operation, lang), records in sorted(snapshot.items()):
+            entry = operations.setdefault(operation, {"all": [], "languages": {}})
+            entry["all"].extend(records)
+            entry["languages"][lang] = _summarize(records)
+            by_language.setdefault(lang, []).extend(records)
+
+        return {
+            "generated_at": time.time(),
+            "window": self.window,
+            "totals": totals,
+            "operations": {
+                operation: {**_summarize(entry["all"]), "languages": entry["languages"]}
+                for operation, entry in operations.items()
+            },
+            "languages": {lang: _summarize(records) for lang, records in sorted(by_language.items())},
+        }
+
+    def recent(self, operation: str, lang: str) -> List[Dict]:
+        """Registros recientes de una operación (para depuración)"""
+        with self._lock:
+            return [asdict(r) for r in self._records.get((operation, lang), ())]
+
+    def export(self, path) -> Path:
+        """Escribe las estadísticas en un archivo JSON (escritura atómica)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+
+_default_telemetry: Optional[Telemetry] = None
+_default_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Telemetría compartida por el proceso (exporta a GEMINI_METRICS_FILE si está definida)"""
+    global _default_telemetry
+    with _default_lock:
+        if _default_telemetry is None:
+            _default_telemetry = Telemetry(export_path=os.getenv("GEMINI_METRICS_FILE"))
+        return _default_telemetry
@@ -0,0 +1,114 @@
+from typing import Dict, Optional
+
+import streamlit as st
+from src.models.book import Book
+from src.services.book_service import BookService
+from src.services.facet_service import FACETS
+from src.i18n.i18n_service import t
+from config.settings import CATALOG_PAGE_SIZE
+
+
+def _move_page(offset_key: str, delta: int):
+    st.session_state[offset_key] = max(0, st.session_state.get(offset_key, 0) + delta)
+
+
+def facet_filters(book_service: BookService, lang: str = "es", key: str = "book") -> Dict[str, str]:
+    """
+    Filtros de exploración por género, autor, década y tema con conteos
+
+    Los conteos de cada faceta tienen en cuenta lo seleccionado en las demás.
+
+    Returns:
+        Facetas seleccionadas {faceta: clave}, para `book_selector(..., facets=...)`
+    """
+    widget_keys = {facet: f"{key}_facet_{facet}" for facet in FACETS}
+    selected = {facet: st.session_state.get(widget_key) or "" for facet, widget_key in widget_keys.items()}
+    with st.expander(t("facet_header", lang), expanded=any(selected.values())):
+        for facet in FACETS:
+            counts = book_service.facets.counts(facet, selected)
+            labels = {value: f"{label} ({count})" for value, label, count in counts}
+            options = [""] + list(labels)
+            # Las opciones cambian con los conteos: fijar el valor para que no se reinicie
+            st.session_state[widget_keys[facet]] = selected[facet] if selected[facet] in options else ""
+            selected[facet] = st.selectbox(
+                t(f"facet_{facet}", lang),
+                options,
+                format_func=lambda value, labels=labels: labels.get(value, t("facet_all", lang)),
+                key=widget_keys[facet]
+            )
+    return {facet: value for facet, value in selected.items() if value}
+
+
+def book_selector(
+    book_service: BookService,
+    lang: str = "es",
+    key: str = "book",
+    label: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+    **filters,
+) -> Optional[Book]:
+    """
+    Selector de libros con búsqueda y paginación
+
+    En cada rerun solo se envía al navegador una página de títulos, así que
+    funciona igual con 10 libros que con 100k.
+
+    Args:
+        book_service: Catálogo a consultar
+        lang: Idioma de la interfaz
+        key: Prefijo de las claves de estado (permite varios selectores por página)
+        label: Etiqueta del selector (por defecto, "choose_book")
+        exclude_id: Id de un libro a omitir
+        **filters: Filtros adicionales de `BookService.query_books`
+
+    Returns:
+        Libro seleccionado o None si no hay coincidencias
+    """
+    offset_key = f"{key}_offset"
+    search_key = f"{key}_last_search"
+
+    text = st.text_input(
+        t("catalog_search", lang),
+        placeholder=t("catalog_search_placeholder", lang),
+        key=f"{key}_search"
+    )
+    if st.session_state.get(search_key) != (text, filters):
+        # Nueva búsqueda: volver a la primera página
+        st.session_state[search_key] = (text, filters)
+        st.session_state[offset_key] = 0
+
+    offset = st.session_state.get(offset_key, 0)
+    page = book_service.query_books(
+        offset=offset, limit=CATALOG_PAGE_SIZE, text=text, exclude_id=exclude_id, **filters
+    )
+    if not page.items and page.total:
+        # La página guardada ya no existe (ej: el catálogo cambió)
+        offset = (page.pages - 1) * CATALOG_PAGE_SIZE
+        st.session_state[offset_key] = offset
+        page = book_service.query_books(
+            offset=offset, limit=CATALOG_PAGE_SIZE, text=text, exclude_id=exclude_id, **filters
+        )
+    if not page.items:
+        st.info(t("catalog_no_results", lang))
+        return None
+
+    titles = {book.id: book.title for book in page.items}
+    selected_id = st.selectbox(
+        label or t("choose_book", lang),
+        list(titles),
+        format_func=titles.get,
+        key=f"{key}_select"
+    )
+
+    if page.pages > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀", key=f"{key}_prev", disabled=not page.has_previous,
+                      on_click=_move_page, args=(offset_key, -CATALOG_PAGE_SIZE))
+        with col2:
+            st.caption(t("catalog_page", lang).format(page=page.page, pages=page.pages, total=page.total))
+        with col3:
+            st.button("▶", key=f"{key}_next", disabled=not page.has_next,
+                      on_click=_move_page, args=(offset_key, CATALOG_PAGE_SIZE))
+
+    return book_service.get_book_by_id(selected_id)
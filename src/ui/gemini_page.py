@@ -1,7 +1,134 @@
+import os
+import tempfile
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from src.services.gemini_service import GeminiService
+from src.services.prefetch_service import Prefetcher
+from src.services.job_queue import DONE, FAILED, book_payload, get_job_queue
+from src.services.export_service import EXPORT_FORMATS, catalog_selections, export_analyses, iter_analyses
+from src.services.comparison_service import ComparisonService
+from src.services.request_scheduler import Priority
 from src.models.book import Book
 from src.i18n.i18n_service import t
+from config.settings import GEMINI_COMPARE_MAX_BOOKS, GEMINI_PREFETCH_ENABLED, GEMINI_JOBS_WAIT_SECONDS
+
+
+@st.cache_resource
+def get_gemini_service() -> GeminiService:
+    """GeminiService compartido por todas las sesiones y reruns del proceso"""
+    return GeminiService()
+
+
+@st.cache_resource
+def get_comparison_service() -> ComparisonService:
+    """ComparisonService compartido: los resúmenes y pares ya comparados se reutilizan entre sesiones"""
+    return ComparisonService(get_gemini_service())
+
+
+def _prefetch_selection(gemini_service: GeminiService, book: Book, lang: str):
+    """Precarga resumen y temas del libro seleccionado (si está habilitado)"""
+    if not GEMINI_PREFETCH_ENABLED:
+        return
+    if "gemini_prefetcher" not in st.session_state:
+        st.session_state.gemini_prefetcher = Prefetcher()
+    st.session_state.gemini_prefetcher.on_selection(gemini_service, book, lang)
+
+
+def _session_id() -> str:
+    """Id de la sesión de Streamlit, para repartir el modelo entre sesiones"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+
+def _job_panel(
+    book: Book,
+    operation: str,
+    payload: dict,
+    start: bool,
+    spinner_msg: str,
+    download_label: str,
+    file_name: str,
+    lang: str,
+):
+    """
+    Ejecuta un análisis como trabajo en segundo plano y muestra su estado
+
+    El id del trabajo se guarda en la sesión, así que el resultado sigue
+    disponible tras un rerun o una reconexión aunque el análisis tarde.
+    """
+    state_key = f"gemini_job_{operation}_{book.id}"
+    queue = get_job_queue(get_gemini_service())
+    if start:
+        st.session_state[state_key] = queue.submit(
+            operation, payload, priority=Priority.INTERACTIVE, session_id=_session_id()
+        )
+
+    job_id = st.session_state.get(state_key)
+    if not job_id:
+        return
+    job = queue.get(job_id)
+    if job is None:
+        del st.session_state[state_key]
+        return
+    if job.payload != payload:
+        # El resultado guardado corresponde a otra entrada (concepto, libro a comparar...)
+        return
+
+    if not job.finished:
+        with st.spinner(spinner_msg):
+            job = queue.wait(job_id, timeout=GEMINI_JOBS_WAIT_SECONDS)
+
+    if job.status == DONE:
+        st.markdown(job.result)
+        st.download_button(
+            label=download_label,
+            data=job.result,
+            file_name=file_name,
+            mime="text/plain",
+            key=f"{state_key}_download"
+        )
+    elif job.status == FAILED:
+        st.error(f"{t('job_failed', lang)} {job.error}")
+    else:
+        st.info(t("job_running", lang))
+        st.button(t("job_refresh", lang), key=f"{state_key}_refresh")
+
+
+def _catalog_author_results(gemini_service: GeminiService, author: str, lang: str) -> bool:
+    """
+    Muestra las obras de un autor del catálogo sin esperar a Gemini
+
+    Returns:
+        False si el autor no está en el catálogo (se usa la búsqueda con Gemini)
+    """
+    from src.services.author_service import AuthorService
+    from src.services.search_result_service import SearchResultService
+    from src.ui.pages import get_book_service
+    from config.settings import AUTHOR_WORKS_LIMIT
+
+    book_service = st.session_state.get("book_service") or get_book_service(lang)
+    entry = book_service.authors.lookup(author)
+    if entry is None:
+        return False
+
+    st.markdown(f"### 🖊️ {entry.name}")
+    if entry.bio:
+        st.markdown(entry.bio)
+    results = AuthorService.catalog_works(book_service, author)
+    state_key = f"author_works_{lang}_{entry.key}"
+    if len(results) < AUTHOR_WORKS_LIMIT:
+        if st.button(t("author_fill_gemini", lang), key="btn_author_fill"):
+            with st.spinner(t("author_fill_spinner", lang)):
+                try:
+                    st.session_state[state_key] = AuthorService.search_author_works(
+                        book_service, gemini_service, author, lang
+                    )
+                except Exception as e:
+                    st.error(str(e))
+        results = st.session_state.get(state_key, results)
+    st.markdown(SearchResultService.format_results_markdown(results, lang))
+    return True
 
 
 def display_gemini_page(book: Book, lang: str = "es"):
@@ -13,8 +140,8 @@ def display_gemini_page(book: Book, lang: str = "es"):
         lang: Idioma (es/en)
     """
     
-    # Inicializar servicio
-    gemini_service = GeminiService()
+    # Servicio compartido (clientes y conexiones se reutilizan entre reruns)
+    gemini_service = get_gemini_service()
     
     # Verificar configuración
     if not gemini_service.is_configured():
@@ -75,6 +202,10 @@ def display_gemini_page(book: Book, lang: str = "es"):
             # Búsqueda por autor
             searching_msg = f"👤 **{'Mejores obras de:' if lang == 'es' else 'Best works by:'} {search_query}"
             st.info(searching_msg)
+
+            # Autores del catálogo: respuesta inmediata, Gemini solo completa
+            if _catalog_author_results(gemini_service, search_query, lang):
+                return
             
             btn_label = "👤 " + ("Ver mejores obras" if lang == "es" else "View best works")
             download_label = "⬇️ " + ("Descargar resultados" if lang == "es" else "Download results")
@@ -115,6 +246,8 @@ def display_gemini_page(book: Book, lang: str = "es"):
     
     else:
         # Modo normal: tabs para análisis de un libro específico
+        _prefetch_selection(gemini_service, book, lang)
+
         # Tabs para diferentes tipos de consultas
         tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
             [t("gemini_tab_summary", lang), 
@@ -128,30 +261,30 @@ def display_gemini_page(book: Book, lang: str = "es"):
         # TAB 1: RESUMEN
         with tab1:
             st.write(t("summary_desc", lang))
-            if st.button(t("btn_summary", lang), key="btn_summary"):
-                with st.spinner("✨ Gemini está analizando el libro..."):
-                    summary = gemini_service.get_book_summary(book, lang)
-                    st.markdown(summary)
-                    st.download_button(
-                        label=t("download_summary", lang),
-                        data=summary,
-                        file_name=f"{book.title}_resumen.txt",
-                        mime="text/plain"
-                    )
+            _job_panel(
+                book,
+                "get_book_summary",
+                book_payload(book, lang),
+                st.button(t("btn_summary", lang), key="btn_summary"),
+                "✨ Gemini está analizando el libro...",
+                t("download_summary", lang),
+                f"{book.title}_resumen.txt",
+                lang,
+            )
         
         # TAB 2: TEMAS Y PERSONAJES
         with tab2:
             st.write(t("themes_desc", lang))
-            if st.button(t("btn_analysis", lang), key="btn_analysis"):
-                with st.spinner("✨ Gemini está analizando..."):
-                    analysis = gemini_service.analyze_themes_and_characters(book, lang)
-                    st.markdown(analysis)
-                    st.download_button(
-                        label=t("download_analysis", lang),
-                        data=analysis,
-                        file_name=f"{book.title}_analisis.txt",
-                        mime="text/plain"
-                    )
+            _job_panel(
+                book,
+                "analyze_themes_and_characters",
+                book_payload(book, lang),
+                st.button(t("btn_analysis", lang), key="btn_analysis"),
+                "✨ Gemini está analizando...",
+                t("download_analysis", lang),
+                f"{book.title}_analisis.txt",
+                lang,
+            )
         
         # TAB 3: EXPLICAR CONCEPTO
         with tab3:
@@ -161,19 +294,20 @@ def display_gemini_page(book: Book, lang: str = "es"):
                 placeholder=t("concept_placeholder", lang),
                 key="concept_input"
             )
-            if st.button(t("btn_explain", lang), key="btn_explain"):
-                if not concept.strip():
-                    st.error(t("concept_error", lang))
-                else:
-                    with st.spinner("✨ Gemini está explicando..."):
-                        explanation = gemini_service.explain_concept(book, concept, lang)
-                        st.markdown(explanation)
-                        st.download_button(
-                            label=t("download_explanation", lang),
-                            data=explanation,
-                            file_name=f"{book.title}_{concept.replace(' ', '_')}.txt",
-                            mime="text/plain"
-                        )
+            start = st.button(t("btn_explain", lang), key="btn_explain")
+            if start and not concept.strip():
+                st.error(t("concept_error", lang))
+                start = False
+            _job_panel(
+                book,
+                "explain_concept",
+                book_payload(book, lang, concept=concept),
+                start,
+                "✨ Gemini está explicando...",
+                t("download_explanation", lang),
+                f"{book.title}_{concept.replace(' ', '_')}.txt",
+                lang,
+            )
         
         # TAB 4: RECOMENDACIONES
         with tab4:
@@ -184,58 +318,163 @@ def display_gemini_page(book: Book, lang: str = "es"):
                 height=100,
                 key="interests_input"
             )
-            if st.button(t("btn_recommendations", lang), key="btn_recommendations"):
-                with st.spinner("✨ Gemini está buscando recomendaciones..."):
-                    recommendations = gemini_service.get_book_recommendations(book, interests, lang)
-                    st.markdown(recommendations)
-                    st.download_button(
-                        label=t("download_recommendations", lang),
-                        data=recommendations,
-                        file_name=f"recomendaciones_para_{book.title}.txt",
-                        mime="text/plain"
-                    )
+            _job_panel(
+                book,
+                "get_book_recommendations",
+                book_payload(book, lang, interests=interests),
+                st.button(t("btn_recommendations", lang), key="btn_recommendations"),
+                "✨ Gemini está buscando recomendaciones...",
+                t("download_recommendations", lang),
+                f"recomendaciones_para_{book.title}.txt",
+                lang,
+            )
         
         # TAB 5: PREGUNTAS DE DISCUSIÓN
         with tab5:
             st.write(t("questions_desc", lang))
-            if st.button(t("btn_questions", lang), key="btn_questions"):
-                with st.spinner("✨ Gemini está generando preguntas..."):
-                    questions = gemini_service.generate_discussion_questions(book, lang)
-                    st.markdown(questions)
-                    st.download_button(
-                        label=t("download_questions", lang),
-                        data=questions,
-                        file_name=f"{book.title}_preguntas_discusion.txt",
-                        mime="text/plain"
-                    )
+            _job_panel(
+                book,
+                "generate_discussion_questions",
+                book_payload(book, lang),
+                st.button(t("btn_questions", lang), key="btn_questions"),
+                "✨ Gemini está generando preguntas...",
+                t("download_questions", lang),
+                f"{book.title}_preguntas_discusion.txt",
+                lang,
+            )
         
         # TAB 6: COMPARAR CON OTRO LIBRO
         with tab6:
             st.write(t("compare_desc", lang))
-            from src.services.book_service import BookService
-            
-            service = BookService(lang=lang)
-            all_books = service.get_all_books()
-            book_titles = [b.title for b in all_books if b.id != book.id]
-            
-            selected_title = st.selectbox(
-                t("compare_book", lang),
-                book_titles,
-                key="compare_book"
+            from src.ui.book_selector import book_selector
+            from src.ui.pages import get_book_service
+
+            # Reutilizar el catálogo ya cargado por la página
+            service = st.session_state.get("book_service") or get_book_service(lang)
+            other_book = book_selector(
+                service, lang, key="compare_book", label=t("compare_book", lang), exclude_id=book.id
             )
-            
-            if st.button(t("btn_compare", lang), key="btn_compare"):
-                other_book = service.get_book_by_title(selected_title)
-                if other_book:
-                    with st.spinner("✨ Gemini está comparando los libros..."):
-                        comparison = gemini_service.compare_books(book, other_book, lang)
-                        st.markdown(comparison)
-                        st.download_button(
-                            label=t("download_comparison", lang),
-                            data=comparison,
-                            file_name=f"comparacion_{book.title}_vs_{other_book.title}.txt",
-                            mime="text/plain"
-                        )
+            if other_book:
+                payload = book_payload(book, lang)
+                payload["other_book"] = other_book.to_dict()
+                _job_panel(
+                    book,
+                    "compare_books",
+                    payload,
+                    st.button(t("btn_compare", lang), key="btn_compare"),
+                    "✨ Gemini está comparando los libros...",
+                    t("download_comparison", lang),
+                    f"comparacion_{book.title}_vs_{other_book.title}.txt",
+                    lang,
+                )
+            _comparison_matrix_panel(book, service, lang)
+
+
+def _comparison_matrix_panel(book: Book, book_service, lang: str):
+    """
+    Comparación de varios libros a la vez
+
+    El solapamiento local se muestra al instante; Gemini solo se consulta
+    para los pares que todavía no tienen comparación.
+    """
+    from src.ui.book_selector import book_selector
+
+    with st.expander(t("matrix_header", lang)):
+        st.caption(t("matrix_desc", lang).format(max=GEMINI_COMPARE_MAX_BOOKS))
+        state_key = f"compare_matrix_{lang}"
+        if st.session_state.get(state_key, [None])[0] != book.id:
+            # La matriz empieza con el libro seleccionado en la página
+            st.session_state[state_key] = [book.id]
+        ids = st.session_state[state_key]
+
+        candidate = book_selector(book_service, lang, key="matrix_book", label=t("matrix_add_label", lang))
+        col1, col2 = st.columns(2)
+        with col1:
+            full = len(ids) >= GEMINI_COMPARE_MAX_BOOKS
+            if st.button(t("matrix_add", lang), key="btn_matrix_add",
+                         disabled=candidate is None or candidate.id in ids or full):
+                ids.append(candidate.id)
+        with col2:
+            if st.button(t("matrix_clear", lang), key="btn_matrix_clear", disabled=len(ids) < 2):
+                del ids[1:]
+
+        books = [b for b in (book_service.get_book_by_id(i) for i in ids) if b is not None]
+        st.write(" · ".join(f"**{b.title}**" for b in books))
+        if len(books) < 2:
+            st.info(t("matrix_need_more", lang))
+            return
+
+        import pandas as pd
+
+        comparison_service = get_comparison_service()
+        matrix = comparison_service.matrix(books, lang)
+        labels = [b.title for b in books]
+        st.dataframe(pd.DataFrame(matrix.scores(), index=labels, columns=labels), use_container_width=True)
+        st.caption(t("matrix_cached", lang).format(done=len(matrix.comparisons), total=len(matrix.pairs)))
+
+        missing = matrix.missing
+        if missing and st.button(t("matrix_compare", lang).format(count=len(missing)), key="btn_matrix_compare"):
+            progress = st.progress(0.0)
+            comparison_service.compare_all(books, lang, progress=lambda done, total: progress.progress(done / total))
+            # Los pares quedan guardados: al repetir la ejecución la matriz ya está completa
+            st.rerun()
+
+        titles = {b.id: b.title for b in books}
+        pairs = matrix.pairs
+        index = st.selectbox(
+            t("matrix_pair", lang),
+            range(len(pairs)),
+            format_func=lambda i: f"{titles[pairs[i][0]]} ↔ {titles[pairs[i][1]]}",
+            key="matrix_pair"
+        )
+        if index is None or index >= len(pairs):
+            return
+        pair = pairs[index]
+        overlap = matrix.overlap(*pair)
+        st.caption(t("matrix_overlap", lang).format(
+            score=overlap.score,
+            keywords=", ".join(overlap.shared_keywords[:10]) or "—",
+            gap=overlap.year_gap,
+        ))
+        text = matrix.comparison(*pair)
+        if text:
+            st.markdown(text)
+
+
+def display_export_panel(lang: str = "es"):
+    """Exportación masiva de los análisis ya generados (caché y cola de trabajos)"""
+    with st.expander(t("export_header", lang)):
+        st.caption(t("export_desc", lang))
+        langs = st.multiselect(t("export_langs", lang), ["es", "en"], default=[lang], key="export_langs")
+        fmt = st.selectbox(t("export_format", lang), list(EXPORT_FORMATS), key="export_format")
+        if not st.button(t("export_btn", lang), key="btn_export") or not langs:
+            return
+
+        from src.ui.pages import get_book_service
+
+        selections = catalog_selections(langs, book_service_for=get_book_service)
+        records = iter_analyses(get_gemini_service(), selections, job_queue=get_job_queue(get_gemini_service()))
+        extension, mime = EXPORT_FORMATS[fmt]
+        # El archivo se genera en disco de forma incremental y se borra tras entregarlo
+        with tempfile.NamedTemporaryFile(suffix=f".{extension}", delete=False) as archive:
+            path = archive.name
+        try:
+            with open(path, "wb") as archive:
+                count = export_analyses(records, archive, fmt)
+            if count == 0:
+                st.info(t("export_empty", lang))
+                return
+            st.caption(f"{count} {t('export_count', lang)}")
+            with open(path, "rb") as data:
+                st.download_button(
+                    label=t("export_download", lang),
+                    data=data,
+                    file_name=f"thinkink_analisis.{extension}",
+                    mime=mime,
+                    key="export_download"
+                )
+        finally:
+            os.unlink(path)
 
 
 def display_gemini_setup_instructions(lang: str = "es"):
@@ -1,9 +1,16 @@
 import streamlit as st
 from src.models.book import Book
 from src.services.author_service import AuthorService
+from src.services.book_service import BookService
 from src.i18n.i18n_service import t
 
 
+@st.cache_resource
+def get_book_service(lang: str = "es") -> BookService:
+    """BookService compartido por todas las sesiones (las lecturas usan instantáneas sin bloqueo)"""
+    return BookService(lang=lang)
+
+
 def display_book_card(book: Book, lang: str = "es"):
     """Muestra una tarjeta del libro"""
     with st.container():
@@ -21,10 +28,9 @@ def display_book_card(book: Book, lang: str = "es"):
         st.divider()
 
 
-def display_author_section(book: Book, lang: str = "es"):
-    """Muestra la sección del autor"""
-    bio = AuthorService.get_author_bio(book)
-    st.markdown(AuthorService.format_author_info(book, lang))
+def display_author_section(book: Book, lang: str = "es", book_service=None):
+    """Muestra la sección del autor (con sus otros libros del catálogo, si se pasa)"""
+    st.markdown(AuthorService.format_author_info(book, lang, book_service))
 
 
 def display_questions(questions: list, question_type: str, lang: str = "es"):
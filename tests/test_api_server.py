@@ -0,0 +1,253 @@
+"""
+Unit tests for the headless HTTP/JSON API.
+Run with: pytest tests/ -v
+"""
+
+import asyncio
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.models.answer import AnswerGrade
+from src.models.book import Book
+from src.services.api_server import ApiApp, ApiServer, Request
+from src.services.book_service import BookService
+from src.services.job_queue import JobQueue
+from src.services.request_scheduler import Priority
+
+
+def make_book(book_id, title=None, author="Ana Pérez", genre="Novela", year=2000):
+    return Book(id=book_id, title=title or f"Libro {book_id}", author=author, year=year, genre=genre,
+                description="Descripción " * 200, pre_questions=["¿Qué esperas?"],
+                post_questions=["¿Qué aprendiste?", "¿Lo recomendarías?"])
+
+
+class FakeGemini:
+    def __init__(self):
+        self.cached = {}
+        self.graded = []
+
+    def cached_for_book(self, operation, book, lang="es"):
+        return self.cached.get((operation, book.id, lang))
+
+    def grade_answers(self, book, answers, lang="es"):
+        self.graded.append(answers)
+        return [AnswerGrade(answer_id=a.id, score=4, feedback="Bien") for a in answers]
+
+
+@pytest.fixture
+def book_service(tmp_path):
+    service = BookService(books_file=tmp_path / "books.json")
+    service.add_books([make_book(1, "Zeta"), make_book(2, "Alfa", genre="Poesía"),
+                       make_book(3, "Beta", author="Luis Gómez")])
+    return service
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lambda operation, payload: "from job", poll_interval=0.05)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def app(book_service, queue):
+    return ApiApp(book_service_factory=lambda lang: book_service, gemini_service=FakeGemini(),
+                  job_queue=queue, langs=("es",))
+
+
+def call(app, target, method="GET", headers=None, body=b""):
+    response = asyncio.run(app.handle(Request(method, target, headers or {}, body)))
+    data = json.loads(response.body) if response.body else None
+    return response, data
+
+
+class TestCatalogRoutes:
+    def test_books_page(self, app):
+        response, data = call(app, "/books?limit=2&sort_by=title")
+        assert response.status == 200
+        assert [b["title"] for b in data["items"]] == ["Alfa", "Beta"]
+        assert (data["total"], data["pages"], data["version"]) == (3, 2, 3)
+
+    def test_books_filters_and_facets(self, app):
+        _, data = call(app, "/books?facet.genre=novela&sort_by=id&descending=true")
+        assert [b["id"] for b in data["items"]] == [3, 1]
+        _, data = call(app, "/facets/genre")
+        assert data == [{"key": "novela", "label": "Novela", "count": 2},
+                        {"key": "poesía", "label": "Poesía", "count": 1}]
+
+    def test_book_and_author(self, app):
+        _, data = call(app, "/books/2")
+        assert data["title"] == "Alfa"
+        _, data = call(app, "/authors?name=Gomez")
+        assert data["name"] == "Luis Gómez"
+        assert [b["id"] for b in data["books"]] == [3]
+
+    @pytest.mark.parametrize("target, status", [
+        ("/books/99", 404), ("/nowhere", 404), ("/books?limit=abc", 400), ("/books?sort_by=rating", 400),
+        ("/books?lang=fr", 400), ("/facets/color", 404), ("/authors?name=Nadie", 404),
+    ])
+    def test_errors(self, app, target, status):
+        response, data = call(app, target)
+        assert response.status == status
+        assert data["error"]
+
+    def test_health_and_metrics(self, app):
+        call(app, "/books")
+        _, health = call(app, "/health")
+        assert health == {"status": "ok", "catalog_versions": {"es": 3}}
+        response, metrics = call(app, "/metrics")
+        assert metrics["server"]["requests"] == 2
+        assert "totals" in metrics["gemini"]
+        assert "ETag" not in response.headers
+
+    def test_head_omits_body_on_the_wire(self, app):
+        request = Request("HEAD", "/books/1")
+        response = asyncio.run(app.handle(request))
+        raw = app.serialize(request, response, keep_alive=True)
+        head, _, body = raw.partition(b"\r\n\r\n")
+        assert body == b""
+        assert f"Content-Length: {len(response.body)}".encode() in head
+
+    def test_method_not_allowed(self, app):
+        response, _ = call(app, "/books", method="DELETE")
+        assert response.status == 405
+
+
+class TestETags:
+    def test_not_modified_until_catalog_changes(self, app, book_service):
+        response, _ = call(app, "/books?limit=2")
+        etag = response.headers["ETag"]
+
+        again, _ = call(app, "/books?limit=2", headers={"if-none-match": etag})
+        assert again.status == 304
+        assert again.body == b""
+
+        book_service.add_book(make_book(4, "Aaa"))
+        changed, data = call(app, "/books?limit=2", headers={"if-none-match": etag})
+        assert changed.status == 200
+        assert changed.headers["ETag"] != etag
+        assert data["items"][0]["title"] == "Aaa"
+
+    def test_serialized_responses_are_reused(self, app):
+        first, _ = call(app, "/books/1")
+        second, _ = call(app, "/books/1")
+        assert second is first
+        assert app.metrics.cache_hits == 1
+
+    def test_untracked_responses_get_a_content_etag(self, app):
+        app.gemini_service.cached[("get_book_summary", 1, "es")] = "Resumen"
+        response, data = call(app, "/books/1/analyses/get_book_summary")
+        assert data["text"] == "Resumen"
+        again, _ = call(app, "/books/1/analyses/get_book_summary",
+                        headers={"if-none-match": response.headers["ETag"]})
+        assert again.status == 304
+
+    def test_catalog_is_loaded_and_queried_off_the_event_loop(self, book_service):
+        threads = []
+
+        def factory(lang):
+            threads.append(threading.current_thread())
+            return book_service
+
+        app = ApiApp(book_service_factory=factory, gemini_service=FakeGemini(), langs=("es",))
+        response, _ = call(app, "/books?limit=1")
+        assert response.status == 200
+        assert threads and threads[0] is not threading.main_thread()
+
+
+class TestAnalysesAndAnswers:
+    def test_missing_analysis_can_be_queued(self, app, queue):
+        response, data = call(app, "/books/1/analyses/get_book_summary")
+        assert response.status == 404
+        assert data["status"] is None
+
+        response, data = call(app, "/books/1/analyses/get_book_summary", method="POST")
+        assert response.status == 202
+        assert queue.wait(data["job_id"], timeout=5).status == "done"
+
+        _, job = call(app, f"/jobs/{data['job_id']}")
+        assert job["result"] == "from job"
+        _, analysis = call(app, "/books/1/analyses/get_book_summary")
+        assert analysis["text"] == "from job"
+
+    def test_queued_analyses_are_batch_work_of_the_client(self, book_service, tmp_path):
+        queue = JobQueue(tmp_path / "idle.sqlite3", lambda operation, payload: "ok", workers=0)
+        app = ApiApp(book_service_factory=lambda lang: book_service, gemini_service=FakeGemini(),
+                     job_queue=queue, langs=("es",))
+        request = Request("POST", "/books/1/analyses/get_book_summary", client="10.0.0.7")
+        response = asyncio.run(app.handle(request))
+
+        job = queue.get(json.loads(response.body)["job_id"])
+        assert (job.priority, job.session_id) == (Priority.BATCH, "api:10.0.0.7")
+        queue.close()
+
+    def test_unknown_operation(self, app):
+        response, _ = call(app, "/books/1/analyses/get_book_recommendations", method="POST")
+        assert response.status == 404
+
+    def test_grade_answers(self, app):
+        body = json.dumps({"reader_id": "r1", "question_type": "post",
+                           "answers": {"1": "Mucho", "2": " ", "9": "Fuera de rango"}}).encode()
+        response, data = call(app, "/books/1/answers", method="POST", body=body)
+        assert response.status == 200
+        assert [g["answer_id"] for g in data["grades"]] == ["1:r1:post:1"]
+        assert response.headers["Cache-Control"] == "no-store"
+
+    @pytest.mark.parametrize("body", [b"{", b"[]", b'{"answers": {"x": "a"}}', b'{"answers": {}}',
+                                      b'{"answers": {"1": "a"}, "question_type": "mid"}'])
+    def test_invalid_answers(self, app, body):
+        response, _ = call(app, "/books/1/answers", method="POST", body=body)
+        assert response.status == 400
+
+
+class TestServer:
+    @pytest.fixture
+    def server(self, app):
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(ApiServer(app, "127.0.0.1", 0, keepalive=5).start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        yield server
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    def test_keep_alive_gzip_and_etag(self, server, app):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/books?limit=3", headers={"Accept-Encoding": "gzip"})
+        response = connection.getresponse()
+        body = response.read()
+        assert response.status == 200
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert len(json.loads(gzip.decompress(body))["items"]) == 3
+        etag = response.getheader("ETag")
+
+        # Misma conexión
+        connection.request("GET", "/books?limit=3", headers={"If-None-Match": etag})
+        response = connection.getresponse()
+        assert response.status == 304
+        assert response.read() == b""
+
+        connection.request("GET", "/books/1")
+        response = connection.getresponse()
+        assert response.getheader("Content-Encoding") is None
+        assert json.loads(response.read())["id"] == 1
+        connection.close()
+
+        metrics = app.metrics.to_dict()
+        assert metrics["connections"] == 1
+        assert metrics["requests"] == 3
+        assert metrics["not_modified"] == 1
+
+    def test_bad_request_closes_connection(self, server):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("POST", "/books/1/answers", body=b"x" * 10, headers={"Content-Length": "abc"})
+        response = connection.getresponse()
+        assert response.status == 400
+        assert response.getheader("Connection") == "close"
+        connection.close()
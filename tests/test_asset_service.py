@@ -0,0 +1,51 @@
+"""
+Unit tests for the landing image asset pipeline.
+Run with: pytest tests/ -v
+"""
+
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from src.services.asset_service import build_variants, get_variants, pick_variant, picture_html
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "cover.png"
+    Image.new("RGBA", (800, 400), (200, 120, 40, 255)).save(path)
+    return path
+
+
+class TestBuildVariants:
+    def test_widths_are_capped_at_original(self, source):
+        variants = build_variants(source, widths=(320, 640, 1024), formats=("webp", "png"))
+
+        assert sorted({v.width for v in variants}) == [320, 640, 800]
+        assert {v.fmt for v in variants} == {"webp", "png"}
+        small = pick_variant(variants, 300, "webp")
+        assert (small.width, small.height) == (320, 160)
+        assert Image.open(io.BytesIO(small.data)).size == (320, 160)
+
+    def test_pick_variant_falls_back_to_largest(self, source):
+        variants = build_variants(source, widths=(320,), formats=("png",))
+        assert pick_variant(variants, 2000, "webp").width == 320
+
+
+class TestGetVariants:
+    def test_writes_static_files_and_reuses_them(self, source, tmp_path):
+        static_dir = tmp_path / "static"
+        variants = get_variants(source, (320,), ("webp",), static_dir)
+        assert get_variants(source, (320,), ("webp",), static_dir) is variants
+        assert (static_dir / variants[0].file_name).read_bytes() == variants[0].data
+
+    def test_picture_html_has_srcset_per_format(self, source, tmp_path):
+        variants = get_variants(source, (320, 640), ("webp", "png"), tmp_path / "static")
+        markup = picture_html(variants, alt="Cover")
+
+        assert markup.count("<source") == 1
+        assert 'type="image/webp"' in markup
+        assert "320w" in markup and "640w" in markup
+        assert 'alt="Cover"' in markup
@@ -0,0 +1,160 @@
+"""
+Unit tests for the catalog author index and local-first author search.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+from src.models.book import Book
+from src.models.search_result import BookResult
+from src.services.author_index import AuthorIndex, author_aliases, merge_bios, normalize_author
+from src.services.author_service import AuthorService
+
+
+def make_book(book_id, author, title=None, bio="", year=2000):
+    return Book(id=book_id, title=title or f"Book {book_id}", author=author, description="D",
+                year=year, genre="Novela", author_bio=bio)
+
+
+class TestNormalization:
+    @pytest.mark.parametrize("name", ["Gabriel García Márquez", "gabriel garcia marquez", "García Márquez, Gabriel"])
+    def test_equivalent_spellings_share_a_key(self, name):
+        assert normalize_author(name) == "gabriel garcia marquez"
+
+    def test_initials_are_split(self):
+        assert normalize_author("J.R.R. Tolkien") == "j r r tolkien"
+
+    def test_aliases(self):
+        assert author_aliases("gabriel garcia marquez") == {"marquez", "garcia marquez"}
+        assert author_aliases("j r r tolkien") == {"tolkien"}
+        assert author_aliases("homero") == set()
+
+    def test_merge_bios_drops_duplicates_and_contained_text(self):
+        bio = merge_bios(["Escritor colombiano.", "escritor colombiano", "Escritor colombiano. Premio Nobel 1982.", ""])
+        assert bio == "Escritor colombiano. Premio Nobel 1982."
+
+
+class TestAuthorIndex:
+    @pytest.fixture
+    def index(self):
+        return AuthorIndex([
+            make_book(1, "Gabriel García Márquez", bio="Escritor colombiano."),
+            make_book(2, "Gabriel Garcia Marquez", bio="Escritor colombiano. Premio Nobel."),
+            make_book(3, "J.R.R. Tolkien"),
+            make_book(4, "Ana López"),
+            make_book(5, "Luis López"),
+        ])
+
+    def test_groups_spelling_variants(self, index):
+        entry = index.lookup("GARCÍA MÁRQUEZ, Gabriel")
+        assert entry.book_ids == [1, 2]
+        assert entry.bio == "Escritor colombiano. Premio Nobel."
+        assert len(index) == 4
+
+    def test_alias_lookup(self, index):
+        assert index.lookup("Tolkien").book_ids == [3]
+        assert index.lookup("García Márquez").book_ids == [1, 2]
+
+    def test_ambiguous_alias_is_not_resolved(self, index):
+        assert index.lookup("López") is None
+
+    def test_typos_are_matched(self, index):
+        assert index.lookup("Gabriel Garcia Marques").key == "gabriel garcia marquez"
+
+    def test_unknown_author(self, index):
+        assert index.lookup("Virginia Woolf") is None
+        assert index.lookup("") is None
+
+    def test_new_author_is_found_after_add(self, index):
+        index.lookup("Gabriel Garcia Marques")
+        index.add(make_book(6, "Virginia Woolf"))
+        assert index.lookup("Virginia Wolf").book_ids == [6]
+
+    def test_removed_author_is_forgotten(self, index):
+        index.lookup("Gabriel Garcia Marques")
+        index.remove(3)
+        index.remove(1)
+        assert index.lookup("Tolkien") is None
+        assert index.lookup("J.R.R. Tolkein") is None
+        assert index.lookup("García Márquez").bio == "Escritor colombiano. Premio Nobel."
+        assert len(index) == 3
+
+    def test_changes_do_not_touch_collections_already_handed_out(self, index):
+        entry = index.lookup("García Márquez")
+        book_ids, spellings, bios = entry.book_ids, entry.spellings, entry.bios
+        before = (list(book_ids), dict(spellings), list(bios))
+
+        index.add(make_book(6, "Gabriel García Márquez", bio="Autor de Cien años de soledad."))
+        index.remove(2)
+
+        assert (book_ids, dict(spellings), bios) == before
+        assert entry.book_ids == [1, 6]
+        assert entry.name == "Gabriel García Márquez"
+
+
+class FakeBookService:
+    def __init__(self, books):
+        self.books = books
+        self.authors = AuthorIndex(books)
+        self._by_id = {b.id: b for b in books}
+
+    def get_books_by_author(self, author):
+        entry = self.authors.lookup(author)
+        return [self._by_id[i] for i in entry.book_ids] if entry else []
+
+    def get_book_by_title(self, title):
+        return next((b for b in self.books if b.title.lower() == title.lower()), None)
+
+
+class FakeGemini:
+    def __init__(self, results=None, error=None):
+        self.results = results or []
+        self.error = error
+        self.calls = []
+
+    def search_author_works_structured(self, author, lang="es", limit=3):
+        self.calls.append((author, limit))
+        if self.error:
+            raise self.error
+        return [BookResult(**r.to_dict()) for r in self.results]
+
+
+class TestAuthorWorksSearch:
+    def test_known_author_with_enough_books_skips_the_model(self):
+        books = [make_book(i, "George Orwell", year=1930 + i) for i in range(1, 4)]
+        gemini = FakeGemini()
+
+        results = AuthorService.search_author_works(FakeBookService(books), gemini, "orwell")
+
+        assert [r.catalog_id for r in results] == [1, 2, 3]
+        assert gemini.calls == []
+
+    def test_model_only_fills_the_gaps(self):
+        books = [make_book(1, "George Orwell", title="1984")]
+        gemini = FakeGemini([
+            BookResult(title="1984", author="George Orwell"),
+            BookResult(title="Animal Farm", author="George Orwell"),
+            BookResult(title="Homage to Catalonia", author="George Orwell"),
+        ])
+
+        results = AuthorService.search_author_works(FakeBookService(books), gemini, "George Orwel")
+
+        assert [r.title for r in results] == ["1984", "Animal Farm", "Homage to Catalonia"]
+        assert results[0].catalog_id == 1
+        assert gemini.calls == [("George Orwell", 3)]
+
+    def test_model_failure_keeps_catalog_results(self):
+        from src.services.gemini_service import GeminiError
+
+        books = [make_book(1, "George Orwell")]
+        gemini = FakeGemini(error=GeminiError("down"))
+
+        results = AuthorService.search_author_works(FakeBookService(books), gemini, "Orwell")
+
+        assert [r.catalog_id for r in results] == [1]
+
+    def test_model_failure_without_catalog_results_raises(self):
+        from src.services.gemini_service import GeminiError
+
+        with pytest.raises(GeminiError):
+            AuthorService.search_author_works(FakeBookService([]), FakeGemini(error=GeminiError("down")), "Woolf")
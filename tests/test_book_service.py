@@ -213,6 +213,45 @@ class TestBookService:
             assert book.year > 0
             assert book.year <= 2025
 
+    def test_query_books_pagination(self, service):
+        """Test paging through the catalog sorted by title"""
+        first = service.query_books(offset=0, limit=4)
+        second = service.query_books(offset=4, limit=4)
+
+        assert first.total == len(service.get_all_books())
+        assert len(first.items) == 4 and first.page == 1 and first.has_next
+        assert not set(b.id for b in first.items) & set(b.id for b in second.items)
+        titles = [b.title.lower() for b in first.items + second.items]
+        assert titles == sorted(titles)
+
+    def test_query_books_filters(self, service):
+        """Test text, genre and year filters with descending sort"""
+        book = service.get_book_by_id(1)
+        page = service.query_books(text=book.title[:5].upper(), limit=100)
+        assert book in page.items
+
+        page = service.query_books(genre=book.genre, year_min=book.year, year_max=book.year,
+                                   sort_by="id", descending=True, limit=100)
+        assert book in page.items
+        assert all(b.year == book.year for b in page.items)
+        assert [b.id for b in page.items] == sorted((b.id for b in page.items), reverse=True)
+
+        assert service.query_books(exclude_id=1, limit=100).total == service.query_books(limit=100).total - 1
+
+    def test_query_books_sees_added_books(self, tmp_path):
+        """Test that the sorted views are refreshed after add_book"""
+        service = BookService(books_file=tmp_path / "books.json")
+        service.add_book(Book(id=1, title="Zeta", author="A", description="D", year=2000, genre="G"))
+        assert service.query_books().items[0].title == "Zeta"
+        service.add_book(Book(id=2, title="Álamo", author="A", description="D", year=1990, genre="G"))
+        assert [b.title for b in service.query_books().items] == ["Álamo", "Zeta"]
+        assert service.get_book_by_title("álamo").id == 2
+
+    def test_query_books_invalid_sort(self, service):
+        """Test that unknown sort fields are rejected"""
+        with pytest.raises(ValueError):
+            service.query_books(sort_by="rating")
+
 
 class TestQuestionService:
     """Tests for QuestionService"""
@@ -290,6 +329,27 @@ class TestQuestionService:
         assert result["total_questions"] == 3
         assert result["answered"] == 0
 
+    def test_build_reader_answers(self):
+        """Test converting displayed answers into gradable answers"""
+        book = Book(
+            id=7,
+            title="Test Book",
+            author="Test Author",
+            year=2025,
+            genre="Fiction",
+            description="Test",
+            pre_questions=["Why?", "What?"],
+            post_questions=["Q1"],
+            author_bio="Bio"
+        )
+
+        answers = QuestionService.build_reader_answers(book, {1: "Because", 2: "  "}, "pre", "reader-1")
+
+        assert len(answers) == 1
+        assert answers[0].id == "7:reader-1:pre:1"
+        assert answers[0].question == "Why?"
+        assert answers[0].answer == "Because"
+
 
 class TestAuthorService:
     """Tests for AuthorService"""
@@ -329,10 +389,25 @@ class TestAuthorService:
         )
         
         formatted = AuthorService.format_author_info(book)
-        
+
         assert isinstance(formatted, str)
         assert "Jane Doe" in formatted
 
+    def test_author_index_follows_added_books(self, tmp_path):
+        """Books added after the index is built are found by author"""
+        service = BookService(books_file=tmp_path / "books.json")
+        service.add_book(Book(id=1, title="A", author="Jane Doe", year=2000, genre="G", description="D",
+                              author_bio="Jane Doe writes."))
+        assert [b.id for b in service.get_books_by_author("jane doe")] == [1]
+
+        service.add_book(Book(id=2, title="B", author="Doe, Jane", year=2001, genre="G", description="D",
+                              author_bio="Jane Doe writes. She lives in Madrid."))
+
+        assert [b.id for b in service.get_books_by_author("Jane Doe")] == [1, 2]
+        book = service.get_book_by_id(1)
+        assert AuthorService.get_author_bio(book, service) == "Jane Doe writes. She lives in Madrid."
+        assert "B" in AuthorService.format_author_info(book, "en", service)
+
 
 class TestIntegration:
     """Integration tests"""
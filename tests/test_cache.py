@@ -0,0 +1,134 @@
+"""
+Unit tests for the shared Gemini result cache backends.
+Run with: pytest tests/ -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.cache import MemoryCache, RedisCache, SQLiteCache, create_cache
+from src.cache.mini_redis import MiniRedisServer
+
+
+@pytest.fixture(scope="module")
+def redis_server():
+    server = MiniRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def cache(request, tmp_path, redis_server):
+    if request.param == "memory":
+        backend = MemoryCache()
+    elif request.param == "sqlite":
+        backend = SQLiteCache(tmp_path / "cache.sqlite3")
+    else:
+        backend = RedisCache(port=redis_server.port, prefix=f"test{id(request)}:")
+    yield backend
+    backend.close()
+
+
+class TestCacheBackends:
+    def test_set_and_get(self, cache):
+        cache.set("k", "valor ñ")
+        assert cache.get("k") == "valor ñ"
+        assert cache.get("missing") is None
+
+    def test_large_values_are_compressed(self, cache):
+        text = "resumen " * 1000
+        cache.set("big", text)
+
+        assert cache.get("big") == text
+        assert len(cache._get_raw("big")) < len(text) / 4
+
+    def test_ttl_expiry(self, cache):
+        cache.set("short", "x", ttl=0.05)
+        assert cache.get("short") == "x"
+        time.sleep(0.1)
+        assert cache.get("short") is None
+
+    def test_delete(self, cache):
+        cache.set("k", "v")
+        cache.delete("k")
+        assert cache.get("k") is None
+
+    def test_get_or_compute_caches_result(self, cache):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "generated"
+
+        assert cache.get_or_compute("key", compute) == "generated"
+        assert cache.get_or_compute("key", compute) == "generated"
+        assert len(calls) == 1
+
+    def test_failed_compute_is_not_cached(self, cache):
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("key", fail)
+        assert cache.get_or_compute("key", lambda: "ok") == "ok"
+
+    def test_stampede_protection(self, cache):
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        def worker():
+            results.append(cache.get_or_compute("hot", compute, poll_interval=0.01))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["value"] * 8
+        assert len(calls) == 1
+
+
+class TestSQLiteSharing:
+    def test_entries_visible_across_instances(self, tmp_path):
+        path = tmp_path / "shared.sqlite3"
+        writer, reader = SQLiteCache(path), SQLiteCache(path)
+
+        writer.set("summary", "texto")
+
+        assert reader.get("summary") == "texto"
+
+    def test_purge_expired(self, tmp_path):
+        cache = SQLiteCache(tmp_path / "c.sqlite3")
+        cache.set("old", "x", ttl=0.01)
+        cache.set("new", "y")
+        time.sleep(0.05)
+
+        assert cache.purge_expired() == 1
+        assert cache.get("new") == "y"
+
+
+class TestCreateCache:
+    def test_empty_url_disables_cache(self):
+        assert create_cache("") is None
+
+    def test_urls(self, tmp_path):
+        assert isinstance(create_cache("memory://"), MemoryCache)
+        assert isinstance(create_cache(f"sqlite:///{tmp_path}/c.sqlite3"), SQLiteCache)
+        redis = create_cache("redis://:secret@example.com:6380/2")
+        assert (redis.host, redis.port, redis.db, redis.password) == ("example.com", 6380, 2, "secret")
+
+    def test_unknown_scheme(self):
+        with pytest.raises(ValueError):
+            create_cache("ftp://nope")
+
+    def test_unreachable_backend_falls_back_to_compute(self):
+        cache = RedisCache(port=1)
+        assert cache.get_or_compute("k", lambda: "computed") == "computed"
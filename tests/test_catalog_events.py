@@ -0,0 +1,138 @@
+"""
+Unit tests for catalog change events and incremental index maintenance.
+Run with: pytest tests/ -v
+"""
+
+import dataclasses
+import json
+
+import pytest
+
+from src.models.book import Book
+from src.services.book_service import BookService
+from src.services.catalog_events import ADDED, DELETED, UPDATED, CatalogEvent, ChangeLog
+
+
+def make_book(book_id, title=None, author="Ana Pérez", genre="Novela", year=2000):
+    return Book(id=book_id, title=title or f"Libro {book_id}", author=author, description="D",
+                year=year, genre=genre)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = BookService(books_file=tmp_path / "books.json")
+    service.add_books([make_book(1, "Zeta", year=1990), make_book(2, "Beta", year=2010),
+                       make_book(3, "Alfa", author="Luis Gómez", genre="Poesía", year=2000)])
+    return service
+
+
+def titles(service, sort_by="title"):
+    return [b.title for b in service.query_books(sort_by=sort_by).items]
+
+
+class TestChangeLog:
+    def test_since_returns_pending_events(self):
+        log = ChangeLog(10)
+        for version in range(1, 5):
+            log.append(CatalogEvent(ADDED, make_book(version), version))
+        assert [e.version for e in log.since(2, 4)] == [3, 4]
+        assert log.since(4, 4) == []
+
+    def test_dropped_events_require_rebuild(self):
+        log = ChangeLog(2)
+        for version in range(1, 5):
+            log.append(CatalogEvent(ADDED, make_book(version), version))
+        assert log.since(1, 4) is None
+        assert [e.version for e in log.since(2, 4)] == [3, 4]
+
+
+class TestBookServiceEvents:
+    def test_versions_and_changes_since(self, service):
+        assert service.version == 3
+        assert service.update_book(dataclasses.replace(service.get_book_by_id(2), title="Gamma"))
+        assert service.delete_book(1)
+
+        events = service.changes_since(3)
+        assert [(e.kind, e.book_id, e.version) for e in events] == [(UPDATED, 2, 4), (DELETED, 1, 5)]
+        assert events[0].previous.title == "Beta"
+        assert service.changes_since(5) == []
+
+    def test_unknown_ids_are_not_changed(self, service):
+        assert not service.update_book(make_book(99))
+        assert not service.delete_book(99)
+        assert service.version == 3
+
+    def test_listeners_receive_events_until_unsubscribed(self, service):
+        received = []
+        unsubscribe = service.subscribe(received.append)
+        service.add_book(make_book(4))
+        unsubscribe()
+        service.delete_book(4)
+        assert [(e.kind, e.book_id) for e in received] == [(ADDED, 4)]
+
+    def test_failing_listener_does_not_block_others(self, service):
+        received = []
+
+        def broken(event):
+            raise RuntimeError("boom")
+
+        service.subscribe(broken)
+        service.subscribe(received.append)
+        with pytest.raises(RuntimeError):
+            service.delete_book(3)
+        assert [e.book_id for e in received] == [3]
+        assert service.get_book_by_id(3) is None
+
+    def test_changes_are_saved(self, service):
+        service.update_book(dataclasses.replace(service.get_book_by_id(1), title="Omega"))
+        service.delete_book(2)
+        data = json.loads(service.books_file.read_text(encoding="utf-8"))
+        assert [(b["id"], b["title"]) for b in data] == [(1, "Omega"), (3, "Alfa")]
+
+
+class TestIncrementalIndexes:
+    def test_sorted_views_follow_updates_and_deletes(self, service):
+        assert titles(service) == ["Alfa", "Beta", "Zeta"]
+        assert titles(service, "year") == ["Zeta", "Alfa", "Beta"]
+
+        service.update_book(dataclasses.replace(service.get_book_by_id(1), title="Ámbar", year=2020))
+        assert titles(service) == ["Alfa", "Ámbar", "Beta"]
+        assert titles(service, "year") == ["Alfa", "Beta", "Ámbar"]
+
+        service.delete_book(3)
+        assert titles(service) == ["Ámbar", "Beta"]
+        assert service.query_books(text="alfa").total == 0
+
+    def test_in_place_update(self, service):
+        titles(service)
+        book = service.get_book_by_id(3)
+        book.title = "Omega"
+        service.update_book(book)
+        assert titles(service) == ["Beta", "Omega", "Zeta"]
+        assert service.get_book_by_title("omega") is book
+        assert service.get_book_by_title("alfa") is None
+
+    def test_duplicate_titles(self, service):
+        service.add_book(make_book(4, "Zeta"))
+        service.delete_book(1)
+        assert service.get_book_by_title("zeta").id == 4
+
+    def test_facets_follow_updates_and_deletes(self, service):
+        assert service.facets.counts("genre") == [("novela", "Novela", 2), ("poesía", "Poesía", 1)]
+
+        service.update_book(dataclasses.replace(service.get_book_by_id(1), genre="Poesía"))
+        assert [b.id for b in service.get_books_by_genre("poesía")] == [1, 3]
+
+        service.delete_book(2)
+        assert service.facets.counts("genre") == [("poesía", "Poesía", 2)]
+        assert len(service.facets) == 2
+
+    def test_authors_follow_updates_and_deletes(self, service):
+        assert [b.id for b in service.get_books_by_author("Gómez")] == [3]
+
+        service.update_book(dataclasses.replace(service.get_book_by_id(3), author="Ana Pérez"))
+        assert service.get_books_by_author("Luis Gómez") == []
+        assert [b.id for b in service.get_books_by_author("Ana Pérez")] == [1, 2, 3]
+
+        service.delete_book(1)
+        assert [b.id for b in service.get_books_by_author("Pérez")] == [2, 3]
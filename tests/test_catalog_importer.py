@@ -0,0 +1,127 @@
+"""
+Unit tests for the bulk catalog importer.
+Run with: pytest tests/ -v
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.models.book import Book
+from src.services.book_service import BookService
+from src.services.catalog_importer import CatalogImporter, title_author_key, validate_record
+
+
+def record(book_id, **overrides):
+    data = {
+        "id": book_id,
+        "title": f"Book {book_id}",
+        "author": "Author",
+        "description": "Description",
+        "year": 1990,
+        "genre": "Novel",
+        "pre_questions": ["Q1?"],
+        "post_questions": [],
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = BookService(books_file=tmp_path / "books.json")
+    service.add_book(Book(id=1, title="Cien años de soledad", author="García Márquez",
+                          description="D", year=1967, genre="Novela"))
+    return service
+
+
+def write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write((row if isinstance(row, str) else json.dumps(row)) + "\n")
+    return path
+
+
+class TestValidateRecord:
+    def test_valid_record(self):
+        book, errors = validate_record(record(5, pre_questions="A?|B?"))
+        assert errors == []
+        assert book.pre_questions == ["A?", "B?"]
+        assert book.theme == "No especificado"
+
+    def test_reports_every_problem(self):
+        book, errors = validate_record(record("x", title=" ", year=5000, post_questions=["ok", ""]))
+        assert book is None
+        assert [e.split(":")[0] for e in errors] == ["id", "title", "year", "post_questions"]
+
+    def test_rejects_loose_types(self):
+        book, errors = validate_record(record(True, year=1999.9, pre_questions=["ok", 3]))
+        assert book is None
+        assert errors == [
+            "id: falta o no es un entero",
+            "year: falta o no es un entero",
+            "pre_questions: las preguntas deben ser texto",
+        ]
+
+        book, errors = validate_record(record(7.0, year="1999", author_bio=42))
+        assert errors == []
+        assert (book.id, book.year, book.author_bio) == (7, 1999, "")
+
+    def test_title_author_key_ignores_case_and_accents(self):
+        assert title_author_key("Cien Años de Soledad", "Garcia Marquez") == \
+            title_author_key("cien años de soledad", "García Márquez")
+
+
+class TestCatalogImporter:
+    def test_jsonl_import_with_duplicates_and_errors(self, service, tmp_path):
+        source = write_jsonl(tmp_path / "books.jsonl", [
+            record(2),
+            record(2, title="Other"),
+            record(3, title="CIEN AÑOS DE SOLEDAD", author="Garcia Marquez"),
+            record(4, year="unknown"),
+            "{not json",
+            record(5),
+        ])
+        errors = tmp_path / "errors.jsonl"
+        progress = []
+
+        report = CatalogImporter(service, batch_size=2, progress=progress.append).import_file(source, error_file=errors)
+
+        assert (report.read, report.imported, report.duplicates, report.invalid) == (6, 2, 2, 2)
+        assert [json.loads(line)["line"] for line in errors.read_text().splitlines()] == [2, 3, 4, 5]
+        assert progress
+        assert [b.id for b in BookService(books_file=service.books_file).get_all_books()] == [1, 2, 5]
+
+    def test_csv_import(self, service, tmp_path):
+        source = tmp_path / "books.csv"
+        with open(source, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(record(1)))
+            writer.writeheader()
+            for i in range(10, 15):
+                writer.writerow(record(i, pre_questions="A?|B?", post_questions=""))
+
+        report = CatalogImporter(service).import_file(source)
+
+        assert report.imported == 5
+        assert service.get_book_by_id(12).pre_questions == ["A?", "B?"]
+
+    def test_large_import_saves_in_batches(self, service, tmp_path):
+        source = write_jsonl(tmp_path / "many.jsonl", (record(i) for i in range(2, 5002)))
+        saves = []
+        original = service.save_books
+        service.save_books = lambda: (saves.append(1), original())
+
+        report = CatalogImporter(service, batch_size=500, save_every=2000).import_file(source)
+
+        assert report.imported == 5000
+        assert len(saves) == 3
+        assert len(BookService(books_file=service.books_file).get_all_books()) == 5001
+
+
+class TestAddBooks:
+    def test_add_books_skips_existing_ids(self, service):
+        added = service.add_books([Book(id=1, title="X", author="A", description="D", year=1, genre="G"),
+                                   Book(id=7, title="Y", author="A", description="D", year=1, genre="G")])
+        assert added == 1
+        assert service.get_book_by_id(7).title == "Y"
@@ -0,0 +1,134 @@
+"""
+Unit tests for copy-on-write catalog snapshots.
+Run with: pytest tests/ -v
+"""
+
+import dataclasses
+import pickle
+import threading
+
+import pytest
+
+from src.models.book import Book
+from src.models.catalog_snapshot import CatalogSnapshot
+from src.services.book_service import BookService
+from src.services.catalog_events import ADDED
+
+
+def make_book(book_id, genre="Novela"):
+    return Book(id=book_id, title=f"Libro {book_id}", author=f"Autor {book_id % 7}", description="D",
+                year=1900 + book_id % 100, genre=genre)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = BookService(books_file=tmp_path / "books.json")
+    service.add_books([make_book(i) for i in range(1, 4)])
+    return service
+
+
+class TestCatalogSnapshot:
+    def test_is_a_read_only_list(self):
+        snapshot = CatalogSnapshot([make_book(1)], version=3)
+        assert isinstance(snapshot, list)
+        assert snapshot.version == 3
+        for mutate in (lambda: snapshot.append(make_book(2)), lambda: snapshot.pop(),
+                       lambda: snapshot.__setitem__(0, None), lambda: snapshot.__delitem__(0),
+                       lambda: snapshot.sort(), lambda: snapshot.__iadd__([])):
+            with pytest.raises(TypeError):
+                mutate()
+        assert len(snapshot) == 1
+
+    def test_pickle_keeps_version(self):
+        copy = pickle.loads(pickle.dumps(CatalogSnapshot([make_book(1)], version=5)))
+        assert isinstance(copy, CatalogSnapshot)
+        assert copy.version == 5
+        assert copy[0].id == 1
+        assert copy.by_id[1] is copy[0]
+
+
+class TestBookServiceSnapshots:
+    def test_writes_publish_new_snapshots(self, service):
+        before = service.get_all_books()
+        assert before.version == service.version == 3
+
+        service.add_book(make_book(4))
+        service.update_book(dataclasses.replace(service.get_book_by_id(1), title="Nuevo"))
+        service.delete_book(2)
+
+        assert [b.id for b in before] == [1, 2, 3]
+        assert before[0].title == "Libro 1"
+        after = service.get_all_books()
+        assert [b.id for b in after] == [1, 3, 4]
+        assert after[0].title == "Nuevo"
+        assert after.version == service.version == 6
+        assert service.books is after
+
+    def test_id_lookups_match_the_published_snapshot(self, service):
+        with service._writing(save=False) as events:
+            events.append(service._publish(ADDED, make_book(9)))
+            # Still being written: readers see neither the book nor its id
+            assert service.get_book_by_id(9) is None
+            assert 9 not in [b.id for b in service.get_all_books()]
+        assert service.get_book_by_id(9).id == 9
+        assert 9 in service.get_all_books().by_id
+
+        snapshot = service.get_all_books()
+        service.delete_book(9)
+        assert snapshot.by_id[9].id == 9
+        assert service.get_book_by_id(9) is None
+        with pytest.raises(TypeError):
+            service.get_all_books().by_id[1] = make_book(1)
+
+    def test_failed_lookups_do_not_publish(self, service):
+        snapshot = service.get_all_books()
+        service.add_book(make_book(1))
+        service.delete_book(99)
+        assert service.get_all_books() is snapshot
+
+    def test_sorted_views_are_not_mutated_under_readers(self, service):
+        page = service.query_books(sort_by="id")
+        view = service._sorted_books("id")
+        service.add_books([make_book(0)])
+        assert [b.id for b in view] == [1, 2, 3]
+        assert [b.id for b in service.query_books(sort_by="id").items] == [0, 1, 2, 3]
+        assert page.total == 3
+
+    def test_concurrent_readers_and_writers(self, service):
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            try:
+                while not stop.is_set():
+                    snapshot = service.get_all_books()
+                    assert len({b.id for b in snapshot}) == len(snapshot)
+                    service.query_books(sort_by="title", facets={"genre": "poesía"})
+                    service.facets.counts("author")
+                    service.get_books_by_author("Autor 3")
+            except Exception as e:
+                errors.append(e)
+
+        def write(start):
+            for i in range(start, start + 200):
+                service.add_books([make_book(i, genre="Poesía")], save=False)
+                if i % 3 == 0:
+                    service.delete_book(i, save=False)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        writers = [threading.Thread(target=write, args=(start,)) for start in (100, 1000)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        deleted = sum(1 for i in list(range(100, 300)) + list(range(1000, 1200)) if i % 3 == 0)
+        expected = 3 + 400 - deleted
+        assert len(service.get_all_books()) == expected
+        assert service.query_books(limit=1).total == expected
+        assert len(service.facets) == expected
+        assert service.version == 3 + 400 + deleted
@@ -0,0 +1,110 @@
+"""
+Unit tests for the pooled, multi-key Gemini client.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+from src.services.client_pool import (
+    ClientPool,
+    PoolExhausted,
+    PooledGeminiBackend,
+    api_keys_from_env,
+    key_id,
+)
+from src.services.model_backends import ModelResponse
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class FakeModel:
+    def __init__(self, api_key, fail_with=None):
+        self.api_key = api_key
+        self.fail_with = fail_with
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if self.fail_with:
+            raise self.fail_with
+        return ModelResponse(f"{self.api_key}:{prompt}")
+
+
+def make_pool(keys, failing=None, **kwargs):
+    failing = failing or {}
+    created = []
+
+    def factory(api_key, model_name):
+        created.append(api_key)
+        return FakeModel(api_key, failing.get(api_key))
+
+    kwargs.setdefault("requests_per_minute", 0)
+    kwargs.setdefault("wait_timeout", 0.2)
+    pool = ClientPool(keys, model_factory=factory, **kwargs)
+    return pool, created
+
+
+class TestClientPool:
+    def test_models_are_created_once_per_key(self):
+        pool, created = make_pool(["a", "b"])
+        backend = PooledGeminiBackend(pool)
+        for i in range(6):
+            backend.generate_content(str(i))
+        assert sorted(created) == ["a", "b"]
+        assert [s["requests"] for s in pool.stats()] == [3, 3]
+
+    def test_concurrent_requests_use_least_busy_key(self):
+        pool, _ = make_pool(["a", "b"])
+        with pool.lease() as first, pool.lease() as second:
+            assert first.key_id != second.key_id
+
+    def test_local_quota_spreads_and_then_waits(self):
+        pool, _ = make_pool(["a", "b"], requests_per_minute=1, wait_timeout=0.05)
+        backend = PooledGeminiBackend(pool)
+        results = {backend.generate_content("x").text.split(":")[0] for _ in range(2)}
+        assert results == {"a", "b"}
+        with pytest.raises(PoolExhausted):
+            backend.generate_content("x")
+
+    def test_quota_error_retries_on_another_key_and_cools_down(self):
+        pool, _ = make_pool(["a", "b"], failing={"a": ResourceExhausted("429")}, cooldown=60)
+        backend = PooledGeminiBackend(pool)
+
+        texts = [backend.generate_content(str(i)).text for i in range(3)]
+
+        assert all(text.startswith("b:") for text in texts)
+        stats = {s["key"]: s for s in pool.stats()}
+        assert stats[key_id("a")]["quota_errors"] == 1
+        assert not stats[key_id("a")]["healthy"]
+
+    def test_repeated_failures_cool_down_key(self):
+        pool, _ = make_pool(["a"], failing={"a": RuntimeError("boom")}, max_failures=2, cooldown=60)
+        backend = PooledGeminiBackend(pool)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                backend.generate_content("x")
+        with pytest.raises(PoolExhausted):
+            backend.generate_content("x")
+
+    def test_stats_do_not_leak_keys(self):
+        pool, _ = make_pool(["secret-key"])
+        assert "secret-key" not in repr(pool.stats())
+
+    def test_closed_pool_rejects_requests(self):
+        pool, _ = make_pool(["a"])
+        pool.close()
+        with pytest.raises(PoolExhausted):
+            PooledGeminiBackend(pool).generate_content("x")
+
+
+class TestApiKeysFromEnv:
+    def test_merges_explicit_and_env_keys(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEYS", "k2, k3,k2")
+        assert api_keys_from_env("k1") == ["k1", "k2", "k3"]
+
+    def test_falls_back_to_single_key(self, monkeypatch):
+        monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+        monkeypatch.setenv("GEMINI_API_KEY", "only")
+        assert api_keys_from_env() == ["only"]
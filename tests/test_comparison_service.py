@@ -0,0 +1,153 @@
+"""
+Unit tests for the N-way book comparison matrix.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.cache import MemoryCache
+from src.models.book import Book
+from src.models.comparison import pair_key
+from src.services.comparison_service import ComparisonService, build_digest, compute_overlap
+from src.services.gemini_service import GeminiService
+from src.services.model_backends import FakeBackend
+from src.services.request_scheduler import Priority, RequestScheduler, current_context, scheduling
+
+
+def make_book(book_id, genre="Novela", theme="Amistad", year=2000, description="Una historia de amistad y viajes"):
+    return Book(id=book_id, title=f"Book {book_id}", author=f"Author {book_id}",
+                description=description, year=year, genre=genre, theme=theme)
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend(responder=lambda prompt: "comparison text")
+
+
+@pytest.fixture
+def gemini(monkeypatch, backend):
+    for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    return GeminiService(backend=backend, cache=MemoryCache())
+
+
+class TestOverlap:
+    def test_overlap_is_symmetric(self):
+        a = build_digest(make_book(1))
+        b = build_digest(make_book(2, genre="Ensayo", year=1995))
+
+        assert compute_overlap(a, b) == compute_overlap(b, a)
+
+    def test_shared_features(self):
+        overlap = compute_overlap(build_digest(make_book(1)), build_digest(make_book(2, year=2004)))
+
+        assert overlap.same_genre and overlap.same_theme and overlap.same_decade
+        assert not overlap.same_author
+        assert "amistad" in overlap.shared_keywords
+        assert overlap.year_gap == 4
+        assert 0 < overlap.score <= 1
+
+    def test_unspecified_theme_does_not_match(self):
+        a = build_digest(make_book(1, theme="No especificado"))
+        b = build_digest(make_book(2, theme="No especificado"))
+
+        assert not compute_overlap(a, b).same_theme
+
+    def test_pair_key_is_order_independent(self):
+        assert pair_key(3, 1) == pair_key(1, 3) == (1, 3)
+
+
+class TestComparisonService:
+    def test_matrix_is_local_only(self, gemini, backend):
+        books = [make_book(i) for i in range(1, 5)]
+
+        matrix = ComparisonService(gemini).matrix(books)
+
+        assert backend.calls == 0
+        assert len(matrix.pairs) == 6
+        assert len(matrix.missing) == 6
+        scores = matrix.scores()
+        assert scores[0][0] is None
+        assert scores[0][1] == scores[1][0]
+
+    def test_compare_all_calls_model_once_per_pair(self, gemini, backend):
+        books = [make_book(i) for i in range(1, 5)]
+        service = ComparisonService(gemini)
+
+        matrix = service.compare_all(books)
+        again = service.compare_all(list(reversed(books)))
+
+        assert backend.calls == 6
+        assert not matrix.missing and not again.missing
+        assert again.comparison(4, 1) == "comparison text"
+
+    def test_only_new_pairs_reach_the_model(self, gemini, backend):
+        service = ComparisonService(gemini)
+        books = [make_book(i) for i in range(1, 4)]
+        service.compare_all(books)
+
+        service.compare_all(books + [make_book(4)])
+
+        assert backend.calls == 3 + 3
+
+    def test_pairs_compared_one_by_one_are_reused(self, gemini, backend):
+        a, b, c = make_book(1), make_book(2), make_book(3)
+        gemini.compare_books(b, a)
+
+        matrix = ComparisonService(gemini).matrix([a, b, c])
+
+        assert matrix.comparison(1, 2) == "comparison text"
+        assert matrix.missing == [(1, 3), (2, 3)]
+
+    def test_changed_book_is_compared_again(self, gemini, backend):
+        service = ComparisonService(gemini)
+        a, b = make_book(1), make_book(2)
+        service.compare_all([a, b])
+
+        b.genre = "Ensayo"
+        service.compare_all([a, b])
+
+        assert backend.calls == 2
+
+    def test_errors_are_not_remembered(self, gemini, backend):
+        backend.error_rate = 1.0
+        service = ComparisonService(gemini)
+        books = [make_book(1), make_book(2)]
+
+        assert service.compare_all(books).comparison(1, 2).startswith("❌")
+        backend.error_rate = 0.0
+        assert service.compare_all(books).comparison(1, 2) == "comparison text"
+
+    def test_progress_is_reported(self, gemini):
+        calls = []
+        ComparisonService(gemini).compare_all([make_book(i) for i in range(1, 4)], progress=lambda d, n: calls.append((d, n)))
+
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+
+    def test_pairs_inherit_the_callers_scheduling_context(self, monkeypatch, backend):
+        for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        seen = []
+
+        class RecordingScheduler(RequestScheduler):
+            def submit(self, fn, **kwargs):
+                context = current_context()
+                seen.append((context.priority, context.session_id))
+                return super().submit(fn, **kwargs)
+
+        scheduler = RecordingScheduler(max_concurrency=2)
+        gemini = GeminiService(backend=backend, cache=MemoryCache(), scheduler=scheduler)
+        try:
+            with scheduling(Priority.BATCH, session_id="matrix"):
+                ComparisonService(gemini, workers=3).compare_all([make_book(i) for i in range(1, 5)])
+        finally:
+            scheduler.shutdown()
+
+        assert seen == [(Priority.BATCH, "matrix")] * 6
+
+    @pytest.mark.parametrize("count", [1, 4])
+    def test_book_count_limits(self, gemini, count):
+        with pytest.raises(ValueError):
+            ComparisonService(gemini, max_books=3).matrix([make_book(i) for i in range(1, count + 1)])
@@ -0,0 +1,110 @@
+"""
+Unit tests for bulk export of Gemini analyses.
+Run with: pytest tests/ -v
+"""
+
+import io
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.cache import MemoryCache
+from src.models.book import Book
+from src.services.export_service import catalog_selections, export_analyses, iter_analyses
+from src.services.gemini_service import GeminiService
+from src.services.job_queue import JobQueue, book_payload
+from src.services.model_backends import FakeBackend
+
+
+def make_book(book_id=1):
+    return Book(id=book_id, title=f"Book {book_id}", author="Author", description="D", year=2000, genre="G")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    return GeminiService(backend=FakeBackend(responder=lambda prompt: "analysis text"), cache=MemoryCache())
+
+
+class Unseekable(io.RawIOBase):
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.extend(data)
+        return len(data)
+
+
+class TestCatalogSelections:
+    def test_uses_the_given_book_services(self):
+        class FakeBookService:
+            def __init__(self, books):
+                self.books = books
+
+            def get_all_books(self):
+                return self.books
+
+        services = {"es": FakeBookService([make_book(1), make_book(2)]), "en": FakeBookService([make_book(3)])}
+        selections = catalog_selections(["es", "en"], book_ids=[2, 3], book_service_for=services.__getitem__)
+        assert [(book.id, lang) for book, lang in selections] == [(2, "es"), (3, "en")]
+
+
+class TestIterAnalyses:
+    def test_only_cached_analyses_are_exported(self, service):
+        service.get_book_summary(make_book(1), "es")
+        calls = service.model.calls
+
+        records = list(iter_analyses(service, [(make_book(1), "es"), (make_book(2), "es")]))
+
+        assert [(r.book_id, r.operation) for r in records] == [(1, "get_book_summary")]
+        assert service.model.calls == calls
+
+    def test_finished_jobs_are_exported(self, service, tmp_path):
+        queue = JobQueue(tmp_path / "jobs.sqlite3", lambda operation, payload: "from job", poll_interval=0.05)
+        try:
+            job_id = queue.submit("analyze_themes_and_characters", book_payload(make_book(), "en"))
+            queue.wait(job_id, timeout=5)
+            records = list(iter_analyses(service, [(make_book(), "en")], job_queue=queue))
+        finally:
+            queue.close()
+
+        assert [(r.lang, r.text) for r in records] == [("en", "from job")]
+
+
+class TestExportAnalyses:
+    def records(self, service, count=3):
+        books = [make_book(i) for i in range(1, count + 1)]
+        for book in books:
+            service.get_book_summary(book, "es")
+        return iter_analyses(service, [(book, "es") for book in books])
+
+    def test_zip_has_one_entry_per_analysis_and_index(self, service):
+        output = Unseekable()
+        assert export_analyses(self.records(service), output, "zip") == 3
+
+        archive = zipfile.ZipFile(io.BytesIO(bytes(output.buffer)))
+        index = [json.loads(line) for line in archive.read("index.jsonl").splitlines()]
+        assert len(index) == 3
+        assert "analysis text" in archive.read(index[0]["path"]).decode("utf-8")
+
+    def test_jsonl(self, service):
+        output = io.BytesIO()
+        assert export_analyses(self.records(service, 2), output, "jsonl") == 2
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [line["book_id"] for line in lines] == [1, 2]
+
+    def test_markdown(self, service):
+        output = io.BytesIO()
+        export_analyses(self.records(service, 1), output, "md")
+        assert "## Book 1 — Author" in output.getvalue().decode("utf-8")
+
+    def test_unknown_format(self, service):
+        with pytest.raises(ValueError):
+            export_analyses([], io.BytesIO(), "pdf")
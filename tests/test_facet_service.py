@@ -0,0 +1,68 @@
+"""
+Unit tests for the catalog facet index.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+from src.models.book import Book
+from src.services.book_service import BookService
+from src.services.facet_service import FacetIndex, intersect_sorted
+
+
+def make_book(book_id, genre="Novela", author="Autor", year=1990, theme="Amor"):
+    return Book(id=book_id, title=f"Book {book_id}", author=author, description="D",
+                year=year, genre=genre, theme=theme)
+
+
+@pytest.fixture
+def index():
+    return FacetIndex([
+        make_book(3, genre="Novela", year=1967),
+        make_book(1, genre="Poesía", author="Neruda", year=1924),
+        make_book(2, genre="novela", author="Neruda", year=1961),
+        make_book(4, genre="Ensayo", year=2001, theme="Historia"),
+    ])
+
+
+class TestFacetIndex:
+    def test_counts_without_selection(self, index):
+        assert index.counts("genre") == [("novela", "Novela", 2), ("ensayo", "Ensayo", 1), ("poesía", "Poesía", 1)]
+        assert [key for key, _, _ in index.counts("decade")] == ["1920", "1960", "2000"]
+
+    def test_drill_down_counts_exclude_own_facet(self, index):
+        selected = {"author": "neruda", "genre": "novela"}
+        assert index.counts("genre", selected) == [("novela", "Novela", 1), ("poesía", "Poesía", 1)]
+        assert index.counts("decade", selected) == [("1960", "1960–1969", 1)]
+
+    def test_ids_intersection(self, index):
+        assert index.ids({"genre": "Novela", "decade": "1960"}) == [2, 3]
+        assert index.ids({"genre": "novela", "author": "NERUDA"}) == [2]
+        assert index.ids({"genre": "sci-fi"}) == []
+        assert index.ids() == [1, 2, 3, 4]
+
+    def test_incremental_add(self, index):
+        index.add(make_book(0, genre="Ensayo"))
+        index.add(make_book(0, genre="Ensayo"))
+        assert index.ids({"genre": "ensayo"}) == [0, 4]
+        assert len(index) == 5
+
+    def test_unknown_facet(self, index):
+        with pytest.raises(ValueError):
+            index.counts("rating")
+
+    def test_intersect_sorted(self):
+        assert intersect_sorted([[1, 3, 5, 7], [3, 4, 5], [0, 5, 9]]) == [5]
+        assert intersect_sorted([]) == []
+
+
+class TestBookServiceFacets:
+    def test_facets_follow_add_book(self, tmp_path):
+        service = BookService(books_file=tmp_path / "books.json")
+        service.add_book(make_book(1))
+        assert service.facets.counts("genre") == [("novela", "Novela", 1)]
+
+        service.add_book(make_book(2, genre="Poesía"))
+        service.add_books([make_book(3, genre="Poesía")])
+        assert [b.id for b in service.get_books_by_genre("poesía")] == [2, 3]
+        assert service.query_books(facets={"genre": "poesía"}).total == 2
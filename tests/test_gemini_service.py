@@ -0,0 +1,320 @@
+"""
+Unit tests for GeminiService features that don't need network access.
+A small fake model (or FakeBackend) stands in for the Gemini client.
+Run with: pytest tests/ -v
+"""
+
+import json
+import re
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.cache import MemoryCache
+from src.models.answer import ReaderAnswer
+from src.models.book import Book
+from src.services.gemini_service import GeminiError, GeminiService
+from src.services.json_output import extract_json
+from src.services.model_backends import FakeBackend
+from src.services.prompt_budget import budget_for
+from src.services.telemetry import Telemetry
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Fake model that answers with a scripted function and records prompts"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return FakeResponse(self.responder(prompt))
+
+
+def make_book():
+    return Book(
+        id=1,
+        title="Test Book",
+        author="Test Author",
+        year=2000,
+        genre="Fiction",
+        description="A test book",
+        pre_questions=["Q1", "Q2", "Q3"],
+        post_questions=["Q4", "Q5", "Q6"],
+        author_bio="Bio",
+    )
+
+
+def make_answers(count, text="An answer"):
+    return [
+        ReaderAnswer(id=f"a{i}", reader_id=f"r{i % 3}", question_type="pre",
+                     question=f"Question {i}", answer=f"{text} {i}")
+        for i in range(count)
+    ]
+
+
+ITEM_RE = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+
+
+def grade_all(prompt):
+    """Returns a valid grade for every item in the prompt"""
+    ids = [int(i) for i in ITEM_RE.findall(prompt)]
+    return "```json\n" + json.dumps([{"id": i, "score": 7, "feedback": "ok"} for i in ids]) + "\n```"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GEMINI_BACKEND", raising=False)
+    monkeypatch.delenv("GEMINI_CACHE_URL", raising=False)
+    return GeminiService(api_key="")
+
+
+class TestExtractJson:
+    def test_plain_json(self):
+        assert extract_json('[{"a": 1}]') == [{"a": 1}]
+
+    def test_fenced_json_with_text(self):
+        assert extract_json('Here:\n```json\n{"a": 1}\n```\nThanks') == {"a": 1}
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(ValueError):
+            extract_json("no json here")
+
+
+class TestBackends:
+    def test_injected_backend(self):
+        service = GeminiService(backend=FakeBackend(responder=lambda prompt: "fake summary"))
+        assert service.is_configured()
+        assert service.get_book_summary(make_book()) == "fake summary"
+
+    def test_backend_errors_are_reported(self):
+        service = GeminiService(backend=FakeBackend(error_rate=1.0))
+        assert service.get_book_summary(make_book()).startswith("❌")
+
+
+class TestResponseCache:
+    def test_second_call_is_served_from_cache(self):
+        backend = FakeBackend()
+        service = GeminiService(backend=backend, cache=MemoryCache())
+
+        first = service.get_book_summary(make_book())
+        second = service.get_book_summary(make_book())
+
+        assert first == second
+        assert backend.calls == 1
+
+    def test_cache_is_shared_between_services(self):
+        cache = MemoryCache()
+        backend = FakeBackend()
+        GeminiService(backend=backend, cache=cache).get_book_summary(make_book())
+        GeminiService(backend=backend, cache=cache).get_book_summary(make_book())
+        assert backend.calls == 1
+
+    def test_errors_are_not_cached(self):
+        backend = FakeBackend(error_rate=1.0)
+        service = GeminiService(backend=backend, cache=MemoryCache())
+
+        assert service.get_book_summary(make_book()).startswith("❌")
+        backend.error_rate = 0.0
+        assert not service.get_book_summary(make_book()).startswith("❌")
+
+    def test_invalid_structured_output_is_not_cached(self):
+        responses = iter(["not json", '{"results": [{"title": "Emma", "author": "Jane Austen"}]}'])
+        service = GeminiService(backend=FakeBackend(responder=lambda p: next(responses)), cache=MemoryCache())
+
+        with pytest.raises(GeminiError):
+            service.search_similar_books_structured("Persuasion")
+        assert service.search_similar_books_structured("Persuasion")[0].title == "Emma"
+
+    def test_near_duplicate_queries_reuse_cached_answer(self):
+        backend = FakeBackend()
+        service = GeminiService(backend=backend, cache=MemoryCache())
+
+        first = service.search_author_works("Gabriel García Márquez")
+        second = service.search_author_works("gabriel garcia marquez")
+        service.search_books_by_theme("amistad")
+        service.search_books_by_theme("La amistad")
+
+        assert first == second
+        assert backend.calls == 2
+
+    def test_concept_queries_are_scoped_by_book(self):
+        backend = FakeBackend()
+        service = GeminiService(backend=backend, cache=MemoryCache())
+        other = make_book()
+        other.id = 2
+
+        service.explain_concept(make_book(), "El poder")
+        service.explain_concept(other, "poder")
+
+        assert backend.calls == 2
+
+    def test_cache_key_depends_on_language(self, service):
+        assert service.cache_key("get_book_summary", "es", "p") != service.cache_key("get_book_summary", "en", "p")
+
+
+class TestTelemetry:
+    def test_records_tokens_latency_and_cache_hits(self):
+        telemetry = Telemetry()
+        service = GeminiService(backend=FakeBackend(), cache=MemoryCache(), telemetry=telemetry)
+
+        service.get_book_summary(make_book(), "en")
+        service.get_book_summary(make_book(), "en")
+
+        summary = telemetry.stats()["operations"]["get_book_summary"]["languages"]["en"]
+        assert summary["model_calls"] == 1
+        assert summary["cache_hits"] == 1
+        assert summary["prompt_tokens"] > 0
+        assert summary["estimated_token_calls"] == 0
+
+    def test_estimates_tokens_without_usage_metadata(self, service):
+        service.telemetry = Telemetry()
+        service.model = FakeModel(lambda prompt: "ok")
+
+        service.generate_discussion_questions(make_book())
+
+        summary = service.telemetry.stats()["operations"]["generate_discussion_questions"]
+        assert summary["estimated_token_calls"] == 1
+        assert summary["prompt_tokens"] > 0
+
+    def test_records_failure_class(self):
+        telemetry = Telemetry()
+        service = GeminiService(backend=FakeBackend(error_rate=1.0), cache=MemoryCache(), telemetry=telemetry)
+
+        service.compare_books(make_book(), make_book())
+
+        assert telemetry.stats()["operations"]["compare_books"]["errors"] == {"BackendError": 1}
+
+
+class TestPromptRendering:
+    def test_summary_prompt_uses_template(self, service):
+        service.model = FakeModel(lambda prompt: "ok")
+        assert service.get_book_summary(make_book(), "en") == "ok"
+
+        prompt = service.model.prompts[0]
+        assert prompt.startswith("RESPONSE_LANGUAGE: Respond in English.")
+        assert '"Test Book"' in prompt
+        assert "RESTRICCIONES IMPORTANTES" in prompt
+
+    def test_compare_prompt_includes_both_books(self, service):
+        service.model = FakeModel(lambda prompt: "ok")
+        other = make_book()
+        other.title = "Other Book"
+        service.compare_books(make_book(), other)
+
+        assert "Test Book" in service.model.prompts[0]
+        assert "Other Book" in service.model.prompts[0]
+
+    def test_template_hash_is_stable(self, service):
+        assert service.template_hash("get_book_summary") == service.template_hash("get_book_summary")
+
+    def test_prompts_share_system_prefix(self, service):
+        service.model = FakeModel(lambda prompt: "ok")
+        service.get_book_summary(make_book())
+        service.compare_books(make_book(), make_book())
+
+        prefix = service.system_prefix("es")
+        assert all(prompt.startswith(prefix + "\n\n") for prompt in service.model.prompts)
+        assert all(prompt.count("RESTRICCIONES IMPORTANTES") == 1 for prompt in service.model.prompts)
+
+    def test_long_description_is_trimmed_to_budget(self, service):
+        service.model = FakeModel(lambda prompt: "ok")
+        book = make_book()
+        book.description = "Una frase de la descripción. " * 2000
+
+        service.get_book_summary(book)
+
+        prompt = service.model.prompts[0]
+        assert len(prompt) // 4 + 1 <= budget_for("get_book_summary")
+        assert "Una frase de la descripción." in prompt
+
+    def test_budget_can_be_disabled(self, service):
+        service.model = FakeModel(lambda prompt: "ok")
+        service.prompt_budget = False
+        book = make_book()
+        book.description = "Una frase de la descripción. " * 2000
+
+        service.get_book_summary(book)
+
+        assert book.description in service.model.prompts[0]
+
+
+class TestStructuredResults:
+    def test_parses_typed_results(self, service):
+        payload = {"results": [{"title": "Emma", "author": "Jane Austen", "year": 1815,
+                                "genre": "Romance", "reason": "Ironía social"}]}
+        service.model = FakeModel(lambda prompt: json.dumps(payload))
+
+        results = service.search_similar_books_structured("Orgullo y prejuicio")
+
+        assert results[0].title == "Emma"
+        assert results[0].year == 1815
+        assert '"results"' in service.model.prompts[0]
+
+    def test_model_rejection_raises(self, service):
+        service.model = FakeModel(lambda prompt: '{"results": [], "error": "No es un autor de libros"}')
+        with pytest.raises(GeminiError, match="No es un autor"):
+            service.search_author_works_structured("Steven Spielberg")
+
+    def test_invalid_json_raises(self, service):
+        service.model = FakeModel(lambda prompt: "Here are three books...")
+        with pytest.raises(GeminiError):
+            service.search_books_by_theme_structured("amistad")
+
+    def test_not_configured_raises(self, service):
+        with pytest.raises(GeminiError):
+            service.get_book_recommendations_structured(make_book())
+
+
+class TestGradeAnswers:
+    def test_not_configured_returns_errors(self, service):
+        grades = service.grade_answers(make_book(), make_answers(2), "en")
+        assert len(grades) == 2
+        assert all(not g.is_graded() for g in grades)
+
+    def test_batches_many_answers_in_few_prompts(self, service):
+        service.model = FakeModel(grade_all)
+        answers = make_answers(10)
+
+        grades = service.grade_answers(make_book(), answers, max_batch=5)
+
+        assert len(service.model.prompts) == 2
+        assert [g.answer_id for g in grades] == [a.id for a in answers]
+        assert all(g.score == 7 for g in grades)
+
+    def test_token_budget_limits_batch_size(self, service):
+        service.model = FakeModel(grade_all)
+        answers = make_answers(6, text="x" * 400)
+
+        service.grade_answers(make_book(), answers, token_budget=600)
+
+        assert len(service.model.prompts) > 1
+        assert all(len(p) // 4 <= 600 for p in service.model.prompts)
+
+    def test_parse_failure_splits_batch(self, service):
+        def responder(prompt):
+            # Solo responde bien a lotes de una respuesta
+            if len(ITEM_RE.findall(prompt)) > 1:
+                return "not json"
+            return grade_all(prompt)
+
+        service.model = FakeModel(responder)
+        grades = service.grade_answers(make_book(), make_answers(4))
+
+        assert all(g.is_graded() for g in grades)
+        assert len(service.model.prompts) == 7
+
+    def test_single_answer_parse_failure_records_error(self, service):
+        service.model = FakeModel(lambda prompt: "[]")
+        grades = service.grade_answers(make_book(), make_answers(1))
+
+        assert grades[0].score is None
+        assert grades[0].error
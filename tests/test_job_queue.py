@@ -0,0 +1,261 @@
+"""
+Unit tests for the background Gemini job queue.
+Run with: pytest tests/ -v
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.models.book import Book
+from src.services.gemini_service import GeminiService
+from src.services.job_queue import (
+    DONE,
+    FAILED,
+    QUEUED,
+    JobQueue,
+    book_payload,
+    job_key,
+    make_gemini_runner,
+    make_gemini_versioner,
+)
+from src.services.model_backends import FakeBackend
+from src.services.request_scheduler import Priority, current_context, scheduling
+
+
+def make_book(book_id=1):
+    return Book(id=book_id, title=f"Book {book_id}", author="Author", description="D", year=2000, genre="G")
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def factory(runner, **kwargs):
+        kwargs.setdefault("poll_interval", 0.05)
+        queue = JobQueue(tmp_path / "jobs.sqlite3", runner, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield factory
+    for queue in queues:
+        queue.close()
+
+
+class TestJobQueue:
+    def test_runs_job_and_stores_result(self, make_queue):
+        queue = make_queue(lambda operation, payload: f"{operation}:{payload['x']}")
+        job = queue.wait(queue.submit("echo", {"x": 1}), timeout=5)
+
+        assert job.status == DONE
+        assert job.result == "echo:1"
+        assert job.attempts == 1
+
+    def test_duplicate_submissions_share_a_job(self, make_queue):
+        release = threading.Event()
+        calls = []
+
+        def runner(operation, payload):
+            calls.append(operation)
+            release.wait(5)
+            return "ok"
+
+        queue = make_queue(runner)
+        first = queue.submit("slow", {"a": 1, "b": 2})
+        second = queue.submit("slow", {"b": 2, "a": 1})
+        release.set()
+
+        assert first == second
+        assert queue.wait(first, timeout=5).status == DONE
+        assert calls == ["slow"]
+
+    def test_failed_job_is_requeued_on_resubmit(self, make_queue):
+        attempts = []
+
+        def runner(operation, payload):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        queue = make_queue(runner)
+        job_id = queue.submit("flaky", {})
+        failed = queue.wait(job_id, timeout=5)
+        assert failed.status == FAILED and failed.error == "boom"
+
+        assert queue.submit("flaky", {}) == job_id
+        assert queue.wait(job_id, timeout=5).result == "ok"
+
+    def test_jobs_survive_a_new_queue_instance(self, tmp_path, make_queue):
+        queue = make_queue(lambda operation, payload: "first", workers=0)
+        job_id = queue.submit("persisted", {})
+        assert queue.get(job_id).status == QUEUED
+
+        other = make_queue(lambda operation, payload: "second")
+        assert other.wait(job_id, timeout=5).result == "second"
+
+    def test_abandoned_running_job_is_reclaimed(self, make_queue):
+        queue = make_queue(lambda operation, payload: "done", workers=0, lease_seconds=0)
+        job_id = queue.submit("orphan", {})
+        assert queue._claim().id == job_id
+        time.sleep(0.01)
+
+        other = make_queue(lambda operation, payload: "recovered", lease_seconds=0)
+        job = other.wait(job_id, timeout=5)
+        assert job.result == "recovered"
+        assert job.attempts >= 2
+
+    def test_runner_sees_submitter_scheduling_context(self, make_queue):
+        seen = []
+
+        def runner(operation, payload):
+            context = current_context()
+            seen.append((context.priority, context.session_id))
+            return "ok"
+
+        queue = make_queue(runner)
+        with scheduling(Priority.BATCH, session_id="export-1"):
+            job_id = queue.submit("ctx", {})
+        job = queue.wait(job_id, timeout=5)
+        assert (job.priority, job.session_id) == (Priority.BATCH, "export-1")
+
+        queue.wait(queue.submit("explicit", {}, priority=Priority.PREFETCH, session_id="s2"), timeout=5)
+        assert seen == [(Priority.BATCH, "export-1"), (Priority.PREFETCH, "s2")]
+
+    def test_claims_by_priority_then_age(self, make_queue):
+        queue = make_queue(lambda operation, payload: "ok", workers=0)
+        batch = queue.submit("batch", {}, priority=Priority.BATCH)
+        prefetch = queue.submit("prefetch", {}, priority=Priority.PREFETCH)
+        first = queue.submit("first", {})
+        second = queue.submit("second", {})
+
+        assert [queue._claim().id for _ in range(4)] == [first, second, prefetch, batch]
+
+    def test_class_limits_keep_workers_for_interactive_jobs(self, make_queue):
+        queue = make_queue(lambda operation, payload: "ok", workers=0, class_limits={"batch": 1})
+        batch = [queue.submit(f"batch-{i}", {}, priority=Priority.BATCH) for i in range(2)]
+
+        claimed = queue._claim()
+        assert claimed.id == batch[0]
+        assert queue._claim() is None
+
+        interactive = queue.submit("click", {})
+        assert queue._claim().id == interactive
+        queue._release(claimed)
+        assert queue._claim().id == batch[1]
+
+    def test_resubmitting_with_higher_priority_promotes_queued_job(self, make_queue):
+        queue = make_queue(lambda operation, payload: "ok", workers=0)
+        job_id = queue.submit("shared", {}, priority=Priority.BATCH, session_id="api")
+        older = queue.submit("older", {}, priority=Priority.BATCH)
+
+        assert queue.submit("shared", {}, session_id="page") == job_id
+        assert (queue.get(job_id).priority, queue.get(job_id).session_id) == (Priority.INTERACTIVE, "page")
+        assert queue._claim().id == job_id
+        assert queue._claim().id == older
+
+    def test_migrates_table_without_scheduling_columns(self, tmp_path, make_queue):
+        conn = sqlite3.connect(str(tmp_path / "jobs.sqlite3"))
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, dedupe_key TEXT NOT NULL UNIQUE, operation TEXT NOT NULL, "
+            "payload TEXT NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+        queue = make_queue(lambda operation, payload: "ok")
+        job = queue.wait(queue.submit("old", {}), timeout=5)
+        assert (job.status, job.priority, job.session_id) == (DONE, Priority.INTERACTIVE, "default")
+
+    def test_new_version_reruns_finished_job(self, make_queue):
+        version = {"current": "v1"}
+        results = iter(["first", "second"])
+        queue = make_queue(lambda operation, payload: next(results), versioner=lambda op, payload: version["current"])
+
+        first = queue.wait(queue.submit("versioned", {}), timeout=5)
+        assert queue.submit("versioned", {}) == first.id
+        version["current"] = "v2"
+        assert queue.find("versioned", {}) is None
+
+        second = queue.wait(queue.submit("versioned", {}), timeout=5)
+        assert second.id != first.id
+        assert (first.result, second.result) == ("first", "second")
+
+    def test_expired_result_is_recomputed(self, make_queue):
+        results = iter(["old", "new"])
+        queue = make_queue(lambda operation, payload: next(results), result_ttl=0)
+
+        job_id = queue.submit("ttl", {})
+        assert queue.wait(job_id, timeout=5).result == "old"
+        time.sleep(0.01)
+        assert queue.find("ttl", {}) is None
+
+        assert queue.submit("ttl", {}) == job_id
+        assert queue.wait(job_id, timeout=5).result == "new"
+
+    def test_job_key_ignores_payload_order(self):
+        assert job_key("op", {"a": 1, "b": 2}) == job_key("op", {"b": 2, "a": 1})
+        assert job_key("op", {"a": 1}) != job_key("other", {"a": 1})
+        assert job_key("op", {"a": 1}, "v1") != job_key("op", {"a": 1}, "v2")
+
+
+class TestGeminiRunner:
+    def test_runs_service_method(self, monkeypatch, make_queue):
+        for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        backend = FakeBackend(responder=lambda prompt: "analysis")
+        queue = make_queue(make_gemini_runner(lambda: GeminiService(backend=backend)))
+
+        payload = book_payload(make_book(), "es", concept="amor")
+        job = queue.wait(queue.submit("explain_concept", payload), timeout=5)
+        assert (job.status, job.result) == (DONE, "analysis")
+
+        payload = book_payload(make_book(), "en")
+        payload["other_book"] = make_book(2).to_dict()
+        assert queue.wait(queue.submit("compare_books", payload), timeout=5).result == "analysis"
+
+    def test_error_response_fails_job(self, monkeypatch, make_queue):
+        for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        backend = FakeBackend(error_rate=1.0)
+        queue = make_queue(make_gemini_runner(lambda: GeminiService(backend=backend)))
+
+        job = queue.wait(queue.submit("get_book_summary", book_payload(make_book(), "es")), timeout=5)
+        assert job.status == FAILED
+
+    def test_versioner_tracks_template_and_model(self):
+        service = GeminiService(backend=FakeBackend())
+        versioner = make_gemini_versioner(lambda: service)
+
+        version = versioner("get_book_summary", book_payload(make_book(), "es"))
+        assert version == service.result_version("get_book_summary", "es")
+        assert GeminiService.template_hash("get_book_summary", "es") in version
+        assert versioner("get_book_summary", book_payload(make_book(), "es")) == version
+        assert versioner("_record", {}) == ""
+
+    def test_default_queue_uses_the_given_service(self, monkeypatch, tmp_path):
+        from src.services import job_queue
+
+        for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(job_queue, "GEMINI_JOBS_DB", tmp_path / "default.sqlite3")
+        monkeypatch.setattr(job_queue, "_default_queue", None)
+        service = GeminiService(backend=FakeBackend(responder=lambda prompt: "shared"))
+
+        queue = job_queue.get_job_queue(service)
+        try:
+            assert job_queue.get_job_queue() is queue
+            job = queue.wait(queue.submit("get_book_summary", book_payload(make_book(), "es")), timeout=5)
+            assert job.result == "shared"
+        finally:
+            queue.close()
+
+    def test_unknown_operation_fails(self, make_queue):
+        queue = make_queue(make_gemini_runner(lambda: GeminiService(backend=FakeBackend())))
+        job = queue.wait(queue.submit("_record", {}), timeout=5)
+        assert job.status == FAILED
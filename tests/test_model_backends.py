@@ -0,0 +1,108 @@
+"""
+Unit tests for the pluggable model backends.
+Run with: pytest tests/ -v
+"""
+
+import time
+
+import pytest
+
+from src.services.model_backends import (
+    BackendError,
+    FakeBackend,
+    RecordReplayBackend,
+    ReplayMissError,
+    create_backend,
+)
+
+
+class TestFakeBackend:
+    def test_default_response_is_deterministic(self):
+        backend = FakeBackend()
+        assert backend.generate_content("hola").text == backend.generate_content("hola").text
+        assert backend.calls == 2
+
+    def test_custom_responder_and_usage(self):
+        backend = FakeBackend(responder=lambda prompt: prompt.upper())
+        response = backend.generate_content("abcd" * 10)
+
+        assert response.text == "ABCD" * 10
+        assert response.usage_metadata.prompt_token_count == 11
+
+    def test_error_rate(self):
+        backend = FakeBackend(error_rate=1.0)
+        with pytest.raises(BackendError):
+            backend.generate_content("x")
+
+    def test_seeded_errors_are_reproducible(self):
+        def outcomes():
+            backend = FakeBackend(error_rate=0.5, seed=42)
+            result = []
+            for _ in range(20):
+                try:
+                    backend.generate_content("x")
+                    result.append(True)
+                except BackendError:
+                    result.append(False)
+            return result
+
+        assert outcomes() == outcomes()
+
+    def test_latency(self):
+        backend = FakeBackend(latency=0.02)
+        start = time.perf_counter()
+        backend.generate_content("x")
+        assert time.perf_counter() - start >= 0.02
+
+    def test_streaming_chunks(self):
+        backend = FakeBackend(responder=lambda prompt: "abcdefghij", chunk_size=3)
+        assert list(backend.stream_content("x")) == ["abc", "def", "ghi", "j"]
+
+
+class TestRecordReplayBackend:
+    def test_record_then_replay(self, tmp_path):
+        inner = FakeBackend(responder=lambda prompt: f"real:{prompt}")
+        recorder = RecordReplayBackend(tmp_path, mode="record", inner=inner)
+        assert recorder.generate_content("p1").text == "real:p1"
+
+        response = RecordReplayBackend(tmp_path, mode="replay").generate_content("p1")
+
+        assert response.text == "real:p1"
+        assert response.usage_metadata.prompt_token_count > 0
+
+    def test_replay_from_environment_finds_recordings(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("GEMINI_REPLAY_DIR", str(tmp_path))
+        inner = FakeBackend(responder=lambda prompt: "recorded", model_name="gemini-real")
+        RecordReplayBackend(tmp_path, mode="record", inner=inner).generate_content("p")
+
+        assert create_backend("replay").generate_content("p").text == "recorded"
+
+    def test_replay_miss_raises(self, tmp_path):
+        with pytest.raises(ReplayMissError):
+            RecordReplayBackend(tmp_path, mode="replay").generate_content("unknown")
+
+    def test_replay_or_record_calls_inner_once(self, tmp_path):
+        inner = FakeBackend()
+        backend = RecordReplayBackend(tmp_path, mode="replay_or_record", inner=inner)
+
+        backend.generate_content("p")
+        backend.generate_content("p")
+
+        assert inner.calls == 1
+
+    def test_recording_requires_inner_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            RecordReplayBackend(tmp_path, mode="record")
+
+
+class TestCreateBackend:
+    def test_fake_from_environment(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_BACKEND", "fake")
+        assert isinstance(create_backend(), FakeBackend)
+
+    def test_gemini_without_key_returns_none(self):
+        assert create_backend("gemini", api_key=None) is None
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            create_backend("nope")
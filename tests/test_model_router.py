@@ -0,0 +1,106 @@
+"""
+Unit tests for multi-model routing with failover.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.cache import MemoryCache
+from src.models.book import Book
+from src.services.gemini_service import GeminiService
+from src.services.model_backends import BackendError, FakeBackend
+from src.services.model_router import ModelRouter
+from src.services.telemetry import Telemetry
+
+TIERS = {"fast": ["lite", "flash"], "standard": ["flash", "lite"], "strong": ["pro", "flash"]}
+OPERATION_TIERS = {"generate_discussion_questions": "fast", "compare_books": "strong"}
+
+
+def make_router(error_rates=None, latencies=None, **kwargs):
+    error_rates = error_rates or {}
+    latencies = latencies or {}
+    backends = {}
+
+    def factory(model_name):
+        backends[model_name] = FakeBackend(
+            responder=lambda prompt, name=model_name: f"{name} answer",
+            error_rate=error_rates.get(model_name, 0.0),
+            latency=latencies.get(model_name, 0.0),
+            seed=0,
+            model_name=model_name,
+        )
+        return backends[model_name]
+
+    kwargs.setdefault("min_samples", 3)
+    router = ModelRouter(factory, TIERS, OPERATION_TIERS, "standard", **kwargs)
+    return router, backends
+
+
+def make_book(book_id=1):
+    return Book(id=book_id, title=f"Book {book_id}", author="Author", description="D", year=2000, genre="G")
+
+
+class TestModelRouter:
+    def test_operations_use_their_tier(self):
+        router, _ = make_router()
+        assert router.generate_for("generate_discussion_questions", "p").model_name == "lite"
+        assert router.generate_for("compare_books", "p").model_name == "pro"
+        assert router.generate_for("get_book_summary", "p").model_name == "flash"
+        assert router.generate_content("p").text == "flash answer"
+
+    def test_fails_over_to_next_model(self):
+        router, backends = make_router(error_rates={"pro": 1.0})
+        response = router.generate_for("compare_books", "p")
+
+        assert response.model_name == "flash"
+        assert router.stats()["pro"]["failovers"] == 1
+
+    def test_erroring_model_is_skipped_until_cooldown(self):
+        router, backends = make_router(error_rates={"pro": 1.0}, cooldown=60)
+        for _ in range(3):
+            router.generate_for("compare_books", "p")
+        calls = backends["pro"].calls
+
+        router.generate_for("compare_books", "p")
+        assert backends["pro"].calls == calls
+        assert router.stats()["pro"]["skipped_seconds"] > 0
+
+    def test_slow_model_is_skipped(self):
+        router, backends = make_router(latencies={"lite": 0.02}, slow_p95=0.01, cooldown=60)
+        for _ in range(3):
+            assert router.generate_for("generate_discussion_questions", "p").model_name == "lite"
+        assert router.generate_for("generate_discussion_questions", "p").model_name == "flash"
+        assert router.stats()["lite"]["skipped_seconds"] > 0
+
+    def test_model_is_retried_after_cooldown(self):
+        router, backends = make_router(error_rates={"pro": 1.0}, cooldown=0)
+        for _ in range(3):
+            router.generate_for("compare_books", "p")
+        backends["pro"].error_rate = 0.0
+        assert router.generate_for("compare_books", "p").model_name == "pro"
+
+    def test_raises_when_every_model_fails(self):
+        router, _ = make_router(error_rates={"pro": 1.0, "flash": 1.0})
+        with pytest.raises(BackendError):
+            router.generate_for("compare_books", "p")
+
+    def test_unknown_default_tier(self):
+        with pytest.raises(ValueError):
+            ModelRouter(lambda name: FakeBackend(), TIERS, {}, "premium")
+
+
+class TestGeminiServiceRouting:
+    def test_service_routes_by_operation_and_records_model(self, monkeypatch):
+        for name in ("GEMINI_API_KEY", "GEMINI_BACKEND", "GEMINI_CACHE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        router, _ = make_router(error_rates={"pro": 1.0})
+        telemetry = Telemetry()
+        service = GeminiService(backend=router, cache=MemoryCache(), telemetry=telemetry)
+
+        assert service.compare_books(make_book(1), make_book(2), "es") == "flash answer"
+        assert service.generate_discussion_questions(make_book(1), "es") == "lite answer"
+        assert telemetry.recent("compare_books", "es")[-1]["model"] == "flash"
+        assert telemetry.recent("generate_discussion_questions", "es")[-1]["model"] == "lite"
+        assert ":pro:" in service.cache_key("compare_books", "es", "prompt")
@@ -0,0 +1,84 @@
+"""
+Unit tests for speculative prefetch of Gemini analyses.
+Run with: pytest tests/ -v
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.cache import MemoryCache
+from src.models.book import Book
+from src.services.gemini_service import GeminiService
+from src.services.model_backends import FakeBackend
+from src.services.prefetch_service import PrefetchBudget, Prefetcher
+
+
+def make_book(book_id=1):
+    return Book(id=book_id, title=f"Book {book_id}", author="Author", description="D", year=2000, genre="G")
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+class TestPrefetchBudget:
+    def test_limits_requests_per_window(self):
+        budget = PrefetchBudget(max_requests=2, window_seconds=60)
+        assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+
+    def test_window_expires(self):
+        budget = PrefetchBudget(max_requests=1, window_seconds=0)
+        assert budget.try_acquire() and budget.try_acquire()
+
+
+class TestPrefetcher:
+    def test_prefetch_fills_cache(self, executor):
+        backend = FakeBackend()
+        service = GeminiService(backend=backend, cache=MemoryCache())
+        prefetcher = Prefetcher(executor, PrefetchBudget(10))
+
+        wait(prefetcher.on_selection(service, make_book(), "es"))
+        service.get_book_summary(make_book(), "es")
+        service.analyze_themes_and_characters(make_book(), "es")
+
+        assert backend.calls == 2
+
+    def test_same_selection_is_not_prefetched_twice(self, executor):
+        service = GeminiService(backend=FakeBackend(), cache=MemoryCache())
+        prefetcher = Prefetcher(executor, PrefetchBudget(10))
+
+        assert len(prefetcher.on_selection(service, make_book(), "es")) == 2
+        assert prefetcher.on_selection(service, make_book(), "es") == []
+
+    def test_budget_bounds_prefetch(self, executor):
+        service = GeminiService(backend=FakeBackend(), cache=MemoryCache())
+        prefetcher = Prefetcher(executor, PrefetchBudget(1))
+
+        assert len(prefetcher.on_selection(service, make_book(), "es")) == 1
+
+    def test_selection_change_cancels_pending(self):
+        release = threading.Event()
+        backend = FakeBackend(responder=lambda prompt: release.wait(5) and "ok")
+        service = GeminiService(backend=backend, cache=MemoryCache())
+        executor = ThreadPoolExecutor(max_workers=1)
+        prefetcher = Prefetcher(executor, PrefetchBudget(10))
+
+        first = prefetcher.on_selection(service, make_book(1), "es")
+        prefetcher.on_selection(service, make_book(2), "es")
+        release.set()
+        executor.shutdown(wait=True)
+
+        assert first[1].cancelled()
+        assert backend.calls == 3  # Resumen del libro 1 (ya en curso) + los dos del libro 2
+
+    def test_without_cache_does_nothing(self, executor):
+        service = GeminiService(backend=FakeBackend(), cache=None)
+        service.cache = None
+        assert Prefetcher(executor, PrefetchBudget(10)).on_selection(service, make_book(), "es") == []
@@ -0,0 +1,78 @@
+"""
+Unit tests for prompt token budgeting.
+Run with: pytest tests/ -v
+"""
+
+from src.prompts import PromptTemplate
+from src.services.prompt_budget import (
+    ELLIPSIS,
+    estimate_tokens,
+    fit_context,
+    format_list,
+    summarize_text,
+)
+
+
+class TestSummarizeText:
+    def test_short_text_is_unchanged(self):
+        assert summarize_text("Una frase corta.", 100) == "Una frase corta."
+
+    def test_keeps_whole_leading_sentences(self):
+        text = "Primera frase. Segunda frase. " + "Tercera frase muy larga. " * 20
+
+        result = summarize_text(text, 10)
+
+        assert result.startswith("Primera frase. Segunda frase.")
+        assert result.endswith(ELLIPSIS)
+        assert estimate_tokens(result) <= 10
+
+    def test_keeps_whole_lines_of_lists(self):
+        text = format_list([f"¿Pregunta número {i}?" for i in range(20)])
+
+        result = summarize_text(text, 15)
+
+        assert result.splitlines()[0] == "- ¿Pregunta número 0?"
+        assert result.splitlines()[-1] == ELLIPSIS
+        assert estimate_tokens(result) <= 15
+
+    def test_cuts_at_word_boundary_when_first_sentence_is_too_long(self):
+        result = summarize_text("palabra " * 100, 5)
+
+        assert result.endswith("palabra" + ELLIPSIS)
+        assert estimate_tokens(result) <= 5
+
+    def test_no_room_returns_empty(self):
+        assert summarize_text("Texto largo. " * 10, 0) == ""
+
+
+class TestFitContext:
+    template = PromptTemplate("t", "es", "Libro: {{title}}\nDescripción: {{description}}\nBio: {{author_bio}}")
+
+    def test_context_within_budget_is_unchanged(self):
+        context = {"title": "Emma", "description": "Corta.", "author_bio": "Bio."}
+        assert fit_context(self.template, context, 100) == context
+
+    def test_trims_long_fields_to_budget(self):
+        context = {"title": "Emma", "description": "Una frase larga. " * 200, "author_bio": "Bio corta."}
+
+        fitted = fit_context(self.template, context, 120)
+
+        assert estimate_tokens(self.template.render(**fitted)) <= 120
+        assert fitted["title"] == "Emma"
+        # The short field keeps its text and leaves its share to the long one
+        assert fitted["author_bio"] == "Bio corta."
+        assert fitted["description"].endswith(ELLIPSIS)
+
+    def test_prefixed_fields_share_the_budget(self):
+        template = PromptTemplate("t", "es", "{{book1_description}}\n{{book2_description}}")
+        context = {"book1_description": "Uno dos tres. " * 100, "book2_description": "Cuatro cinco. " * 100}
+
+        fitted = fit_context(template, context, 100)
+
+        first, second = fitted["book1_description"], fitted["book2_description"]
+        assert estimate_tokens(template.render(**fitted)) <= 100
+        assert abs(len(first) - len(second)) < 40
+
+    def test_fields_not_in_template_are_ignored(self):
+        context = {"title": "Emma", "description": "x", "author_bio": "y", "post_questions": "z " * 1000}
+        assert fit_context(self.template, context, 50)["post_questions"] == context["post_questions"]
@@ -0,0 +1,92 @@
+"""
+Unit tests for the prompt template subsystem.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+from src.prompts import PromptRegistry, PromptTemplate, prompts
+
+OPERATIONS = [
+    "get_book_summary",
+    "analyze_themes_and_characters",
+    "get_book_recommendations",
+    "explain_concept",
+    "compare_books",
+    "generate_discussion_questions",
+    "search_similar_books",
+    "search_author_works",
+    "search_books_by_theme",
+    "grade_answers",
+    "search_similar_books_structured",
+    "search_author_works_structured",
+    "search_books_by_theme_structured",
+    "get_book_recommendations_structured",
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry over a temporary templates folder"""
+    (tmp_path / "es" / "partials").mkdir(parents=True)
+    (tmp_path / "es" / "partials" / "greeting.txt").write_text("Hola {{name}}\n", encoding="utf-8")
+    (tmp_path / "es" / "hello.txt").write_text("{{> greeting}}, bienvenido a {{place}}.", encoding="utf-8")
+    return PromptRegistry(templates_dir=str(tmp_path))
+
+
+class TestPromptTemplate:
+    def test_render_replaces_fields(self):
+        template = PromptTemplate("t", "es", "Libro: {{title}} ({{ year }})")
+        assert template.render(title="1984", year=1949) == "Libro: 1984 (1949)"
+
+    def test_literal_json_braces_are_kept(self):
+        template = PromptTemplate("t", "es", '[{"id": 1}] {{x}}')
+        assert template.render(x="ok") == '[{"id": 1}] ok'
+
+    def test_missing_field_raises(self):
+        template = PromptTemplate("t", "es", "{{title}}")
+        with pytest.raises(KeyError):
+            template.render()
+
+    def test_hash_depends_on_source(self):
+        assert PromptTemplate("t", "es", "a").hash == PromptTemplate("t", "es", "a").hash
+        assert PromptTemplate("t", "es", "a").hash != PromptTemplate("t", "es", "b").hash
+
+
+class TestPromptRegistry:
+    def test_partials_are_expanded(self, registry):
+        assert registry.render("hello", name="Ana", place="ThinkInk") == "Hola Ana, bienvenido a ThinkInk."
+
+    def test_templates_are_compiled_once(self, registry):
+        assert registry.get("hello") is registry.get("hello")
+
+    def test_falls_back_to_default_language(self, registry):
+        assert registry.render("hello", "en", name="Ana", place="X") == "Hola Ana, bienvenido a X."
+
+    def test_hash_changes_when_partial_changes(self, registry, tmp_path):
+        before = registry.template_hash("hello")
+        (tmp_path / "es" / "partials" / "greeting.txt").write_text("Hi {{name}}\n", encoding="utf-8")
+        registry.clear()
+        assert registry.template_hash("hello") != before
+
+    def test_unknown_template_raises(self, registry):
+        with pytest.raises(FileNotFoundError):
+            registry.get("does_not_exist")
+
+    @pytest.mark.parametrize("operation", OPERATIONS)
+    def test_shipped_templates_load(self, operation):
+        template = prompts.get(operation, "es")
+        assert "{{>" not in template.source
+        # Language and restrictions live in the shared system prefix
+        assert "lang_name" not in template.fields
+
+    def test_system_template_carries_language(self):
+        template = prompts.get("system", "es")
+        assert template.fields == ["lang_name"]
+        assert "RESTRICCIONES IMPORTANTES" in template.source
+
+    @pytest.mark.parametrize("operation", [op for op in OPERATIONS if op.endswith("_structured")])
+    def test_structured_templates_only_ask_for_json(self, operation):
+        source = prompts.get(operation, "es").source
+        assert "❌" not in source
+        assert '{"results": [], "error":' in source
@@ -0,0 +1,100 @@
+"""
+Unit tests for query normalization and the semantic query index.
+Run with: pytest tests/ -v
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.services.query_similarity import SemanticQueryIndex, fold_accents, normalize_query
+
+
+class TestNormalizeQuery:
+    def test_fold_accents(self):
+        assert fold_accents("García Márquez, Brontë") == "Garcia Marquez, Bronte"
+
+    @pytest.mark.parametrize("a, b", [
+        ("Gabriel Garcia Marquez", "gabriel garcía márquez"),
+        ("amistad", "La amistad"),
+        ("The friendship", "friendship!"),
+    ])
+    def test_equivalent_queries(self, a, b):
+        assert normalize_query(a) == normalize_query(b)
+
+    @pytest.mark.parametrize("a, b", [
+        ("amor sin esperanza", "amor con esperanza"),
+        ("books for women", "books by women"),
+        ("books about women", "books by women"),
+        ("novelas para niños", "novelas sobre niños"),
+    ])
+    def test_polarity_words_are_kept(self, a, b):
+        assert normalize_query(a) != normalize_query(b)
+
+    def test_only_stopwords_are_kept(self):
+        assert normalize_query("El") == "el"
+
+
+class TestSemanticQueryIndex:
+    @pytest.fixture
+    def index(self):
+        index = SemanticQueryIndex(threshold=0.9)
+        index.add("author:es", "Gabriel García Márquez")
+        index.add("theme:es", "amistad")
+        return index
+
+    def test_exact_normalized_match(self, index):
+        assert index.lookup("theme:es", "La Amistad") == "amistad"
+
+    def test_near_duplicate_match(self, index):
+        assert index.lookup("author:es", "Gabriel Garcia Marques") == "Gabriel García Márquez"
+
+    def test_unrelated_query_misses(self, index):
+        assert index.lookup("author:es", "Jane Austen") is None
+
+    def test_namespaces_are_isolated(self, index):
+        assert index.lookup("author:en", "Gabriel García Márquez") is None
+
+    @pytest.mark.parametrize("stored, query", [
+        ("Los miserables", "Los miserables 2"),
+        ("Los miserables 2", "Los miserables"),
+        ("consulta número 1", "consulta número 12"),
+        ("amor sin esperanza", "amor con esperanza"),
+        ("books for women", "books by women"),
+        ("books about women", "books by women"),
+        ("una larga historia de amor sin esperanza en tiempos de guerra",
+         "una larga historia de amor con esperanza en tiempos de guerra"),
+    ])
+    def test_different_anchors_do_not_match(self, stored, query):
+        index = SemanticQueryIndex(threshold=0.5)
+        index.add("ns", stored)
+        assert index.lookup("ns", query) is None
+
+    def test_matching_numbers_pick_the_right_query(self):
+        index = SemanticQueryIndex(threshold=0.5)
+        index.add("ns", "consulta número 1")
+        index.add("ns", "consulta número 12")
+        assert index.lookup("ns", "Consulta numero 12?") == "consulta número 12"
+        assert index.lookup("ns", "consultas número 1") == "consulta número 1"
+
+    def test_index_grows(self):
+        index = SemanticQueryIndex()
+        for i in range(40):
+            index.add("ns", f"consulta número {i}")
+        assert len(index) == 40
+        assert index.lookup("ns", "Consulta numero 39") == "consulta número 39"
+
+
+class TestLazyImports:
+    def test_heavy_modules_are_not_imported_at_startup(self):
+        code = (
+            "import sys, src.services.book_service, src.services.gemini_service; "
+            "print(sorted(m for m in ('numpy', 'google.generativeai', 'sqlite3') if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        ).stdout
+        assert output.strip() == "[]"
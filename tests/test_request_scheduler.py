@@ -0,0 +1,132 @@
+"""
+Unit tests for the priority request scheduler.
+Run with: pytest tests/ -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.services.request_scheduler import (
+    DeadlineExceeded,
+    Priority,
+    RequestScheduler,
+    current_context,
+    scheduling,
+)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = RequestScheduler(max_concurrency=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def block_scheduler(scheduler):
+    """Occupies the only worker until the returned event is set"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    future = scheduler.submit(blocker, priority=Priority.INTERACTIVE, session_id="blocker")
+    started.wait(5)
+    return release, future
+
+
+class TestScheduling:
+    def test_run_returns_result(self, scheduler):
+        assert scheduler.run(lambda: 42) == 42
+
+    def test_exceptions_propagate(self, scheduler):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            scheduler.run(fail)
+
+    def test_interactive_runs_before_batch(self, scheduler):
+        order = []
+        release, blocker = block_scheduler(scheduler)
+
+        batch = scheduler.submit(lambda: order.append("batch"), priority=Priority.BATCH)
+        interactive = scheduler.submit(lambda: order.append("interactive"), priority=Priority.INTERACTIVE)
+        release.set()
+        for future in (blocker, batch, interactive):
+            future.result(5)
+
+        assert order == ["interactive", "batch"]
+
+    def test_round_robin_between_sessions(self, scheduler):
+        order = []
+        release, blocker = block_scheduler(scheduler)
+
+        futures = [scheduler.submit(lambda i=i: order.append(f"a{i}"), session_id="a") for i in range(3)]
+        futures.append(scheduler.submit(lambda: order.append("b0"), session_id="b"))
+        release.set()
+        for future in [blocker] + futures:
+            future.result(5)
+
+        assert order.index("b0") == 1
+
+    def test_class_limit_keeps_capacity_for_interactive(self):
+        scheduler = RequestScheduler(max_concurrency=2, class_limits={"batch": 1})
+        release = threading.Event()
+        batch_futures = [
+            scheduler.submit(lambda: release.wait(5), priority=Priority.BATCH) for _ in range(2)
+        ]
+
+        start = time.monotonic()
+        assert scheduler.run(lambda: "fast", priority=Priority.INTERACTIVE) == "fast"
+        assert time.monotonic() - start < 1
+
+        release.set()
+        for future in batch_futures:
+            future.result(5)
+        scheduler.shutdown()
+
+    def test_expired_deadline_is_dropped(self, scheduler):
+        release, blocker = block_scheduler(scheduler)
+        future = scheduler.submit(lambda: "late", deadline=time.monotonic() + 0.01)
+        time.sleep(0.05)
+        release.set()
+        blocker.result(5)
+
+        with pytest.raises(DeadlineExceeded):
+            future.result(5)
+        assert scheduler.dropped_count == 1
+        assert set(scheduler.stats()) == {"interactive", "prefetch", "batch"}
+
+
+class TestSchedulingContext:
+    def test_context_is_used_by_submit(self, scheduler):
+        order = []
+        release, blocker = block_scheduler(scheduler)
+        with scheduling(Priority.BATCH):
+            batch = scheduler.submit(lambda: order.append("batch"))
+        interactive = scheduler.submit(lambda: order.append("interactive"))
+        release.set()
+        for future in (blocker, batch, interactive):
+            future.result(5)
+
+        assert order == ["interactive", "batch"]
+
+    def test_context_values(self):
+        with scheduling(Priority.BATCH, session_id="job", timeout=60):
+            context = current_context()
+            assert context.priority == Priority.BATCH
+            assert context.session_id == "job"
+            assert context.timeout == 60
+
+        assert current_context().priority == Priority.INTERACTIVE
+
+    def test_deadline_starts_when_request_is_queued(self, scheduler):
+        with scheduling(Priority.BATCH, timeout=0.05):
+            time.sleep(0.1)
+            # The block has outlived its timeout, but the request was only just queued
+            assert scheduler.submit(lambda: "fresh").result(5) == "fresh"
+        assert scheduler.dropped_count == 0
@@ -0,0 +1,70 @@
+"""
+Unit tests for structured search results.
+Run with: pytest tests/ -v
+"""
+
+import pytest
+
+from src.models.search_result import BookResult
+from src.services.book_service import BookService
+from src.services.search_result_service import SearchResultService
+
+
+class TestValidateResults:
+    def test_accepts_results_object(self):
+        data = {"results": [{"title": "1984", "author": "George Orwell", "year": "1949",
+                             "genre": "Distopía", "reason": "Vigilancia"}]}
+
+        results = SearchResultService.validate_results(data)
+
+        assert results == [BookResult("1984", "George Orwell", 1949, "Distopía", "Vigilancia")]
+
+    def test_accepts_plain_list_and_dedupes(self):
+        data = [{"title": "Emma", "author": "Jane Austen"}, {"title": "emma", "author": "jane austen"}]
+        assert len(SearchResultService.validate_results(data)) == 1
+
+    def test_invalid_year_is_dropped(self):
+        results = SearchResultService.validate_results([{"title": "X", "author": "Y", "year": "circa 1600"}])
+        assert results[0].year is None
+
+    def test_missing_author_raises(self):
+        with pytest.raises(ValueError):
+            SearchResultService.validate_results([{"title": "X"}])
+
+    def test_wrong_shape_raises(self):
+        with pytest.raises(ValueError):
+            SearchResultService.validate_results({"results": "nope"})
+
+
+class TestCatalogAndFormatting:
+    def test_link_to_catalog(self):
+        service = BookService()
+        book = service.get_book_by_id(1)
+        results = [
+            BookResult(book.title, book.author.split()[-1]),
+            BookResult("Unknown Book", "Nobody"),
+        ]
+
+        SearchResultService.link_to_catalog(results, service)
+
+        assert results[0].catalog_id == 1
+        assert results[1].catalog_id is None
+
+    def test_format_results_markdown(self):
+        results = [BookResult("1984", "George Orwell", 1949, "Distopía", "Vigilancia", catalog_id=1)]
+
+        text = SearchResultService.format_results_markdown(results, "en")
+
+        assert "1984" in text and "1949" in text and "Vigilancia" in text
+        assert "catalog" in text
+
+    def test_format_empty_results(self):
+        assert SearchResultService.format_results_markdown([], "en") == "No results found."
+
+    def test_compact_json_roundtrip(self):
+        results = [BookResult("1984", "George Orwell", 1949), BookResult("Emma", "Jane Austen", reason="Ironía")]
+
+        text = SearchResultService.to_compact_json(results)
+
+        assert "catalog_id" not in text
+        assert SearchResultService.from_compact_json(text) == results
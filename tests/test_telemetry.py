@@ -0,0 +1,62 @@
+"""
+Unit tests for Gemini operation telemetry.
+Run with: pytest tests/ -v
+"""
+
+import json
+
+from src.services.telemetry import OperationRecord, Telemetry
+
+
+def record(operation="get_book_summary", lang="es", latency=0.1, **fields):
+    return OperationRecord(operation=operation, lang=lang, latency=latency, **fields)
+
+
+class TestTelemetry:
+    def test_aggregates_per_operation_and_language(self):
+        telemetry = Telemetry()
+        telemetry.record(record(prompt_tokens=100, output_tokens=50))
+        telemetry.record(record(lang="en", prompt_tokens=80, output_tokens=40))
+        telemetry.record(record(cache_hit=True))
+        telemetry.record(record(operation="compare_books", error_class="BackendError"))
+
+        stats = telemetry.stats()
+        summary = stats["operations"]["get_book_summary"]
+
+        assert summary["count"] == 3
+        assert summary["model_calls"] == 2
+        assert summary["prompt_tokens"] == 180
+        assert summary["cache_hit_rate"] == 1 / 3
+        assert summary["languages"]["en"]["output_tokens"] == 40
+        assert stats["operations"]["compare_books"]["errors"] == {"BackendError": 1}
+        assert stats["languages"]["es"]["count"] == 3
+        assert stats["totals"]["prompt_tokens"] == 180
+
+    def test_latency_percentiles_ignore_cache_hits(self):
+        telemetry = Telemetry()
+        for latency in [0.1] * 19 + [2.0]:
+            telemetry.record(record(latency=latency))
+        telemetry.record(record(latency=0.0, cache_hit=True))
+
+        summary = telemetry.stats()["operations"]["get_book_summary"]
+
+        assert summary["latency_p50"] == 0.1
+        assert summary["latency_p95"] == 2.0
+
+    def test_rolling_window(self):
+        telemetry = Telemetry(window=5)
+        for _ in range(10):
+            telemetry.record(record(prompt_tokens=1))
+
+        stats = telemetry.stats()
+
+        assert stats["operations"]["get_book_summary"]["count"] == 5
+        assert stats["totals"]["count"] == 10
+
+    def test_export_to_file(self, tmp_path):
+        telemetry = Telemetry(export_path=str(tmp_path / "metrics.json"), export_interval=0)
+        telemetry.record(record(prompt_tokens=10))
+
+        data = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+
+        assert data["operations"]["get_book_summary"]["prompt_tokens"] == 10